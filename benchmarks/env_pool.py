@@ -0,0 +1,46 @@
+""" Steps/sec of CtfEnvPool as the number of worker processes grows, against
+        a single process stepping the same envs.
+
+    Usage: python -m benchmarks.env_pool [num_envs] [steps]
+"""
+import multiprocessing
+import sys
+import time
+import numpy as np
+
+from gym_ctf.envs import CtfEnv, CtfEnvPool
+
+def single_process(num_envs, steps):
+    envs = [CtfEnv(observation_mode='flat', action_mode='array')
+            for _ in range(num_envs)]
+    actions = np.zeros((num_envs,) + envs[0].action_space.shape, np.float32)
+    start = time.perf_counter()
+    for _ in range(steps):
+        for env, action in zip(envs, actions):
+            if env._step(action)[2]:
+                env._reset()
+    return num_envs * steps / (time.perf_counter() - start)
+
+def pool(num_envs, num_workers, steps):
+    with CtfEnvPool(num_envs, num_workers, copy=False) as p:
+        actions = np.zeros((num_envs,) + p.action_space.shape, np.float32)
+        p.reset()
+        start = time.perf_counter()
+        for _ in range(steps):
+            p.step(actions)
+        return num_envs * steps / (time.perf_counter() - start)
+
+def main():
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    baseline = single_process(num_envs, steps)
+    print('%8s %12s %8s' % ('workers', 'steps/sec', 'speedup'))
+    print('%8s %12.0f %8.2f' % ('none', baseline, 1))
+    workers = 1
+    while workers <= multiprocessing.cpu_count():
+        rate = pool(num_envs, workers, steps)
+        print('%8d %12.0f %8.2f' % (workers, rate, rate / baseline))
+        workers *= 2
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+""" Cold-start import latency of gym_ctf modules.
+
+    Every module is imported in fresh interpreters; the time of an interpreter
+    that imports nothing is subtracted. The report also lists whether gym and
+    Numba were loaded, which the simulation core (gym_ctf.state) must not do.
+
+    Results are written as JSON. compare exits with status 1 if an import got
+    slower by more than the threshold, or started loading gym or Numba.
+
+    Usage: python -m benchmarks.import_time run [-o results.json] [--runs 10]
+           python -m benchmarks.import_time compare baseline.json results.json
+                                                    [--threshold 0.2]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+MODULES = ('gym_ctf', 'gym_ctf.state.world', 'gym_ctf.state.spatial',
+           'gym_ctf.envs')
+
+PROBE = ("import sys; import %s; "
+         "print(int('gym' in sys.modules), int('numba' in sys.modules))")
+
+def cold_start_ms(code, runs):
+    """ Median wall time (ms) of fresh interpreters running code. """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1e3)
+    return float(np.median(times))
+
+def loaded(module):
+    out = subprocess.run([sys.executable, '-c', PROBE % module], check=True,
+                         capture_output=True, text=True).stdout.split()
+    return {'gym': out[0] == '1', 'numba': out[1] == '1'}
+
+def run(args):
+    interpreter = cold_start_ms('pass', args.runs)
+    results = []
+    print('%-24s %10s %6s %6s' % ('module', 'import ms', 'gym', 'numba'))
+    for module in MODULES:
+        result = {'name': module,
+                  'import_ms': cold_start_ms('import %s' % module, args.runs)
+                               - interpreter}
+        result.update(loaded(module))
+        print('%-24s %10.1f %6s %6s' % (module, result['import_ms'],
+                                        result['gym'], result['numba']))
+        results.append(result)
+    report = {'meta': {'python': platform.python_version(),
+                       'numpy': np.__version__,
+                       'platform': platform.platform(),
+                       'interpreter_ms': interpreter},
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    return 0
+
+def regressions(baseline, current, threshold):
+    """ Imports in both reports that got slower by more than threshold (a
+            fraction) or newly load gym or Numba.
+
+    Returns:
+        list of (module, what, baseline value, current value).
+    """
+    base = {r['name']: r for r in baseline['results']}
+    found = []
+    for result in current['results']:
+        old = base.get(result['name'])
+        if old is None:
+            continue
+        if result['import_ms'] > old['import_ms'] * (1 + threshold):
+            found.append((result['name'], 'import_ms', old['import_ms'],
+                          result['import_ms']))
+        for dependency in ('gym', 'numba'):
+            if result[dependency] and not old[dependency]:
+                found.append((result['name'], dependency, False, True))
+    return found
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    found = regressions(baseline, current, args.threshold)
+    for name, what, old, new in found:
+        print('REGRESSION %-24s %-10s %s -> %s' % (name, what, old, new))
+    if not found:
+        print('no regressions above %.0f%%' % (args.threshold * 100))
+    return 1 if found else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('-o', '--output')
+    run_parser.add_argument('--runs', type=int, default=10)
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(argv)
+    return run(args) if args.command == 'run' else compare(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+""" Load generator for the rollout server. For a growing number of client
+        processes, every client steps its world as fast as it can; the
+        benchmark reports p50/p99 step latency and aggregate steps/sec.
+
+    Usage: python -m benchmarks.rollout_server [max_clients] [steps] [tick]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+from gym_ctf.envs.rollout_server import RolloutClient, serve
+
+def wait_for(path, timeout=10):
+    deadline = time.time() + timeout
+    while not os.path.exists(path):
+        if time.time() > deadline:
+            raise RuntimeError('rollout server did not start')
+        time.sleep(0.01)
+
+def client(path, steps, start, results):
+    with RolloutClient(path) as c:
+        actions = np.zeros((c.agents, 2), np.float32)
+        c.reset()
+        latencies = np.zeros(steps)
+        start.wait()
+        for i in range(steps):
+            t = time.perf_counter()
+            c.step(actions)
+            latencies[i] = time.perf_counter() - t
+    results.put(latencies)
+
+def run(path, clients, steps):
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client,
+                                         args=(path, steps, start, results))
+                 for _ in range(clients)]
+    for p in processes:
+        p.start()
+    time.sleep(0.2)
+    t = time.perf_counter()
+    start.set()
+    latencies = np.concatenate([results.get() for _ in processes])
+    elapsed = time.perf_counter() - t
+    for p in processes:
+        p.join()
+    return latencies, clients * steps / elapsed
+
+def main():
+    max_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    tick = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    path = os.path.join(tempfile.mkdtemp(), 'ctf.sock')
+    server = multiprocessing.Process(target=serve, args=(path, max_clients, tick),
+                                     daemon=True)
+    server.start()
+    wait_for(path)
+
+    print('%8s %10s %10s %12s' % ('clients', 'p50 (us)', 'p99 (us)', 'steps/sec'))
+    clients = 1
+    while clients <= max_clients:
+        latencies, rate = run(path, clients, steps)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+        print('%8d %10.0f %10.0f %12.0f' % (clients, p50, p99, rate))
+        clients *= 2
+
+    server.terminate()
+    server.join()
+
+if __name__ == '__main__':
+    main()
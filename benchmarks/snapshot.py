@@ -0,0 +1,37 @@
+""" Cost of branching a World with snapshot/restore against copy.deepcopy,
+        next to the cost of one step.
+
+    Usage: python -m benchmarks.snapshot
+"""
+import copy
+import timeit
+import numpy as np
+
+import gym_ctf
+from gym_ctf.envs import CtfEnv
+
+def per_call(f):
+    number, _ = timeit.Timer(f).autorange()
+    return min(timeit.repeat(f, number=number, repeat=3)) / number
+
+def main():
+    print('%8s %8s %12s %12s %12s %12s' % ('preset', 'agents', 'step (us)',
+                                           'snapshot', 'restore',
+                                           'deepcopy'))
+    for name in ('small', 'medium', 'large'):
+        env = CtfEnv(observation_mode='flat', action_mode='array',
+                     **gym_ctf.PRESETS[name])
+        w = env.world
+        actions = np.zeros(env.action_space.shape)
+        snap = w.snapshot()
+        step = per_call(lambda: w.world_step_arrays(actions))
+        w.restore(snap)
+        snapshot = per_call(w.snapshot)
+        restore = per_call(lambda: w.restore(snap))
+        deepcopy = per_call(lambda: copy.deepcopy(w))
+        print('%8s %8d %12.1f %12.1f %12.1f %12.1f' % (
+            name, len(w.agent_positions), step * 1e6, snapshot * 1e6,
+            restore * 1e6, deepcopy * 1e6))
+
+if __name__ == '__main__':
+    main()
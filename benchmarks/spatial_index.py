@@ -0,0 +1,44 @@
+""" Compares brute force and grid scoring in World.score_flags.
+
+    Worlds keep the default CtfEnv density (8 agents and 10 flags on a 100x100
+    map) while the agent and flag counts grow. The crossover is where the grid
+    becomes faster; world.SPATIAL_INDEX_PAIRS is set from it.
+
+    Usage: python -m benchmarks.spatial_index
+"""
+import timeit
+import numpy as np
+
+from gym_ctf.state import agent, flag, team, world
+
+SCALES = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+def build_world(scale, spatial_index, seed=0):
+    rng = np.random.RandomState(seed)
+    size = int(100 * np.sqrt(scale))
+    teams = []
+    for t in (1, 2):
+        agents = [agent.Agent(tuple(p), 0, t)
+                  for p in rng.randint(0, size, (4 * scale, 2))]
+        teams.append(team.Team(np.array(agents), t))
+    flags = [flag.Flag(tuple(p), 2) for p in rng.randint(0, size, (10 * scale, 2))]
+    return world.World(size, size, np.array(teams), np.array(flags),
+                       spatial_index=spatial_index)
+
+def time_scoring(w):
+    number, _ = timeit.Timer(w.score_flags).autorange()
+    runs = timeit.repeat(w.score_flags, number=number, repeat=3)
+    return min(runs) / number
+
+def main():
+    print('%8s %8s %10s %12s %12s' % ('agents', 'flags', 'pairs', 'brute (us)',
+                                      'grid (us)'))
+    for scale in SCALES:
+        brute = time_scoring(build_world(scale, 'brute'))
+        grid = time_scoring(build_world(scale, 'grid'))
+        agents, flags = 8 * scale, 10 * scale
+        print('%8d %8d %10d %12.1f %12.1f' % (agents, flags, agents * flags,
+                                              brute * 1e6, grid * 1e6))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+""" Step throughput, reset latency and peak memory across world scales.
+
+    Every case sweeps one of agent count, flag count, team count or world
+    size away from the default CtfEnv world (2 teams of 4 agents, 10 flags,
+    100x100). The paths measured are:
+        world  World stepped as CtfEnv does in 'array' mode: world_step_arrays,
+               get_reward and get_flat_observation.
+        env    CtfEnv in 'flat' observation and 'array' action mode.
+        vec    VecCtfEnv with VEC_ENVS games. Steps/sec counts game steps.
+        pool   CtfEnvPool with one worker per CPU. Peak memory only covers
+               the parent process.
+    Every path runs every case; env and pool pass the case to CtfEnv as its
+    world size, team sizes and flag count.
+
+    Results are written as JSON. compare exits with status 1 if a case got
+    slower, or uses more memory, by more than the threshold.
+
+    Usage: python -m benchmarks.suite run [-o results.json] [--quick]
+                                          [--paths world,env,vec,pool]
+           python -m benchmarks.suite compare baseline.json results.json
+                                              [--threshold 0.1]
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from gym_ctf.envs import CtfEnv, CtfEnvPool, VecCtfEnv
+from gym_ctf.state import agent, layout, team, world
+
+DEFAULT = {'agents': 4, 'teams': 2, 'flags': 10, 'size': 100}
+SWEEP = {'agents': [4, 16, 64, 256],
+         'flags': [10, 40, 160, 640],
+         'teams': [2, 4, 8],
+         'size': [100, 400, 1600]}
+QUICK_SWEEP = {'agents': [4, 64], 'flags': [10, 160], 'teams': [2, 8],
+               'size': [100, 1600]}
+PATHS = ('world', 'env', 'vec', 'pool')
+VEC_ENVS = 64
+POOL_ENVS = 64
+
+# Metric: (direction, unit). Direction is 1 if larger is better.
+METRICS = {'steps_per_sec': (1, 'steps/s'),
+           'reset_ms': (-1, 'ms'),
+           'peak_mb': (-1, 'MB')}
+
+def cases(sweep):
+    """ The default world, then every sweep value of every parameter with the
+            others at their default.
+    """
+    yield dict(DEFAULT)
+    for name, values in sweep.items():
+        for value in values:
+            if value != DEFAULT[name]:
+                yield dict(DEFAULT, **{name: value})
+
+def case_name(path, params):
+    return '%s/a%d_t%d_f%d_s%d' % (path, params['agents'], params['teams'],
+                                   params['flags'], params['size'])
+
+def build_world(params, seed=0):
+    np_random = np.random.RandomState(seed)
+    size = params['size']
+    positions = layout.random_positions(
+        np_random, (params['agents'] * params['teams'],), 0, 0, size, size)
+    teams = []
+    for t in range(params['teams']):
+        rows = positions[t * params['agents']:(t + 1) * params['agents']]
+        agents = [agent.Agent(p, 0, t + 1) for p in rows]
+        teams.append(team.Team(np.array(agents), t + 1))
+    return world.World(size, size, np.array(teams), None, None,
+                       params['flags'], np_random=np_random)
+
+def env_kwargs(params):
+    """ CtfEnv arguments of a case. """
+    return dict(world_width=params['size'], world_height=params['size'],
+                number_agents_per_team=(params['agents'],) * params['teams'],
+                number_flags=params['flags'])
+
+class WorldCase():
+    def __init__(self, params):
+        self.world = build_world(params)
+        self.np_random = np.random.RandomState(1)
+        self.actions = np.ones((len(self.world.agent_positions), 2))
+        self.batch = 1
+
+    def step(self):
+        w = self.world
+        w.world_step_arrays(self.actions)
+        w.get_reward()
+        w.get_flat_observation()
+        if w.time >= 10:
+            w.reset()
+
+    def reset(self):
+        self.world.reset(self.np_random)
+
+    def close(self):
+        pass
+
+class EnvCase():
+    def __init__(self, params):
+        self.env = CtfEnv(observation_mode='flat', action_mode='array', seed=0,
+                          **env_kwargs(params))
+        self.actions = np.ones(self.env.action_space.shape, np.float32)
+        self.batch = 1
+
+    def step(self):
+        if self.env._step(self.actions)[2]:
+            self.env._reset()
+
+    def reset(self):
+        self.env._reset(randomize=True)
+
+    def close(self):
+        pass
+
+class VecCase():
+    def __init__(self, params):
+        self.env = VecCtfEnv(VEC_ENVS, params['size'], params['size'],
+                             (params['agents'],) * params['teams'],
+                             params['flags'], seed=0, copy=False)
+        self.actions = np.ones((VEC_ENVS, self.env.number_agents, 2))
+        self.batch = VEC_ENVS
+
+    def step(self):
+        self.env.step(self.actions)
+
+    def reset(self):
+        self.env.reset(randomize=True)
+
+    def close(self):
+        pass
+
+class PoolCase():
+    def __init__(self, params):
+        self.pool = CtfEnvPool(POOL_ENVS, multiprocessing.cpu_count(),
+                               env_kwargs=env_kwargs(params), copy=False)
+        self.actions = np.ones((POOL_ENVS,) + self.pool.action_space.shape,
+                               np.float32)
+        self.pool.reset()
+        self.batch = POOL_ENVS
+
+    def step(self):
+        self.pool.step(self.actions)
+
+    def reset(self):
+        self.pool.reset()
+
+    def close(self):
+        self.pool.close()
+
+CASES = {'world': WorldCase, 'env': EnvCase, 'vec': VecCase, 'pool': PoolCase}
+
+def steps_per_sec(case, min_time, repeat=3):
+    """ Best of repeat runs, each stepping for at least min_time seconds. """
+    case.step()
+    best = 0
+    for _ in range(repeat):
+        steps = 0
+        start = time.perf_counter()
+        elapsed = 0
+        while elapsed < min_time:
+            for _ in range(10):
+                case.step()
+            steps += 10
+            elapsed = time.perf_counter() - start
+        best = max(best, steps * case.batch / elapsed)
+    return best
+
+def reset_ms(case, resets=20):
+    start = time.perf_counter()
+    for _ in range(resets):
+        case.reset()
+    return (time.perf_counter() - start) / resets * 1e3
+
+def peak_mb(path, params, steps=20):
+    """ Peak traced allocation while building the case and stepping it. """
+    tracemalloc.start()
+    try:
+        case = CASES[path](params)
+        for _ in range(steps):
+            case.step()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    case.close()
+    return peak / 2 ** 20
+
+def measure(path, params, min_time):
+    case = CASES[path](params)
+    try:
+        result = {'name': case_name(path, params), 'path': path}
+        result.update(params)
+        result['steps_per_sec'] = steps_per_sec(case, min_time)
+        result['reset_ms'] = reset_ms(case)
+    finally:
+        case.close()
+    result['peak_mb'] = peak_mb(path, params)
+    return result
+
+def run(args):
+    sweep = QUICK_SWEEP if args.quick else SWEEP
+    min_time = 0.05 if args.quick else 0.5
+    paths = args.paths.split(',')
+    results = []
+    print('%-28s %12s %10s %10s' % ('case', 'steps/sec', 'reset ms', 'peak MB'))
+    for path in paths:
+        for params in cases(sweep):
+            result = measure(path, params, min_time)
+            print('%-28s %12.0f %10.3f %10.2f' % (
+                result['name'], result['steps_per_sec'], result['reset_ms'],
+                result['peak_mb']))
+            results.append(result)
+    report = {'meta': {'python': platform.python_version(),
+                       'numpy': np.__version__,
+                       'platform': platform.platform(),
+                       'cpu_count': multiprocessing.cpu_count(),
+                       'quick': args.quick},
+              'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    return 0
+
+def regressions(baseline, current, threshold):
+    """ Metrics of the cases in both reports that got worse by more than
+            threshold (a fraction).
+
+    Returns:
+        list of (case name, metric, baseline value, current value).
+    """
+    base = {r['name']: r for r in baseline['results']}
+    found = []
+    for result in current['results']:
+        old = base.get(result['name'])
+        if old is None:
+            continue
+        for metric, (direction, _) in METRICS.items():
+            change = (result[metric] - old[metric]) / max(old[metric], 1e-12)
+            if change * direction < -threshold:
+                found.append((result['name'], metric, old[metric],
+                              result[metric]))
+    return found
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    found = regressions(baseline, current, args.threshold)
+    for name, metric, old, new in found:
+        print('REGRESSION %-28s %-14s %12.3f -> %12.3f %s' % (
+            name, metric, old, new, METRICS[metric][1]))
+    if not found:
+        print('no regressions above %.0f%%' % (args.threshold * 100))
+    return 1 if found else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('-o', '--output')
+    run_parser.add_argument('--quick', action='store_true')
+    run_parser.add_argument('--paths', default=','.join(PATHS))
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args(argv)
+    return run(args) if args.command == 'run' else compare(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+""" Episodes/sec of SweepRunner as the number of worker processes grows,
+        against a hand-rolled serial loop over the same configurations.
+
+    Usage: python -m benchmarks.sweep [episodes per config]
+"""
+import multiprocessing
+import sys
+import tempfile
+import time
+
+from gym_ctf.envs import sweep
+
+CONFIGS = sweep.grid(flag_radius=[1, 2],
+                     time_to_score=[3, 5],
+                     number_agents_per_team=[(4, 4), (8, 8)],
+                     policies=[('nearest_flag', 'split_coverage')],
+                     time_limit=[100])
+
+def serial(episodes):
+    start = time.perf_counter()
+    for i, config in enumerate(CONFIGS):
+        sweep.play_task(config, 2, sweep.task_seed(0, i, 0), 0, episodes)
+    return len(CONFIGS) * episodes / (time.perf_counter() - start)
+
+def pooled(episodes, workers):
+    with tempfile.TemporaryDirectory() as path:
+        runner = sweep.SweepRunner(path, CONFIGS, episodes, episodes_per_task=4,
+                                   workers=workers)
+        start = time.perf_counter()
+        runner.run()
+        return len(CONFIGS) * episodes / (time.perf_counter() - start)
+
+def main():
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    baseline = serial(episodes)
+    print('%8s %12s %8s' % ('workers', 'episodes/s', 'speedup'))
+    print('%8s %12.1f %8.2f' % ('none', baseline, 1))
+    workers = 1
+    while workers <= multiprocessing.cpu_count():
+        rate = pooled(episodes, workers)
+        print('%8d %12.1f %8.2f' % (workers, rate, rate / baseline))
+        workers *= 2
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+""" Cost of recording every step of a CtfEnv with TrajectoryRecorder.
+
+    Usage: python -m benchmarks.trajectory [steps]
+"""
+import sys
+import tempfile
+import time
+import numpy as np
+
+from gym_ctf.envs import CtfEnv
+from gym_ctf.state.trajectory import TrajectoryRecorder
+
+def run(steps, recorder=None):
+    env = CtfEnv(observation_mode='flat', action_mode='array')
+    actions = np.zeros(env.action_space.shape, np.float32)
+    if recorder is not None:
+        recorder = TrajectoryRecorder(recorder, env.world)
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, reward, done, _ = env._step(actions)
+        if recorder is not None:
+            recorder.record(reward, actions, done)
+        if done:
+            env._reset()
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.close()
+    return steps / elapsed
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    plain = run(steps)
+    recorded = run(steps, tempfile.mkdtemp())
+    print('plain      %10.0f steps/sec' % plain)
+    print('recording  %10.0f steps/sec (%.1f%% slower)'
+          % (recorded, 100 * (1 - recorded / plain)))
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,25 @@
-from gym.envs.registration import register
+import sys
 
-register(
-    id='ctf-v0',
-    entry_point='gym_ctf.envs:CtfEnv'
-)
-register(
-    id='ctf-singleteam-v0',
-    entry_point='gym_ctf.envs:CtfSingleTeamEnv'
-)
+# Scale presets, registered as ctf-<name>-v0. Flags and world area grow with
+# the number of agents, keeping the density of the default world.
+PRESETS = {
+    'small': dict(world_width=100, world_height=100,
+                  number_agents_per_team=(4, 4), number_flags=10,
+                  time_limit=100),
+    'medium': dict(world_width=400, world_height=400,
+                   number_agents_per_team=(64, 64), number_flags=160,
+                   time_limit=200),
+    'large': dict(world_width=1600, world_height=1600,
+                  number_agents_per_team=(1024, 1024), number_flags=2560,
+                  time_limit=500),
+    'huge': dict(world_width=6400, world_height=6400,
+                 number_agents_per_team=(16384, 16384), number_flags=40960,
+                 time_limit=1000),
+}
+
+from .registration import register_envs
+
+# The gym adapter (gym_ctf.envs) registers the environments too; register
+# here only if gym is already loaded, to keep gym out of the simulation core.
+if 'gym' in sys.modules:
+    register_envs()
@@ -1,2 +1,9 @@
 from gym_ctf.envs.ctf_env import CtfEnv
 from gym_ctf.envs.ctf_singleteam_env import CtfSingleTeamEnv
+from gym_ctf.envs.vec_ctf_env import VecCtfEnv
+from gym_ctf.envs.pool import CtfEnvPool
+from gym_ctf.envs.rollout_server import RolloutServer, RolloutClient
+from gym_ctf.envs.sweep import SweepRunner
+
+from gym_ctf.registration import register_envs
+register_envs()
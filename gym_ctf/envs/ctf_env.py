@@ -8,35 +8,124 @@ from ..state import agent
 from ..state import flag
 from ..state import world
 from ..state import team
+from ..state import observation
+from ..state import layout
+from ..state import scenario as scenarios
+from ..state import raster
+from ..state import profiling
+from ..state import statistics
 
 class CtfEnv(gym.Env):
-    metadata = {'render.modes': ['human']}
+    metadata = {'render.modes': ['human', 'rgb_array']}
     
     COLOR = {1 : [255, 0, 0],
              2 : [0, 255, 0]}
+    FLAG_COLOR = [128, 0, 128]
+
+    SCREEN_WIDTH = 600
+    SCREEN_HEIGHT = 400
     
-    def __init__(self):
-        """ Using single agent env, all mutliagent parameters are fixed for now
+    OBSERVATION_MODES = ('tuple', 'flat', 'nearest')
+    ACTION_MODES = ('tuple', 'array')
+
+    def __init__(self, observation_mode='tuple', read_only_observation=True,
+                 action_mode='tuple', validate_actions=False,
+                 randomize_on_reset=False, seed=None, scenario_cache=None,
+                 profile=False, world_width=100, world_height=100,
+                 number_agents_per_team=(4, 4), number_flags=10,
+                 flag_radius=None, time_to_score=5, time_limit=10,
+                 spatial_index='auto', end_on_all_captured=False,
+                 backend='numpy', nearest=(4, 4, 4), boundary='none',
+                 body_radius=0, episode_stats=False):
+        """ Using single agent env. Large worlds should use the 'flat'
+                observation and 'array' action modes, whose spaces are single
+                Boxes (see gym_ctf.PRESETS).
+
+        Args:
+            observation_mode (str): 'tuple' returns World.get_observation.
+                'flat' returns World.get_flat_observation, a preallocated
+                float32 array that is overwritten every step. 'nearest'
+                returns World.get_nearest_observation, one row per agent with
+                its nearest flags, teammates and opponents; its size does not
+                depend on the number of flags or agents.
+            read_only_observation (boolean): In 'flat' mode, return a read-only
+                view of the buffer instead of the buffer itself.
+            action_mode (str): 'tuple' takes a Tuple of (type, vector) per
+                agent. 'array' takes a (num_agents, 2) array of move vectors,
+                or a pair (action types, move vectors) of arrays.
+            validate_actions (boolean): In 'array' mode, check the actions
+                with a vectorized bounds and shape test before stepping.
+                'tuple' actions are always checked against the action space.
+            randomize_on_reset (boolean): Draw a new layout (agent and flag
+                positions) from np_random on every reset.
+            seed (int): Seed of np_random, which draws the initial layout.
+            scenario_cache (ScenarioCache): Layouts used by
+                _reset(scenario=...). The shared default cache if None.
+            profile (boolean): Time every phase of a step and count the work
+                done (see gym_ctf.state.profiling). The latest step is
+                reported in info['profile'], totals by profile_stats.
+            world_width, world_height (int): Size of the world.
+            number_agents_per_team (sequence of ints): Agents on each team.
+            number_flags (int): Flags in the world.
+            flag_radius (double): Scoring radius. World default if None.
+            time_to_score (int): Steps needed to take a flag.
+            time_limit (int): Steps per game.
+            spatial_index (str): Scoring index of the World ('auto', 'grid'
+                or 'brute').
+            end_on_all_captured (boolean): The game is also done once every
+                flag has been taken.
+            backend (str): 'numpy', or 'numba' to step with the compiled
+                kernel (see World). Falls back to 'numpy' without Numba.
+            nearest (sequence of 3 ints): Flags, teammates and opponents per
+                agent in 'nearest' mode.
+            boundary (str): 'clamp' or 'wrap' keeps agents inside the world;
+                'none' lets them leave it (see World).
+            body_radius (double): Agents closer than two radii are pushed
+                apart. No collisions if 0.
+            episode_stats (boolean): Collect streaming episode statistics
+                (see gym_ctf.state.statistics). The summary of an episode is
+                reported in info['episode_stats'] by its last step, the
+                totals by episode_stats_summary.
         """
+        assert observation_mode in self.OBSERVATION_MODES
+        assert action_mode in self.ACTION_MODES
+        self.observation_mode = observation_mode
+        self.read_only_observation = read_only_observation
+        self.action_mode = action_mode
+        self.validate_actions = validate_actions
+        self.randomize_on_reset = randomize_on_reset
+        if scenario_cache is None:
+            scenario_cache = scenarios.default_cache
+        self.scenario_cache = scenario_cache
+        self.profiler = profiling.StepProfiler() if profile else None
+        self.statistics = None
+        if episode_stats:
+            self.statistics = statistics.EpisodeStatistics(time_limit)
 
-        self.world_height = 100
-        self.world_width = 100
-        self.num_teams = 2
-        self.number_agents_per_team = np.array([4,4])
-        self.number_flags = 10
-        self.flag_radius = 2
-        self.time_to_score = 5
-        self.time_limit = 10
+        self.world_height = world_height
+        self.world_width = world_width
+        self.number_agents_per_team = np.array(number_agents_per_team)
+        self.num_teams = self.number_agents_per_team.size
+        self.number_flags = number_flags
+        self.flag_radius = flag_radius
+        self.time_to_score = time_to_score
+        self.time_limit = time_limit
+        self.spatial_index = spatial_index
+        self.end_on_all_captured = end_on_all_captured
+        self.backend = backend
+        self.nearest = tuple(nearest)
+        self.boundary = boundary
+        self.body_radius = body_radius
 
         self.set_observation_space()
         self.set_action_space()
-        
+
+        self._seed(seed)
         self.create_teams()
         self.create_world()
         
         self.viewer = None
 
-        self._seed()
         self.reset()
 
     def _seed(self, seed=None):
@@ -50,6 +139,7 @@ class CtfEnv(gym.Env):
 
         Args:
             action (list of actions): A list of Tuples of action type and vector
+                (np array or pair of np arrays in 'array' action mode)
         
         Returns:
             observation (location, heading, and team of all agents. location 
@@ -57,26 +147,113 @@ class CtfEnv(gym.Env):
             reward (np array of floats): reward per team. 
                NOTE NOT A FLOAT. NOT WHAT OPENAI EXPECTS
             done (boolean): whether epoch is done
-            _ (?): unknown
+            info (dict): 'profile' holds the phase times and counts of the
+                step if profiling is on. 'episode_stats' holds the episode
+                statistics on the last step if they are collected.
         """
-        assert self.action_space.contains(action), "%r (%s) invalid" % (action, type(action))
+        profiler = self.profiler
+        if profiler is not None:
+            step_start = profiler.begin_step()
+        if self.action_mode == 'array':
+            self.array_step(action)
+        else:
+            if profiler is not None:
+                start = profiler.start()
+            assert self.action_space.contains(action), "%r (%s) invalid" % (action, type(action))
 
-        team_actions = self.to_team_actions(action)
+            team_actions = self.to_team_actions(action)
+            if profiler is not None:
+                profiler.lap('validate', start)
             
-        self.world.world_step(team_actions)
-        done = bool(self.world.time >= self.time_limit)
+            self.world.world_step(team_actions)
+        done = self.is_done()
+
+        if profiler is None:
+            reward = self.world.get_reward()
+            return self.get_observation(), reward, done, self.episode_info(done)
 
+        start = profiler.start()
         reward = self.world.get_reward()
+        start = profiler.lap('reward', start)
+        obs = self.get_observation()
+        profiler.lap('observation', start)
+        profiler.lap('step', step_start)
+        info = self.episode_info(done)
+        info['profile'] = profiler.end_step()
+        return obs, reward, done, info
 
-        return self.world.get_observation(), reward, done, {}
+    def episode_info(self, done):
+        """ Step info: the episode statistics if done and collected. """
+        if done and self.statistics is not None:
+            return {'episode_stats': self.statistics.end_episode(self.world)}
+        return {}
+
+    def is_done(self):
+        """ Whether the game is over: the time limit is reached or, with
+                end_on_all_captured, every flag has been taken.
+        """
+        return bool(self.world.time >= self.time_limit or
+                    (self.end_on_all_captured and self.world.all_captured()))
+
+    def episode_stats_summary(self):
+        """ Statistics of all episodes ended so far (see
+                EpisodeStatistics.summary). None if they are not collected.
+        """
+        if self.statistics is None:
+            return None
+        return self.statistics.summary()
+
+    def profile_stats(self):
+        """ Phase timings and counters since construction (see
+                StepProfiler.stats). None if profiling is off.
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.stats()
 
-    def _reset(self):
-        self.world.reset()
+    def _reset(self, randomize=None, scenario=None):
+        """ Resets the world.
+
+        Args:
+            randomize (boolean): Draw a new layout from np_random.
+                                 randomize_on_reset if None.
+            scenario (int or tuple): Load the layout of a cached scenario,
+                given by seed or by full key (see scenario_key).
+        """
+        if scenario is not None:
+            self.world.load_scenario(self.scenario_cache.get(self.scenario_key(scenario)))
+            return self.get_observation()
+        if randomize is None:
+            randomize = self.randomize_on_reset
+        self.world.reset(self.np_random if randomize else None)
+        return self.get_observation()
+
+    def scenario_key(self, scenario):
+        """ Cache key of a scenario of this env, given its seed or key. """
+        key = scenarios.scenario_key(self.world_width, self.world_height,
+                                     self.number_flags,
+                                     self.number_agents_per_team, 0,
+                                     self.flag_radius)
+        if isinstance(scenario, tuple):
+            assert scenario[:5] == key[:5], "scenario %r does not fit this env" % (scenario,)
+            return scenario
+        return key[:5] + (int(scenario),)
+
+    def get_observation(self):
+        if self.observation_mode == 'flat':
+            return self.world.get_flat_observation(self.read_only_observation)
+        if self.observation_mode == 'nearest':
+            return self.world.get_nearest_observation(*self.nearest)
         return self.world.get_observation()
 
     def _render(self, mode='human', close=False):
-        """ Render incomplete, but entirely functional. Shouldn't have to reopen
-            viewer. Transform translation not working. Causes jumpy behavior
+        """ Renders the world. The viewer and its geometry are created once
+                (or again if the number of agents or flags changes). Every
+                frame only moves and turns the agent triangles, and recolours
+                the flags whose capture state changed.
+
+            'rgb_array' frames are drawn by the NumPy rasterizer and need no
+            display.
         """
         if close:
             if self.viewer is not None:
@@ -84,68 +261,111 @@ class CtfEnv(gym.Env):
                 self.viewer = None
             return
 
-        screen_width = 600
-        screen_height = 400
+        if mode == 'rgb_array':
+            return raster.render_world(self.world, self.render_palette(),
+                                       self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
 
-        scale_w = screen_width / self.world_width
-        scale_h = screen_height / self.world_height
+        if self.viewer is None or self.rendered_counts != self.render_counts():
+            self.create_viewer()
+
+        self.update_viewer()
+        return self.viewer.render(return_rgb_array = mode=='rgb_array')
+
+    def render_palette(self):
+        return raster.palette(self.num_teams, self.COLOR, self.FLAG_COLOR)
+
+    def render_counts(self):
+        return (len(self.world.agent_positions), len(self.world.flag_positions))
+
+    def create_viewer(self):
+        """ Builds one triangle per agent and one circle per flag. Agent
+                triangles are centered at the origin and placed by their
+                transform.
+        """
+        from gym.envs.classic_control import rendering
 
         if self.viewer is not None:
             self.viewer.close()
-            self.viewer = None
-            
-        if self.viewer is None:
-            from gym.envs.classic_control import rendering
-            self.viewer = rendering.Viewer(screen_width, screen_height)
-            clearance = 1
-
-            i = 0
-            self.robot_trans = {}
-            # self.robot_locs = {}
-            # self.robot_heading = {}
-            for t in self.world.teams:
-                c = self.COLOR[t.team]
-                for a in t:
-                    car_r = rendering.FilledPolygon(a.triangle(b=20, scale_x=scale_w, scale_y=scale_h))
-                    cartrans = rendering.Transform()
-                    car_r.add_attr(cartrans)
-                    car_r.set_color(c[0], c[1], c[2])
-                    self.viewer.add_geom(car_r)
-                    self.robot_trans[i] = cartrans
-                    # self.robot_locs[i] = a.loc
-                    # self.robot_heading[i] = a.orientation
-                    i = i + 1
-
-            for f in self.world.flags:
-                flag_r = rendering.make_circle()
-                flag_r.set_color(128, 0, 128)
-                x = f.position[0] * scale_w
-                y = f.position[1] * scale_h
-                flag_r.add_attr(rendering.Transform(translation=(x,y)))
-                self.viewer.add_geom(flag_r)
-            # robot = agent.Agent(np.array([0,0]),4.2)
-            # car = rendering.FilledPolygon(robot.triangle(30))
-            # car.add_attr(rendering.Transform(translation=(0, clearance)))
-            # self.cartrans = rendering.Transform()
-            # car.add_attr(self.cartrans)
-            # self.viewer.add_geom(car)
-
-        # i = 0
-        # for t in self.world.teams:
-        #     for a in t:
-        #         print ("Step")
-        #         # print (self.robot_locs[i])
-        #         print (a.loc)
-        #         print (a.orientation)
-        #         # dx = a.loc[0] - self.robot_locs[i][0]
-        #         # dy = a.loc[1] - self.robot_locs[i][1]
-        #         # dt = a.orientation - self.robot_heading[i]
-        #         # self.robot_locs[i] = a.loc
-        #         self.robot_trans[i].set_translation(a.loc[0]*scale_w, a.loc[1]*scale_h)
-        #         self.robot_trans[i].set_rotation(a.orientation)
-        #         i = i + 1
-                
-        return self.viewer.render(return_rgb_array = mode=='rgb_array')
+        self.viewer = rendering.Viewer(self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+        self.render_scale = np.array([self.SCREEN_WIDTH / self.world_width,
+                                      self.SCREEN_HEIGHT / self.world_height])
+        self.rendered_counts = self.render_counts()
+
+        shape = agent.Agent((0, 0), 0).triangle(b=20)
+        self.robot_trans = []
+        for team_id in self.world.agent_teams:
+            c = self.COLOR.get(int(team_id), self.FLAG_COLOR)
+            car_r = rendering.FilledPolygon(shape)
+            cartrans = rendering.Transform()
+            car_r.add_attr(cartrans)
+            car_r.set_color(c[0], c[1], c[2])
+            self.viewer.add_geom(car_r)
+            self.robot_trans.append(cartrans)
+
+        self.flag_geoms = []
+        self.flag_trans = []
+        for _ in range(len(self.world.flag_positions)):
+            flag_r = rendering.make_circle()
+            flag_trans = rendering.Transform()
+            flag_r.add_attr(flag_trans)
+            self.viewer.add_geom(flag_r)
+            self.flag_geoms.append(flag_r)
+            self.flag_trans.append(flag_trans)
+
+        self.rendered_flag_owners = np.full(len(self.flag_geoms), -2)
+        self.rendered_flag_positions = np.full((len(self.flag_geoms), 2), np.nan)
+
+    def update_viewer(self):
+        """ Moves the agent transforms to the current world state. Flags are
+                only touched when they moved or changed owner.
+        """
+        w = self.world
+        positions = w.agent_positions * self.render_scale
+        for trans, (x, y), theta in zip(self.robot_trans, positions,
+                                        w.agent_orientations):
+            trans.set_translation(x, y)
+            trans.set_rotation(theta)
+
+        owners = np.where(w.flag_taken, w.flag_teams, 0)
+        for i in np.flatnonzero(owners != self.rendered_flag_owners):
+            c = self.COLOR.get(int(owners[i]), self.FLAG_COLOR)
+            self.flag_geoms[i].set_color(c[0], c[1], c[2])
+        self.rendered_flag_owners[:] = owners
+
+        flag_positions = w.flag_positions * self.render_scale
+        moved = (flag_positions != self.rendered_flag_positions).any(axis=1)
+        for i in np.flatnonzero(moved):
+            self.flag_trans[i].set_translation(*flag_positions[i])
+        self.rendered_flag_positions[:] = flag_positions
+
+    def array_step(self, action):
+        """ Steps the world with actions given as arrays.
+
+        Args:
+            action (np array, num_agents x 2, or (np array, np array)): Move
+                vectors, optionally preceded by one action type per agent.
+        """
+        action_types = None
+        if isinstance(action, tuple):
+            action_types, action = action
+        if self.validate_actions:
+            profiler = self.profiler
+            if profiler is not None:
+                start = profiler.start()
+            self.check_array_action(action, action_types)
+            if profiler is not None:
+                profiler.lap('validate', start)
+        self.world.world_step_arrays(action, action_types)
+
+    def check_array_action(self, vectors, action_types=None):
+        """ Vectorized counterpart of action_space.contains for 'array' mode.
+                Unknown action types are rejected by the world step.
+        """
+        shape = self.action_space.shape
+        assert np.shape(vectors) == shape, "action shape %r, expected %r" % (np.shape(vectors), shape)
+        assert np.all(np.abs(vectors) <= 1), "move vectors must be within [-1, 1]"
+        if action_types is not None:
+            assert np.shape(action_types) == shape[:1], "action types shape %r, expected %r" % (np.shape(action_types), shape[:1])
 
     def to_team_actions(self, actions):
         team_actions = []
@@ -155,25 +375,39 @@ class CtfEnv(gym.Env):
         return team_actions
     
     def create_teams(self):
+        positions = layout.random_positions(
+            self.np_random, (int(np.sum(self.number_agents_per_team)),),
+            self.origin_x, self.origin_y, self.world_width, self.world_height)
         self.teams = []
-        for t in range(self.num_teams):
-            agents = []
-            for _ in range(self.number_agents_per_team[t]):
-                rLoc = flag.Flag.random_pos(self.origin_x, self.origin_y,
-                                            self.world_width, self.world_height)
-                
-                agents.append(agent.Agent(rLoc, 0, t + 1))
+        first = 0
+        for t, count in enumerate(self.number_agents_per_team):
+            agents = [agent.Agent(rLoc, 0, t + 1)
+                      for rLoc in positions[first:first + count]]
+            first += count
             self.teams.append(team.Team(np.array(agents), t + 1))
         self.teams = np.array(self.teams)
 
     def create_world(self):
         self.world = world.World(self.world_height, self.world_width,
-                                 self.teams, None, None, self.number_flags)
+                                 self.teams, None, self.flag_radius,
+                                 self.number_flags, self.time_to_score,
+                                 self.spatial_index, np_random=self.np_random,
+                                 profiler=self.profiler, backend=self.backend,
+                                 boundary=self.boundary,
+                                 body_radius=self.body_radius,
+                                 statistics=self.statistics)
         
     def set_observation_space(self):
         self.origin_x = 0
         self.origin_y = 0
 
+        if self.observation_mode == 'flat':
+            self.set_flat_observation_space()
+            return
+        if self.observation_mode == 'nearest':
+            self.set_nearest_observation_space()
+            return
+
         self.agent_low = np.array([self.origin_x, self.origin_y, 0])
         self.agent_high = np.array([self.world_width, self.world_height,
                                     2*math.pi])
@@ -198,14 +432,41 @@ class CtfEnv(gym.Env):
         
         self.observation_space = spaces.Tuple(self.all_obs)
 
+    def set_flat_observation_space(self):
+        """ Box matching World.get_flat_observation. """
+        low, high = observation.observation_bounds(
+            self.world_width, self.world_height, self.num_teams,
+            int(np.sum(self.number_agents_per_team)), self.number_flags,
+            self.time_limit)
+        self.observation_space = spaces.Box(low, high, dtype=np.float32)
+
+    def set_nearest_observation_space(self):
+        """ Box matching World.get_nearest_observation, one row per agent. """
+        low, high = observation.nearest_observation_bounds(
+            self.world_width, self.world_height, *self.nearest,
+            time_limit=self.time_limit)
+        agent_count = int(np.sum(self.number_agents_per_team))
+        self.observation_space = spaces.Box(np.tile(low, (agent_count, 1)),
+                                            np.tile(high, (agent_count, 1)),
+                                            dtype=np.float32)
+
+    def action_agent_count(self):
+        """ Number of agents controlled through the action space. """
+        return int(np.sum(self.number_agents_per_team))
+
     def set_action_space(self):
+        if self.action_mode == 'array':
+            shape = (self.action_agent_count(), 2)
+            self.action_space = spaces.Box(-1, 1, shape, dtype=np.float32)
+            return
+
         self.vector_box = spaces.Box(np.array([-1,-1]), np.array([1,1]))
         self.agent_action = spaces.Tuple((spaces.Discrete(1), # action type
                                           self.vector_box))   # move action
 
         self.all_actions = []
 
-        for _ in range(np.sum(self.number_agents_per_team)):
+        for _ in range(self.action_agent_count()):
             self.all_actions.append(self.agent_action)
 
         self.action_space = spaces.Tuple(self.all_actions)
@@ -1,30 +1,100 @@
-import gym
-from gym import error, spaces, utils
-from gym.utils import seeding
+import numpy as np
 
-class CtfSingleTeamEnv(gym.Env):
-    metadata = {'render.modes': ['human']}
+from ..state import command
+from ..state import policies
+from .ctf_env import CtfEnv
 
-    def __init(self):
-        self.observation_space = None
-        self.action_space = None
-        self.reward_range = None
-        
+class CtfSingleTeamEnv(CtfEnv):
+    """ Capture the flag where the learner controls the first team and every
+            other team follows a scripted policy (see gym_ctf.state.policies).
+            The policy moves all opponents at once from the world arrays.
+    """
 
-    def _step(self,action):
-        pass
+    def __init__(self, opponent_policy='nearest_flag', **kwargs):
+        """ Accepts the arguments of CtfEnv.
 
-    def _reset(self):
-        pass
+        Args:
+            opponent_policy (str or function): Name in policies.POLICIES, or a
+                function (world, agent indices) -> move vectors.
+        """
+        if not callable(opponent_policy):
+            opponent_policy = policies.POLICIES[opponent_policy]
+        self.opponent_policy = opponent_policy
+        super().__init__(**kwargs)
 
-    def _render(self, mode='human', close=False):
-        if close:
-            if self.viewer is not None:
-                self.viewer.close()
-                self.viewer = None
+        agent_count = int(np.sum(self.number_agents_per_team))
+        self.learner_count = self.action_agent_count()
+        self.opponents = np.arange(self.learner_count, agent_count)
+        self.step_types = np.full(agent_count, command.MOVE, dtype=int)
+        self.step_vectors = np.zeros((agent_count, 2))
+        self.learner_captures = 0
 
-        if self.viewer == None:
-            from gym.envs.classic_control import rendering
-            self.viewer = rendering.Viewer(600, 400)
+    def action_agent_count(self):
+        return int(self.number_agents_per_team[0])
 
-        return self.viewer.render(return_rgb_array = mode == 'rgb_array')
+    def _step(self, action):
+        """ Moves the learner's team by action and the other teams by the
+                opponent policy.
+
+        Args:
+            action: Actions of the first team only, in the format of the
+                action mode (see CtfEnv._step).
+
+        Returns:
+            observation (see CtfEnv._step)
+            reward (float): Flags the learner's team took in this step.
+            done (boolean): whether epoch is done
+            info (dict): 'team_captures' holds the flags taken by every team
+                so far; 'profile' and 'episode_stats' are as in CtfEnv._step.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            step_start = profiler.begin_step()
+            start = profiler.start()
+        self.set_learner_actions(action)
+        if profiler is not None:
+            start = profiler.lap('validate', start)
+        self.step_vectors[self.learner_count:] = self.opponent_policy(
+            self.world, self.opponents)
+        if profiler is not None:
+            profiler.lap('opponent', start)
+        self.world.world_step_arrays(self.step_vectors, self.step_types)
+
+        captures = self.world.get_reward()
+        reward = float(captures[0] - self.learner_captures)
+        self.learner_captures = captures[0]
+        done = self.is_done()
+        info = self.episode_info(done)
+        info['team_captures'] = captures
+        if profiler is None:
+            return self.get_observation(), reward, done, info
+
+        start = profiler.start()
+        obs = self.get_observation()
+        profiler.lap('observation', start)
+        profiler.lap('step', step_start)
+        info['profile'] = profiler.end_step()
+        return obs, reward, done, info
+
+    def set_learner_actions(self, action):
+        """ Checks the learner's actions and writes them into the first rows
+                of the step arrays.
+        """
+        learner = slice(0, self.learner_count)
+        if self.action_mode == 'array':
+            action_types = None
+            if isinstance(action, tuple):
+                action_types, action = action
+            if self.validate_actions:
+                self.check_array_action(action, action_types)
+            self.step_vectors[learner] = action
+            self.step_types[learner] = command.MOVE if action_types is None else action_types
+            return
+        assert self.action_space.contains(action), "%r (%s) invalid" % (action, type(action))
+        for i, a in enumerate(action):
+            self.step_types[i] = a[0]
+            self.step_vectors[i] = a[1]
+
+    def _reset(self, randomize=None, scenario=None):
+        self.learner_captures = 0
+        return super()._reset(randomize, scenario)
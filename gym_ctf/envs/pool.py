@@ -0,0 +1,271 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .ctf_env import CtfEnv
+
+class CtfEnvPool():
+    """ Pool of worker processes, each hosting a shard of CtfEnv instances.
+
+        Actions, observations, rewards and dones are exchanged through
+        shared memory arrays: a step copies the actions into shared memory and
+        sends one short command per worker over a pipe. Workers step their
+        envs in 'array' action mode and 'flat' observation mode and write the
+        results in place. Finished envs are reset by their worker.
+
+        A worker that dies is restarted with the same seed. Its envs are
+        rebuilt and reset, and reported as done with zero reward; the worker
+        index is listed in info['restarted'].
+
+        A worker whose step raises resets every env of its shard, so none is
+        left a step ahead of the others, and writes them as done with zero
+        reward. The exception is then raised by step (or step_wait) once
+        every worker has replied; the other shards have stepped.
+    """
+
+    def __init__(self, num_envs, num_workers=None, env_kwargs=None, seed=0,
+                 copy=True, context=None):
+        """
+        Args:
+            num_envs (int): Total number of envs.
+            num_workers (int): Worker processes. One per CPU if None.
+            env_kwargs (dict): Keyword arguments of every CtfEnv.
+            seed (int): Base seed. Env i is seeded with seed + i.
+            copy (boolean): Return copies of the shared observation, reward
+                            and done arrays. If False, they are overwritten by
+                            the next step.
+            context (str): multiprocessing start method. Default if None.
+        """
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers, num_envs)
+        self.env_kwargs = dict(env_kwargs or {})
+        self.env_kwargs.update(observation_mode='flat', action_mode='array')
+        self.seed = seed
+        self.copy = copy
+        self.ctx = multiprocessing.get_context(context)
+        self.closed = False
+        self.waiting = False
+
+        probe = CtfEnv(**self.env_kwargs)
+        self.observation_space = probe.observation_space
+        self.action_space = probe.action_space
+        self.num_teams = probe.num_teams
+
+        self.create_buffers()
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        self.shards = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.processes = [None] * self.num_workers
+        self.pipes = [None] * self.num_workers
+        for i in range(self.num_workers):
+            self.start_worker(i)
+
+    def create_buffers(self):
+        n = self.num_envs
+        self.layout = {
+            'actions': ((n,) + self.action_space.shape, np.float32),
+            'observations': ((n,) + self.observation_space.shape, np.float32),
+            'rewards': ((n, self.num_teams), np.float32),
+            'dones': ((n,), np.bool_),
+        }
+        self.memory = {}
+        self.arrays = {}
+        for name, (shape, dtype) in self.layout.items():
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            self.memory[name] = shared_memory.SharedMemory(create=True, size=size)
+            self.arrays[name] = np.ndarray(shape, dtype, self.memory[name].buf)
+            self.arrays[name][...] = 0
+
+    def start_worker(self, index):
+        parent, child = self.ctx.Pipe()
+        names = {name: (m.name, self.layout[name]) for name, m in self.memory.items()}
+        start, stop = self.shards[index]
+        process = self.ctx.Process(target=_worker, daemon=True,
+                                   args=(child, names, self.env_kwargs,
+                                         self.seed + start, start, stop))
+        process.start()
+        child.close()
+        self.processes[index] = process
+        self.pipes[index] = parent
+
+    def restart_worker(self, index):
+        """ Replaces a dead worker. Its envs come back reset. """
+        self.pipes[index].close()
+        self.processes[index].join(timeout=1)
+        self.start_worker(index)
+        self.call(index, 'reset')
+        if not self.result(index):
+            raise RuntimeError("worker %d failed to restart" % index)
+        start, stop = self.shards[index]
+        self.arrays['rewards'][start:stop] = 0
+        self.arrays['dones'][start:stop] = True
+
+    def call(self, index, command):
+        try:
+            self.pipes[index].send(command)
+        except (BrokenPipeError, OSError):
+            pass
+
+    def result(self, index):
+        """ Waits for the reply of a worker.
+
+        Returns:
+            boolean. False if the worker died.
+        """
+        reply = self.reply(index)
+        if isinstance(reply, BaseException):
+            raise reply
+        return reply is not False
+
+    def reply(self, index):
+        """ Waits for the reply of a worker: None on success, the exception
+                raised by the worker, or False if the worker died.
+        """
+        try:
+            return self.pipes[index].recv()
+        except (EOFError, ConnectionResetError, OSError):
+            return False
+
+    def gather(self):
+        """ Waits for the replies of every worker, restarts the dead ones,
+                then raises the first exception raised by a worker. Every
+                reply is read first, so no stale reply is left in a pipe.
+
+        Returns:
+            list of ints. Restarted workers.
+        """
+        replies = [self.reply(i) for i in range(self.num_workers)]
+        restarted = [i for i, r in enumerate(replies) if r is False]
+        for i in restarted:
+            self.restart_worker(i)
+        for r in replies:
+            if isinstance(r, BaseException):
+                raise r
+        return restarted
+
+    def broadcast(self, command):
+        for i in range(self.num_workers):
+            self.call(i, command)
+        return self.gather()
+
+    def reset(self):
+        assert not self.waiting, "step_wait pending"
+        self.broadcast('reset')
+        return self.output(self.arrays['observations'])
+
+    def step_async(self, actions):
+        """ Starts a step of every env.
+
+        Args:
+            actions (np array, num_envs x agents x 2): Move vectors.
+        """
+        assert not self.waiting, "step_wait pending"
+        self.arrays['actions'][...] = actions
+        for i in range(self.num_workers):
+            self.call(i, 'step')
+        self.waiting = True
+
+    def step_wait(self):
+        """ Waits for the step started by step_async.
+
+        Returns:
+            observations (np array, num_envs x obs_dim)
+            rewards (np array, num_envs x num_teams)
+            dones (np array of booleans, num_envs)
+            info (dict)
+        """
+        assert self.waiting, "step_async not called"
+        self.waiting = False
+        restarted = self.gather()
+        return (self.output(self.arrays['observations']),
+                self.output(self.arrays['rewards']),
+                self.output(self.arrays['dones']),
+                {'restarted': restarted})
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def output(self, array):
+        return array.copy() if self.copy else array
+
+    def close(self):
+        """ Stops the workers and frees the shared memory. """
+        if self.closed:
+            return
+        if self.waiting:
+            for i in range(self.num_workers):
+                self.reply(i)
+            self.waiting = False
+        for i in range(self.num_workers):
+            self.call(i, 'close')
+        for process, pipe in zip(self.processes, self.pipes):
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            pipe.close()
+        self.arrays = {}
+        for m in self.memory.values():
+            m.close()
+            m.unlink()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
+
+
+def _worker(pipe, names, env_kwargs, seed, start, stop):
+    memory = {}
+    arrays = {}
+    for name, (memory_name, (shape, dtype)) in names.items():
+        memory[name] = shared_memory.SharedMemory(name=memory_name)
+        arrays[name] = np.ndarray(shape, dtype, memory[name].buf)[start:stop]
+
+    envs = [CtfEnv(seed=seed + i, **env_kwargs) for i in range(stop - start)]
+
+    try:
+        while True:
+            command = pipe.recv()
+            if command == 'close':
+                break
+            try:
+                _run(command, envs, arrays)
+            except Exception as e:
+                if command == 'step':
+                    _run('reset', envs, arrays)
+                    arrays['dones'][...] = True
+                pipe.send(e)
+                continue
+            pipe.send(None)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        arrays = None
+        for m in memory.values():
+            m.close()
+        pipe.close()
+
+def _run(command, envs, arrays):
+    if command == 'step':
+        for i, env in enumerate(envs):
+            obs, reward, done, _ = env._step(arrays['actions'][i])
+            if done:
+                obs = env._reset()
+            arrays['observations'][i] = obs
+            arrays['rewards'][i] = reward
+            arrays['dones'][i] = done
+    elif command == 'reset':
+        for i, env in enumerate(envs):
+            arrays['observations'][i] = env._reset()
+        arrays['rewards'][...] = 0
+        arrays['dones'][...] = False
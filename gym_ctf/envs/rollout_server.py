@@ -0,0 +1,248 @@
+""" Rollout server hosting a set of worlds for many actor processes.
+
+    Clients connect over a Unix domain socket and each is given one world,
+    which is reset when the client disconnects. Step requests that arrive in the same tick are coalesced into one
+    VecCtfEnv.step over the requesting worlds.
+
+    Wire protocol. Every message is a header (HEADER: message type, payload
+    length) followed by the payload. Arrays are sent as raw little-endian
+    bytes.
+        HELLO  request:  empty
+               response: HELLO_REPLY (world, agents, obs_dim, num_teams);
+                         world is -1 if all worlds are taken
+        RESET  request:  empty
+               response: observation (float32, obs_dim)
+        STEP   request:  move vectors (float32, agents x 2)
+               response: observation (float32, obs_dim),
+                         reward (float32, num_teams), done (uint8)
+        ERROR  response: utf-8 message
+"""
+import argparse
+import asyncio
+import socket
+import struct
+import numpy as np
+
+from .vec_ctf_env import VecCtfEnv
+
+HELLO = 0
+RESET = 1
+STEP = 2
+ERROR = 255
+
+HEADER = struct.Struct('<BI')
+HELLO_REPLY = struct.Struct('<iIII')
+
+class RolloutServer():
+    """ Serves step and reset requests for num_worlds worlds.
+
+    Args:
+        path (str): Unix socket path.
+        num_worlds (int): Worlds hosted, i.e. maximum number of clients.
+        tick (double): Seconds to wait for more step requests after the first
+            one of a batch. 0 coalesces the requests read in the same event
+            loop iteration. A batch is stepped early once every connected
+            client has a request pending.
+        env_kwargs: Keyword arguments of VecCtfEnv.
+    """
+    def __init__(self, path, num_worlds, tick=0.0, **env_kwargs):
+        self.path = path
+        self.tick = tick
+        self.env = VecCtfEnv(num_worlds, copy=False, **env_kwargs)
+        self.free = list(range(num_worlds))
+        self.clients = 0
+        self.pending = {}
+        self.flush_handle = None
+        self.server = None
+        self.handlers = set()
+        self.steps = 0
+        self.batches = 0
+
+    async def start(self):
+        self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+
+    async def shutdown(self):
+        """ Stops accepting clients and disconnects the connected ones. """
+        self.close()
+        for task in list(self.handlers):
+            task.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+
+    async def handle(self, reader, writer):
+        world = None
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                kind, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+                payload = await reader.readexactly(length)
+                if kind == HELLO:
+                    if world is None and self.free:
+                        world = self.free.pop(0)
+                        self.clients += 1
+                    reply = HELLO_REPLY.pack(-1 if world is None else world,
+                                             self.env.number_agents,
+                                             self.env.obs.shape[1],
+                                             self.env.num_teams)
+                elif world is None:
+                    kind, reply = ERROR, b'no world assigned'
+                elif kind == RESET:
+                    reply = self.reset_world(world)
+                elif kind == STEP:
+                    actions = np.frombuffer(payload, '<f4')
+                    if actions.size != self.env.number_agents * 2:
+                        kind, reply = ERROR, b'wrong action size'
+                    else:
+                        try:
+                            reply = await self.submit(world, actions)
+                        except Exception as e:
+                            kind, reply = ERROR, str(e).encode()
+                else:
+                    kind, reply = ERROR, b'unknown message type'
+                writer.write(HEADER.pack(kind, len(reply)) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            if world is not None:
+                self.pending.pop(world, None)
+                self.env.reset_worlds([world])
+                self.free.append(world)
+                self.clients -= 1
+            writer.close()
+
+    def reset_world(self, world):
+        self.env.reset_worlds([world])
+        return self.env.get_observation([world])[0].astype('<f4').tobytes()
+
+    def submit(self, world, actions):
+        """ Queues a step of world and returns a future of the reply. """
+        future = asyncio.get_running_loop().create_future()
+        self.pending[world] = (actions, future)
+        if len(self.pending) >= self.clients:
+            self.flush()
+        elif self.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.tick > 0:
+                self.flush_handle = loop.call_later(self.tick, self.flush)
+            else:
+                self.flush_handle = loop.call_soon(self.flush)
+        return future
+
+    def flush(self):
+        """ Steps every world with a pending request in one vectorized step. """
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if not self.pending:
+            return
+        worlds = list(self.pending)
+        requests = [self.pending.pop(w) for w in worlds]
+        try:
+            actions = np.stack([a for a, _ in requests])
+            actions = actions.reshape(len(worlds), self.env.number_agents, 2)
+            obs, reward, done, _ = self.env.step(actions, indices=worlds)
+        except Exception as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        obs = obs.astype('<f4')
+        reward = reward.astype('<f4')
+        done = done.astype(np.uint8)
+        for i, (_, future) in enumerate(requests):
+            if not future.done():
+                future.set_result(obs[i].tobytes() + reward[i].tobytes() +
+                                  done[i].tobytes())
+        self.steps += len(worlds)
+        self.batches += 1
+
+
+class RolloutClient():
+    """ Blocking client of a RolloutServer. """
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        reply = self.request(HELLO)
+        self.world, self.agents, self.obs_dim, self.num_teams = \
+            HELLO_REPLY.unpack(reply)
+        if self.world < 0:
+            self.close()
+            raise RuntimeError('rollout server has no free world')
+
+    def request(self, kind, payload=b''):
+        self.sock.sendall(HEADER.pack(kind, len(payload)) + payload)
+        reply_kind, length = HEADER.unpack(self._recv(HEADER.size))
+        reply = self._recv(length)
+        if reply_kind == ERROR:
+            raise RuntimeError(reply.decode())
+        return reply
+
+    def _recv(self, size):
+        data = bytearray(size)
+        view = memoryview(data)
+        while size:
+            received = self.sock.recv_into(view, size)
+            if received == 0:
+                raise ConnectionError('rollout server closed the connection')
+            view = view[received:]
+            size -= received
+        return data
+
+    def reset(self):
+        return np.frombuffer(self.request(RESET), '<f4')
+
+    def step(self, actions):
+        """
+        Args:
+            actions (np array, agents x 2): Move vectors.
+
+        Returns:
+            observation (np array), reward (np array), done (boolean)
+        """
+        payload = np.ascontiguousarray(actions, '<f4').tobytes()
+        reply = self.request(STEP, payload)
+        obs = np.frombuffer(reply, '<f4', self.obs_dim)
+        reward = np.frombuffer(reply, '<f4', self.num_teams, self.obs_dim * 4)
+        return obs, reward, bool(reply[-1])
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def serve(path, num_worlds, tick=0.0, **env_kwargs):
+    """ Runs a RolloutServer until interrupted. """
+    server = RolloutServer(path, num_worlds, tick, **env_kwargs)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('num_worlds', type=int)
+    parser.add_argument('--tick', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    serve(args.path, args.num_worlds, args.tick, seed=args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+""" Parameter sweeps: many episodes of many CtfEnv configurations, played by
+        scripted policies (gym_ctf.state.policies) in a process pool.
+
+    The episodes of every configuration are split into tasks of
+    episodes_per_task episodes. A task is seeded from (seed, config, task
+    number) alone, so results do not depend on which worker plays it or in
+    which order tasks finish.
+
+    Results stream into a directory with one raw file per column
+    (<column>.bin, one row per episode, appended as tasks finish), a task log
+    (tasks.bin, int64 (task id, rows after the task) pairs) and meta.json
+    (configurations, columns). Running a sweep into a directory that holds
+    part of it drops rows of unfinished tasks and plays only the tasks not yet
+    logged.
+"""
+import itertools
+import json
+import multiprocessing
+import os
+import numpy as np
+
+from ..state import policies
+from .ctf_env import CtfEnv
+
+META = 'meta.json'
+TASKS = 'tasks.bin'
+
+def grid(**axes):
+    """ Configurations of every combination of the values of the axes.
+
+    Args:
+        axes: Keyword argument of CtfEnv (or 'policies') to a list of values.
+
+    Returns:
+        [dict]. One configuration per combination, the last axis varying
+            fastest.
+    """
+    names = list(axes)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(axes[n] for n in names))]
+
+def sweep_columns(max_teams):
+    """ Columns of a sweep: (name, dtype, row shape). Captures of missing
+            teams are -1.
+    """
+    return [('config', 'int32', ()),
+            ('episode', 'int64', ()),
+            ('length', 'int32', ()),
+            ('captures', 'int32', (max_teams,)),
+            ('winner', 'int8', ())]
+
+def team_count(config):
+    return len(config.get('number_agents_per_team', (4, 4)))
+
+def task_seed(seed, config_index, task):
+    return np.random.SeedSequence([seed, config_index, task])
+
+def play_task(config, max_teams, seed, first_episode, episodes):
+    """ Plays episodes of one configuration.
+
+    Args:
+        config (dict): CtfEnv keyword arguments, and 'policies', one name of
+            policies.POLICIES per team (all 'nearest_flag' if missing).
+        seed (np.random.SeedSequence): Seed of the layouts.
+        first_episode (int): Number of the first episode in its configuration.
+
+    Returns:
+        dict. Column name to np array, one row per episode.
+    """
+    config = dict(config)
+    names = config.pop('policies', None)
+    env = CtfEnv(observation_mode='flat', action_mode='array', **config)
+    env.np_random = np.random.Generator(np.random.PCG64(seed))
+    w = env.world
+    if names is None:
+        names = ['nearest_flag'] * env.num_teams
+    assert len(names) == env.num_teams, "one policy per team"
+    team_policies = [(policies.POLICIES[n], np.flatnonzero(w.agent_team_index == t))
+                     for t, n in enumerate(names)]
+    vectors = np.zeros((len(w.agent_positions), 2))
+
+    columns = {name: np.zeros((episodes,) + shape, dtype)
+               for name, dtype, shape in sweep_columns(max_teams)}
+    columns['captures'][:] = -1
+    for i in range(episodes):
+        env._reset(randomize=True)
+        done = False
+        while not done:
+            for policy, agents in team_policies:
+                vectors[agents] = policy(w, agents)
+            _, captures, done, _ = env._step(vectors)
+        columns['length'][i] = w.time
+        columns['captures'][i, :len(captures)] = captures
+        leaders = np.flatnonzero(captures == captures.max())
+        columns['winner'][i] = leaders[0] if len(leaders) == 1 else -1
+    columns['episode'][:] = np.arange(first_episode, first_episode + episodes)
+    return columns
+
+def _play(args):
+    task_id, config_index, config, max_teams, seed, first_episode, episodes = args
+    columns = play_task(config, max_teams, seed, first_episode, episodes)
+    columns['config'][:] = config_index
+    return task_id, columns
+
+class SweepRunner():
+    """ Plays a sweep into a results directory.
+
+    Args:
+        path (str): Results directory. An existing sweep in it is resumed;
+                    its configurations and seed must match.
+        configs ([dict]): Configurations (see play_task), e.g. from grid.
+        episodes (int): Episodes per configuration.
+        episodes_per_task (int): Episodes per work unit.
+        seed (int): Base seed.
+        workers (int): Worker processes. One per CPU if None, none (play in
+                       this process) if 0.
+        chunksize (int): Tasks sent to a worker at a time.
+        context (str): multiprocessing start method. Default if None.
+    """
+    def __init__(self, path, configs, episodes, episodes_per_task=8, seed=0,
+                 workers=None, chunksize=1, context=None):
+        assert episodes > 0 and episodes_per_task > 0
+        self.path = path
+        self.configs = [dict(c) for c in configs]
+        self.episodes = episodes
+        self.episodes_per_task = episodes_per_task
+        self.seed = seed
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        self.workers = workers
+        self.chunksize = chunksize
+        self.context = context
+        self.max_teams = max(team_count(c) for c in self.configs)
+        self.columns = sweep_columns(self.max_teams)
+        self.tasks_per_config = -(-episodes // episodes_per_task)
+
+        os.makedirs(path, exist_ok=True)
+        self.meta = {'configs': self.configs, 'episodes': episodes,
+                     'episodes_per_task': episodes_per_task, 'seed': seed,
+                     'columns': [[n, d, list(s)] for n, d, s in self.columns]}
+        meta_path = os.path.join(path, META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                assert json.load(f) == json.loads(json.dumps(self.meta)), \
+                    "%s holds another sweep" % path
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump(self.meta, f, indent=1)
+        self.recover()
+
+    def column_path(self, name):
+        return os.path.join(self.path, name + '.bin')
+
+    def recover(self):
+        """ Reads the task log and truncates the columns to the rows of the
+                logged tasks, dropping a task interrupted while writing.
+        """
+        tasks_path = os.path.join(self.path, TASKS)
+        log = np.zeros(0, dtype=np.int64)
+        if os.path.exists(tasks_path):
+            log = np.fromfile(tasks_path, dtype=np.int64)
+            log = log[:len(log) // 2 * 2]
+            with open(tasks_path, 'r+b') as f:
+                f.truncate(log.nbytes)
+        log = log.reshape(-1, 2)
+        self.done = set(log[:, 0].tolist())
+        self.rows = int(log[-1, 1]) if len(log) else 0
+        for name, dtype, shape in self.columns:
+            with open(self.column_path(name), 'ab') as f:
+                f.truncate(self.rows * np.dtype(dtype).itemsize * int(np.prod(shape)))
+
+    def tasks(self):
+        """ Arguments of every task not yet logged. """
+        for config_index, config in enumerate(self.configs):
+            for task in range(self.tasks_per_config):
+                task_id = config_index * self.tasks_per_config + task
+                if task_id in self.done:
+                    continue
+                first = task * self.episodes_per_task
+                episodes = min(self.episodes_per_task, self.episodes - first)
+                yield (task_id, config_index, config, self.max_teams,
+                       task_seed(self.seed, config_index, task), first,
+                       episodes)
+
+    def write(self, task_id, columns):
+        """ Appends the rows of a task, then logs the task. """
+        for name, _, _ in self.columns:
+            with open(self.column_path(name), 'ab') as f:
+                columns[name].tofile(f)
+        self.rows += len(columns['episode'])
+        with open(os.path.join(self.path, TASKS), 'ab') as f:
+            np.array([task_id, self.rows], dtype=np.int64).tofile(f)
+        self.done.add(task_id)
+
+    def run(self, max_tasks=None):
+        """ Plays the tasks not yet logged, writing each as it finishes.
+
+        Args:
+            max_tasks (int): Stop after this many tasks. All if None.
+
+        Returns:
+            int. Tasks played.
+        """
+        tasks = list(itertools.islice(self.tasks(), max_tasks))
+        if self.workers == 0 or len(tasks) <= 1:
+            for task in tasks:
+                self.write(*_play(task))
+            return len(tasks)
+        ctx = multiprocessing.get_context(self.context)
+        with ctx.Pool(min(self.workers, len(tasks))) as pool:
+            for task_id, columns in pool.imap_unordered(_play, tasks,
+                                                        self.chunksize):
+                self.write(task_id, columns)
+        return len(tasks)
+
+    def finished(self):
+        return len(self.done) == len(self.configs) * self.tasks_per_config
+
+def read_sweep(path):
+    """ Results of a sweep directory.
+
+    Returns:
+        (dict, dict). Column name to np array (one row per finished episode,
+            in the order tasks finished) and the sweep meta data, with the
+            configurations.
+    """
+    with open(os.path.join(path, META)) as f:
+        meta = json.load(f)
+    tasks_path = os.path.join(path, TASKS)
+    rows = 0
+    if os.path.exists(tasks_path):
+        tasks = np.fromfile(tasks_path, dtype=np.int64)
+        if len(tasks) >= 2:
+            rows = int(tasks[len(tasks) // 2 * 2 - 1])
+    columns = {}
+    for name, dtype, shape in meta['columns']:
+        data = np.fromfile(os.path.join(path, name + '.bin'), dtype=dtype,
+                           count=rows * int(np.prod(shape)))
+        columns[name] = data.reshape((rows,) + tuple(shape))
+    return columns, meta
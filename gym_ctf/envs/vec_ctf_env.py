@@ -0,0 +1,247 @@
+import numpy as np
+from gym import spaces
+from gym.utils import seeding
+
+from ..state import agent
+from ..state import flag
+from ..state import layout
+from ..state import observation
+from ..state import raster
+from ..state import scoring
+from ..state import world
+
+class VecCtfEnv():
+    """ N independent capture the flag games stepped together. The state of
+            all games is held in stacked arrays (leading dimension N) and
+            advanced with the same movement and scoring rules as World.
+
+        Finished games are reset automatically: the observation returned for
+        them is the first observation of the next game, and the final
+        observation is reported in info['terminal_observation']. As with
+        World.reset, a reset returns flags to their original state and zeros
+        the clock; agents and flag positions are kept unless
+        randomize_on_reset is set, in which case the new layouts of all reset
+        games are drawn in one call.
+    """
+
+    def __init__(self, num_envs, world_width=100, world_height=100,
+                 number_agents_per_team=(4, 4), number_flags=10,
+                 flag_radius=None, time_to_score=5, time_limit=10, seed=None,
+                 copy=True, randomize_on_reset=False,
+                 end_on_all_captured=False):
+        """
+        Args:
+            num_envs (int): Number of games.
+            world_width, world_height (int): Size of every world.
+            number_agents_per_team (sequence of ints): Agents on each team.
+            number_flags (int): Flags per world.
+            flag_radius (double): Scoring radius. World default if None.
+            time_to_score (int): Steps needed to take a flag.
+            time_limit (int): Steps per game.
+            seed (int): Seed of the layout generator.
+            copy (boolean): Return a copy of the observation buffer. If False,
+                            the returned array is overwritten by the next step.
+            randomize_on_reset (boolean): Draw new layouts for the games that
+                                          are reset, including auto-resets.
+            end_on_all_captured (boolean): A game is also done once every
+                                           flag has been taken.
+        """
+        self.num_envs = num_envs
+        self.world_width = world_width
+        self.world_height = world_height
+        self.number_agents_per_team = np.array(number_agents_per_team)
+        self.num_teams = self.number_agents_per_team.size
+        self.number_agents = int(np.sum(self.number_agents_per_team))
+        self.number_flags = number_flags
+        if flag_radius is None:
+            flag_radius = world.default_scoring_radius(number_flags, world_width,
+                                                       world_height)
+        self.flag_radius = flag_radius
+        self.time_to_score = time_to_score
+        self.time_limit = time_limit
+        self.copy = copy
+        self.randomize_on_reset = randomize_on_reset
+        self.end_on_all_captured = end_on_all_captured
+
+        self.team_ids = np.arange(1, self.num_teams + 1)
+        self.agent_team_index = np.repeat(np.arange(self.num_teams),
+                                          self.number_agents_per_team)
+        self.agent_teams = np.broadcast_to(self.team_ids[self.agent_team_index],
+                                           (num_envs, self.number_agents))
+
+        self.set_observation_space()
+        self.set_action_space()
+
+        self.seed(seed)
+        self.create_worlds()
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return [seed]
+
+    def set_observation_space(self):
+        obs_low, obs_high = observation.observation_bounds(
+            self.world_width, self.world_height, self.num_teams,
+            self.number_agents, self.number_flags, self.time_limit)
+        self.single_observation_space = spaces.Box(obs_low, obs_high,
+                                                   dtype=np.float32)
+        self.observation_space = spaces.Box(
+            np.tile(obs_low, (self.num_envs, 1)),
+            np.tile(obs_high, (self.num_envs, 1)), dtype=np.float32)
+        self.obs = np.zeros((self.num_envs, obs_low.size), dtype=np.float32)
+
+    def set_action_space(self):
+        shape = (self.number_agents, 2)
+        self.single_action_space = spaces.Box(-1, 1, shape, dtype=np.float32)
+        self.action_space = spaces.Box(-1, 1, (self.num_envs,) + shape,
+                                       dtype=np.float32)
+
+    def create_worlds(self):
+        """ Generates a random layout (integer agent and flag positions within
+                the world, as Flag.random_pos) for every game.
+        """
+        n = self.num_envs
+        self.agent_positions, self.flag_positions = layout.generate_layouts(
+            self.np_random, n, self.world_width, self.world_height,
+            self.number_agents, self.number_flags)
+        self.agent_orientations = np.zeros((n, self.number_agents))
+        self.flag_radii = np.full((n, self.number_flags), float(self.flag_radius))
+        self.flag_taken = np.zeros((n, self.number_flags), dtype=bool)
+        self.flag_teams = np.full((n, self.number_flags), flag.NO_TEAM)
+        self.flag_scoring_counts = np.zeros((n, self.number_flags), dtype=int)
+        self.time = np.zeros(n, dtype=int)
+
+    def reset(self, randomize=None):
+        """ Resets every game.
+
+        Args:
+            randomize (boolean): Draw new layouts. randomize_on_reset if None.
+        """
+        self.reset_worlds(np.ones(self.num_envs, dtype=bool), randomize)
+        return self.get_observation()
+
+    def reset_worlds(self, games, randomize=None):
+        """ Resets the selected games (see World.reset).
+
+        Args:
+            games (np array of booleans or ints): Mask or indices of games.
+            randomize (boolean): Draw new layouts for the selected games in
+                one call. randomize_on_reset if None.
+        """
+        if randomize is None:
+            randomize = self.randomize_on_reset
+        if randomize:
+            games = np.arange(self.num_envs)[games]
+            agents, flags = layout.generate_layouts(
+                self.np_random, len(games), self.world_width,
+                self.world_height, self.number_agents, self.number_flags)
+            self.agent_positions[games] = agents
+            self.agent_orientations[games] = 0
+            self.flag_positions[games] = flags
+        self.flag_taken[games] = False
+        self.flag_teams[games] = flag.NO_TEAM
+        self.flag_scoring_counts[games] = 0
+        self.time[games] = 0
+
+    STEPPED = ('agent_positions', 'agent_orientations', 'flag_taken',
+               'flag_teams', 'flag_scoring_counts')
+
+    def step(self, actions, indices=None):
+        """ Moves every agent of every game, scores flags and advances time.
+
+        Args:
+            actions (np array, N x agents x 2): Move vector of every agent.
+            indices (np array of ints): Step only these games, in this order.
+                actions then has one row per index, and the other games do
+                not advance. All games if None.
+
+        Returns:
+            observation (np array, N x obs_dim)
+            reward (np array, N x num_teams): Flags taken per team.
+            done (np array of booleans, N)
+            info (dict)
+        """
+        games = slice(None) if indices is None else np.asarray(indices)
+        state = [getattr(self, name)[games] for name in self.STEPPED]
+        positions, orientations, taken, teams, scoring_counts = state
+
+        agent.move(positions, orientations, actions)
+        counts = scoring.team_counts(self.flag_positions[games],
+                                     self.flag_radii[games], positions,
+                                     self.agent_team_index, self.num_teams)
+        scoring.update_flags(counts, self.team_ids, taken, teams,
+                             scoring_counts, self.time_to_score)
+        if indices is not None:
+            for name, value in zip(self.STEPPED, state):
+                getattr(self, name)[games] = value
+        self.time[games] += 1
+
+        reward = self.get_reward()[games]
+        done = self.time[games] >= self.time_limit
+        if self.end_on_all_captured:
+            done |= self.flag_taken[games].all(axis=-1)
+        info = {}
+        if done.any():
+            finished = np.arange(self.num_envs)[games][done]
+            info['terminal_observation'] = self.get_observation(finished)
+            self.reset_worlds(finished)
+
+        if indices is None:
+            return self.get_observation(), reward, done, info
+        return self.get_observation(games), reward, done, info
+
+    def get_reward(self):
+        """ Flags taken per team in every game (see World.get_reward).
+
+        Returns:
+            np array of ints, N x num_teams.
+        """
+        owners = np.where(self.flag_taken, self.flag_teams, flag.NO_TEAM)
+        return (owners[..., None] == self.team_ids).sum(axis=1)
+
+    def get_observation(self, indices=None):
+        """ Writes the observation of every game into self.obs.
+
+        Args:
+            indices (np array of ints): Write only these games and return
+                their rows, in this order. All games if None.
+
+        Returns:
+            np array, N x obs_dim. A copy of the written rows if indices are
+                given or copy is set, a view of self.obs otherwise.
+        """
+        if indices is None:
+            observation.write_observation(self.obs, self.agent_positions,
+                                          self.agent_orientations, self.agent_teams,
+                                          self.flag_positions, self.flag_taken,
+                                          self.flag_teams, self.time)
+            return self.obs.copy() if self.copy else self.obs
+        games = np.asarray(indices)
+        obs = self.obs[games]
+        observation.write_observation(obs, self.agent_positions[games],
+                                      self.agent_orientations[games],
+                                      self.agent_teams[games],
+                                      self.flag_positions[games],
+                                      self.flag_taken[games],
+                                      self.flag_teams[games], self.time[games])
+        self.obs[games] = obs
+        return obs
+
+    def render(self, indices=None, frame_width=600, frame_height=400, out=None):
+        """ Draws games with the NumPy rasterizer, without a display.
+
+        Args:
+            indices (np array of ints): Games to draw. All if None.
+            frame_width, frame_height (int): Size of the frames in pixels.
+            out (np array of uint8): Frames to draw into. Allocated if None.
+
+        Returns:
+            np array of uint8, N x frame_height x frame_width x 3.
+        """
+        games = slice(None) if indices is None else np.asarray(indices)
+        return raster.render_frames(
+            self.world_width, self.world_height, self.agent_positions[games],
+            self.agent_orientations[games], self.agent_teams[games],
+            self.flag_positions[games], self.flag_radii[games],
+            self.flag_taken[games], self.flag_teams[games],
+            raster.palette(self.num_teams), frame_width, frame_height, out)
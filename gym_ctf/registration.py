@@ -0,0 +1,25 @@
+""" Gym registration of the gym_ctf environments.
+
+    Kept apart from gym_ctf/__init__.py so that importing the simulation core
+    (gym_ctf.state) does not import gym. register_envs runs when gym loads its
+    environment plugins (the 'gym.envs' entry point of an installed
+    gym_ctf), when gym_ctf is imported after gym, and when gym_ctf.envs is
+    imported.
+"""
+
+def register_envs():
+    """ Registers ctf-v0, ctf-singleteam-v0 and the presets
+            (ctf-<name>-v0). Ids already registered are left alone.
+    """
+    from gym.envs.registration import register, registry
+    from . import PRESETS
+
+    specs = {'ctf-v0': dict(entry_point='gym_ctf.envs:CtfEnv'),
+             'ctf-singleteam-v0': dict(entry_point='gym_ctf.envs:CtfSingleTeamEnv')}
+    for name, kwargs in PRESETS.items():
+        specs['ctf-%s-v0' % name] = dict(
+            entry_point='gym_ctf.envs:CtfEnv',
+            kwargs=dict(kwargs, observation_mode='flat', action_mode='array'))
+    for env_id, spec in specs.items():
+        if env_id not in registry:
+            register(id=env_id, **spec)
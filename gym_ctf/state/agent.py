@@ -1,6 +1,14 @@
 import numpy as np
+from .view import ArrayField, ArrayView
+
+class Agent(ArrayView):
+    """ An agent is a (x, y, theta) tuple on a team. Once added to a World,
+            its state is a view into the World's agent arrays.
+    """
+    loc = ArrayField('agent_positions')
+    orientation = ArrayField('agent_orientations', float)
+    team = ArrayField('agent_teams', int)
 
-class Agent():
     def __init__(self, location=(0,0), orientation=0, team=1):
         self.loc = location
         self.orientation = orientation
@@ -14,6 +22,8 @@ class Agent():
           (x,y,theta) tuple with move command.
         """
         loc = instance.loc
+        if instance.bound:
+            loc = loc.copy()
         ori = instance.orientation
         team = instance.team
         return cls(loc, ori, team)
@@ -90,21 +100,10 @@ class Agent():
         Returns:
             Array of Double Tuples: CW points starting from forward point.
         """
-        if h is None:
-            h = b
-
-        dx = np.cos(self.orientation)
-        dy = np.sin(self.orientation)
         x = self.loc[0] * scale_x
         y = self.loc[1] * scale_y
-        top = (x + dx * 0.5 * h, y + dy * 0.5 * h)
-        base_midpoint = (x - dx * 0.5 * h, y - dy * 0.5 * h)
-        base_line = (dy, -dx)
-        base_dx = base_line[0] * 0.5 * b
-        base_dy = base_line[1] * 0.5 * b
-        pt2 = (base_midpoint[0] + base_dx, base_midpoint[1] + base_dy)
-        pt3 = (base_midpoint[0] - base_dx, base_midpoint[1] - base_dy)
-        return (top, pt2, pt3)
+        points = triangles(np.array([x, y]), self.orientation, b, h)
+        return tuple(tuple(p) for p in points)
 
     def obs(self):
         """ Create observation numpy array.
@@ -113,3 +112,49 @@ class Agent():
             numpy array (length 4): X, Y, Theta, Team
         """
         return np.array([self.loc[0], self.loc[1], self.orientation, self.team])
+
+def move(positions, orientations, vectors, mask=None):
+    """ Vectorized Agent.move for many agents, in place. Accepts any number of
+            leading batch dimensions.
+
+    Args:
+        positions (np array, ... x N x 2): Agent positions.
+        orientations (np array, ... x N): Agent orientations.
+        vectors (np array, ... x N x 2): dx and dy of every agent.
+        mask (np array of booleans, ... x N): Agents to move. All if None.
+
+    Mutates:
+        positions, orientations
+    """
+    if mask is None or mask.all():
+        positions += vectors
+        np.arctan2(vectors[..., 1], vectors[..., 0], out=orientations)
+    else:
+        positions[mask] += vectors[mask]
+        orientations[mask] = np.arctan2(vectors[mask][..., 1],
+                                        vectors[mask][..., 0])
+
+def triangles(positions, orientations, b=1.0, h=None):
+    """ Vectorized Agent.triangle for many agents. Accepts any number of
+            leading batch dimensions.
+
+    Args:
+        positions (np array, ... x 2): Triangle centers.
+        orientations (np array, ...): Direction the triangles point in.
+        b (double): Base of the triangles.
+        h (double): Distance from base to top point. Same as base if None.
+
+    Returns:
+        np array, ... x 3 x 2. CW points starting from the forward point.
+    """
+    if h is None:
+        h = b
+    positions = np.asarray(positions, dtype=float)
+    orientations = np.asarray(orientations, dtype=float)
+    forward = np.stack([np.cos(orientations), np.sin(orientations)], axis=-1)
+    base_line = np.stack([forward[..., 1], -forward[..., 0]], axis=-1)
+    top = positions + forward * 0.5 * h
+    base_midpoint = positions - forward * 0.5 * h
+    pt2 = base_midpoint + base_line * 0.5 * b
+    pt3 = base_midpoint - base_line * 0.5 * b
+    return np.stack([top, pt2, pt3], axis=-2)
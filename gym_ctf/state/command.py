@@ -1,5 +1,7 @@
 import numpy as np
 
+MOVE = 0
+
 class Command():
     COMMANDS = {0 : 'MOVE'}
     
@@ -13,3 +15,21 @@ class Command():
 
 def from_action(action):
     return Command(action[0], action[1:])
+
+def move_mask(action_types):
+    """ Vectorized counterpart of from_action for the action types of all
+            agents.
+
+    Args:
+        param1 (np array of ints): One action type per agent.
+
+    Returns:
+        np array of booleans. True for every agent executing a MOVE.
+
+    Raises:
+        KeyError: An action type is not a known command.
+    """
+    unknown = ~np.isin(action_types, list(Command.COMMANDS))
+    if unknown.any():
+        raise KeyError(action_types[unknown][0])
+    return action_types == MOVE
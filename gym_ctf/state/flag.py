@@ -1,12 +1,30 @@
 import numpy as np
 import random
 import math
+from .view import ArrayField, ArrayView
 
-class Flag():
+NO_TEAM = -1
+
+def _team_value(team):
+    team = int(team)
+    return None if team == NO_TEAM else team
+
+def _team_array(team):
+    return NO_TEAM if team is None else team
+
+class Flag(ArrayView):
     """ A flag is target that agents use to score in capture the flag.
         Once captured, it is marked as taken and stores the scoring team.
+        Once added to a World, its state is a view into the World's flag
+        arrays, where a scoring team of None is stored as NO_TEAM.
     """
-    
+    position = ArrayField('flag_positions')
+    scoring_radius = ArrayField('flag_radii', float)
+    taken = ArrayField('flag_taken', bool, on_change='flags_changed')
+    scoring_team = ArrayField('flag_teams', _team_value, _team_array,
+                              on_change='flags_changed')
+    scoring_count = ArrayField('flag_scoring_counts', int)
+
     def __init__(self, pos, scoring_radius):
         assert scoring_radius >= 0
         
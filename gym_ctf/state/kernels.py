@@ -0,0 +1,79 @@
+""" Optional Numba step kernel.
+
+    _step_kernel fuses movement, scoring of the flags not yet taken and the
+    capture counters of a World into one compiled loop over the state arrays,
+    avoiding NumPy dispatch on small worlds. It follows the same rules, and
+    the same floating point operations, as agent.move, scoring.team_counts
+    and scoring.update_flags. Positions and flag state match the NumPy step
+    exactly; orientations may differ in the last bits, as Numba's arctan2 is
+    not NumPy's vectorized one.
+
+    Numba is optional. AVAILABLE is False when it is not installed. Numba is
+    imported and the kernel compiled by the first load_step_kernel call, not
+    on import, as importing Numba alone takes longer than the rest of the
+    simulation core.
+"""
+import importlib.util
+import numpy as np
+
+AVAILABLE = importlib.util.find_spec('numba') is not None
+
+_compiled = None
+
+def _step_kernel(positions, orientations, vectors, mask, flag_positions,
+                 flag_radii, flag_taken, flag_teams, flag_scoring_counts,
+                 agent_team_index, team_ids, time_to_score, team_captures,
+                 counts):
+    """ Moves the agents selected by mask and scores every flag not yet taken.
+
+    Args:
+        counts (np array of ints, T): Scratch space for the team counts.
+
+    Returns:
+        int. Number of flags taken by this step.
+
+    Mutates:
+        positions, orientations, flag_taken, flag_teams, flag_scoring_counts,
+        team_captures
+    """
+    for i in range(positions.shape[0]):
+        if mask[i]:
+            positions[i, 0] += vectors[i, 0]
+            positions[i, 1] += vectors[i, 1]
+            orientations[i] = np.arctan2(vectors[i, 1], vectors[i, 0])
+
+    captured = 0
+    for f in range(flag_positions.shape[0]):
+        if flag_taken[f]:
+            continue
+        counts[:] = 0
+        for i in range(positions.shape[0]):
+            dx = flag_positions[f, 0] - positions[i, 0]
+            dy = flag_positions[f, 1] - positions[i, 1]
+            if np.sqrt(dx * dx + dy * dy) <= flag_radii[f]:
+                counts[agent_team_index[i]] += 1
+
+        leader = 0
+        for t in range(1, counts.shape[0]):
+            if counts[t] > counts[leader]:
+                leader = t
+        if counts.shape[0] == 0 or counts[leader] == 0:
+            continue
+
+        if team_ids[leader] != flag_teams[f]:
+            flag_scoring_counts[f] = 0
+        flag_teams[f] = team_ids[leader]
+        flag_scoring_counts[f] += 1
+        if flag_scoring_counts[f] >= time_to_score:
+            flag_taken[f] = True
+            team_captures[leader] += 1
+            captured += 1
+    return captured
+
+def load_step_kernel():
+    """ The compiled _step_kernel, None if Numba is not available. """
+    global _compiled
+    if _compiled is None and AVAILABLE:
+        import numba
+        _compiled = numba.njit(cache=True, nogil=True)(_step_kernel)
+    return _compiled
@@ -0,0 +1,41 @@
+""" Bulk random world generation. All draws go through a NumPy random
+        generator (an env's np_random) instead of the global random module, so
+        layouts are reproducible per env and many are drawn in one call.
+"""
+import numpy as np
+
+def integers(np_random, low, high, size):
+    """ Random integers in [low, high) from either a np.random.Generator or a
+            np.random.RandomState.
+    """
+    draw = getattr(np_random, 'integers', None)
+    if draw is None:
+        draw = np_random.randint
+    return draw(low, high, size)
+
+def random_positions(np_random, size, min_x, min_y, max_x, max_y):
+    """ Integer 2D points within the box, as Flag.random_pos, drawn at once.
+
+    Args:
+        np_random (np.random.Generator or RandomState): Source of randomness.
+        size (tuple of ints): Leading shape of the result.
+        min_x, min_y (int): Lower-left corner (inclusive).
+        max_x, max_y (int): Upper-right corner (exclusive).
+
+    Returns:
+        np array of floats, size x 2.
+    """
+    points = integers(np_random, (min_x, min_y), (max_x, max_y),
+                      tuple(size) + (2,))
+    return points.astype(float)
+
+def generate_layouts(np_random, count, width, height, agent_count, flag_count):
+    """ Draws count layouts (agent spawn points and flag positions) in one call.
+
+    Returns:
+        (np array, count x agent_count x 2, np array, count x flag_count x 2).
+            Agent and flag positions of every layout.
+    """
+    points = random_positions(np_random, (count, agent_count + flag_count),
+                              0, 0, width, height)
+    return points[:, :agent_count], points[:, agent_count:]
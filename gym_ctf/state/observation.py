@@ -0,0 +1,184 @@
+""" Flat observation layout shared by World.get_flat_observation and the
+        vectorized environments.
+
+    An observation is one float vector:
+        [x, y, theta, team] for every agent, in team order
+        [x, y, owner]       for every flag, owner is 0 unless the flag is taken
+        [time]
+
+    The nearest observation gives every agent one row instead, its own state
+    and its k nearest flags, teammates and opponents relative to it, so its
+    size does not grow with the world:
+        [x, y, theta]
+        [dx, dy, present, status] for each of the k_flags nearest flags
+        [dx, dy, present]         for each of the k_teammates nearest teammates
+        [dx, dy, present]         for each of the k_opponents nearest opponents
+        [time]
+    Neighbours are ordered nearest first. Missing neighbours (fewer than k in
+    the world) have present 0 and zero offsets. A flag's status is 1 if taken
+    by the agent's team, -1 if taken by another team and 0 otherwise.
+"""
+import math
+import numpy as np
+
+AGENT_FIELDS = 4
+FLAG_FIELDS = 3
+
+def observation_size(agent_count, flag_count):
+    return agent_count * AGENT_FIELDS + flag_count * FLAG_FIELDS + 1
+
+def split_observation(obs, agent_count, flag_count):
+    """ Views of the agent, flag and time parts of flat observations.
+
+    Returns:
+        (np array, ... x N x 4), (np array, ... x F x 3), (np array, ...)
+    """
+    agent_end = agent_count * AGENT_FIELDS
+    flag_end = agent_end + flag_count * FLAG_FIELDS
+    batch = obs.shape[:-1]
+    agents = obs[..., :agent_end].reshape(batch + (agent_count, AGENT_FIELDS))
+    flags = obs[..., agent_end:flag_end].reshape(batch + (flag_count, FLAG_FIELDS))
+    return agents, flags, obs[..., -1]
+
+def observation_bounds(width, height, num_teams, agent_count, flag_count,
+                       time_limit):
+    """ Lower and upper bound of every entry of the flat observation.
+
+    Returns:
+        (np array, np array). Low and high, float32, one entry per field.
+    """
+    agent_low = [0, 0, -math.pi, 0]
+    agent_high = [width, height, math.pi, num_teams]
+    flag_low = [0, 0, 0]
+    flag_high = [width, height, num_teams]
+    low = np.array(agent_low * agent_count + flag_low * flag_count + [0],
+                   dtype=np.float32)
+    high = np.array(agent_high * agent_count + flag_high * flag_count + [time_limit],
+                    dtype=np.float32)
+    return low, high
+
+def write_observation(out, agent_positions, agent_orientations, agent_teams,
+                      flag_positions, flag_taken, flag_teams, time):
+    """ Writes the flat observation into out without allocating. Accepts any
+            number of leading batch dimensions.
+
+    Args:
+        out (np array, ... x observation_size): Destination.
+        agent_positions (np array, ... x N x 2)
+        agent_orientations (np array, ... x N)
+        agent_teams (np array of ints, ... x N)
+        flag_positions (np array, ... x F x 2)
+        flag_taken (np array of booleans, ... x F)
+        flag_teams (np array of ints, ... x F)
+        time (int or np array, ...)
+
+    Returns:
+        out
+    """
+    agent_end = agent_positions.shape[-2] * AGENT_FIELDS
+    out[..., 0:agent_end:AGENT_FIELDS] = agent_positions[..., 0]
+    out[..., 1:agent_end:AGENT_FIELDS] = agent_positions[..., 1]
+    out[..., 2:agent_end:AGENT_FIELDS] = agent_orientations
+    out[..., 3:agent_end:AGENT_FIELDS] = agent_teams
+
+    flag_end = agent_end + flag_positions.shape[-2] * FLAG_FIELDS
+    out[..., agent_end:flag_end:FLAG_FIELDS] = flag_positions[..., 0]
+    out[..., agent_end + 1:flag_end:FLAG_FIELDS] = flag_positions[..., 1]
+    np.multiply(flag_taken, flag_teams,
+                out=out[..., agent_end + 2:flag_end:FLAG_FIELDS],
+                casting='unsafe')
+
+    out[..., -1] = time
+    return out
+
+NEAREST_FLAG_FIELDS = 4
+NEAREST_AGENT_FIELDS = 3
+
+def nearest_observation_size(k_flags, k_teammates, k_opponents):
+    return (3 + k_flags * NEAREST_FLAG_FIELDS
+            + (k_teammates + k_opponents) * NEAREST_AGENT_FIELDS + 1)
+
+def nearest_observation_bounds(width, height, k_flags, k_teammates,
+                               k_opponents, time_limit):
+    """ Lower and upper bound of every entry of an agent's nearest
+            observation row.
+
+    Returns:
+        (np array, np array). Low and high, float32, one entry per field.
+    """
+    neighbours = k_teammates + k_opponents
+    low = np.array([0, 0, -math.pi]
+                   + [-width, -height, 0, -1] * k_flags
+                   + [-width, -height, 0] * neighbours + [0],
+                   dtype=np.float32)
+    high = np.array([width, height, math.pi]
+                    + [width, height, 1, 1] * k_flags
+                    + [width, height, 1] * neighbours + [time_limit],
+                    dtype=np.float32)
+    return low, high
+
+def _write_offsets(out, start, fields, positions, targets, index):
+    """ Writes dx, dy and present of the neighbours in index (N x k, -1 if
+            missing) into the blocks of out starting at column start.
+
+    Returns:
+        (np array of booleans, N x k, np array of ints, N x k). Present mask
+            and index with missing neighbours replaced by 0.
+    """
+    end = start + index.shape[1] * fields
+    present = index >= 0
+    found = np.where(present, index, 0)
+    if len(targets) == 0:
+        out[:, start:end] = 0
+        return present, found
+    for axis in range(2):
+        offset = targets[found, axis] - positions[:, axis, None]
+        offset[~present] = 0
+        out[:, start + axis:end:fields] = offset
+    out[:, start + 2:end:fields] = present
+    return present, found
+
+def write_nearest_observation(out, agent_positions, agent_orientations,
+                              agent_teams, flag_positions, flag_taken,
+                              flag_teams, time, flag_index, teammate_index,
+                              opponent_index):
+    """ Writes the nearest observation of every agent into out.
+
+    Args:
+        out (np array, N x nearest_observation_size): Destination.
+        agent_positions (np array, N x 2)
+        agent_orientations (np array, N)
+        agent_teams (np array of ints, N)
+        flag_positions (np array, F x 2)
+        flag_taken (np array of booleans, F)
+        flag_teams (np array of ints, F)
+        time (int)
+        flag_index, teammate_index, opponent_index (np arrays of ints,
+            N x k): Neighbours of every agent, nearest first, -1 if missing
+            (see spatial.nearest_neighbors).
+
+    Returns:
+        out
+    """
+    out[:, 0:2] = agent_positions
+    out[:, 2] = agent_orientations
+
+    start = 3
+    present, found = _write_offsets(out, start, NEAREST_FLAG_FIELDS,
+                                     agent_positions, flag_positions,
+                                     flag_index)
+    end = start + flag_index.shape[1] * NEAREST_FLAG_FIELDS
+    if len(flag_positions):
+        taken = flag_taken[found] & present
+        own = flag_teams[found] == agent_teams[:, None]
+        out[:, start + 3:end:NEAREST_FLAG_FIELDS] = np.where(
+            taken, np.where(own, 1, -1), 0)
+
+    for index in (teammate_index, opponent_index):
+        start = end
+        _write_offsets(out, start, NEAREST_AGENT_FIELDS, agent_positions,
+                       agent_positions, index)
+        end = start + index.shape[1] * NEAREST_AGENT_FIELDS
+
+    out[:, -1] = time
+    return out
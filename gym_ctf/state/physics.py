@@ -0,0 +1,85 @@
+""" Optional movement physics: world edges and agent bodies.
+
+    After agents move, apply_boundary keeps them inside the world and
+    resolve_collisions pushes apart agents whose bodies (disks of a common
+    radius) overlap. Overlapping pairs are found with a UniformGrid whose cells
+    are one body diameter wide, so the cost grows with the number of agents
+    and their density, not with the number of agent pairs.
+"""
+import numpy as np
+
+from . import spatial
+
+BOUNDARIES = ('none', 'clamp', 'wrap')
+
+# Relaxation passes of resolve_collisions. Each pass separates the pairs
+# overlapping at its start; pushes can create new overlaps in crowds.
+COLLISION_ITERATIONS = 4
+
+# Coincident agents are separated along directions spread by this angle.
+GOLDEN_ANGLE = np.pi * (3 - np.sqrt(5))
+
+def apply_boundary(positions, width, height, boundary):
+    """ Keeps positions inside [0, width] x [0, height].
+
+    Args:
+        positions (np array, N x 2)
+        boundary (str): 'clamp' stops agents at the edges, 'wrap' moves them
+                        to the opposite edge (positions in [0, width) x
+                        [0, height)). 'none' leaves them unchanged.
+
+    Mutates:
+        positions
+    """
+    if boundary == 'clamp':
+        np.clip(positions, 0, (width, height), out=positions)
+    elif boundary == 'wrap':
+        np.mod(positions, (width, height), out=positions)
+
+def resolve_collisions(positions, radius, grid,
+                       iterations=COLLISION_ITERATIONS):
+    """ Pushes overlapping agents apart. Both agents of an overlapping pair
+            move half the overlap along the line between them. Distances are
+            not wrapped: agents on opposite edges of a wrapping world do not
+            collide.
+
+    Args:
+        positions (np array, N x 2)
+        radius (double): Body radius of every agent.
+        grid (UniformGrid): Index rebuilt over positions.
+        iterations (int): Maximum relaxation passes.
+
+    Returns:
+        int. Overlapping pairs before the first pass.
+
+    Mutates:
+        positions, grid
+    """
+    diameter = 2 * radius
+    count = len(positions)
+    overlaps = 0
+    for iteration in range(iterations):
+        grid.rebuild(positions, spatial.cell_size([diameter]))
+        i, j = grid.candidates(positions)
+        pair = i < j
+        i, j = i[pair], j[pair]
+        delta = positions[j] - positions[i]
+        distance = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        pair = distance < diameter
+        if iteration == 0:
+            overlaps = int(np.count_nonzero(pair))
+        if not pair.any():
+            break
+        i, j, delta, distance = i[pair], j[pair], delta[pair], distance[pair]
+
+        coincident = distance == 0
+        direction = delta / np.where(coincident, 1, distance)[:, None]
+        if coincident.any():
+            angle = GOLDEN_ANGLE * i[coincident]
+            direction[coincident, 0] = np.cos(angle)
+            direction[coincident, 1] = np.sin(angle)
+        push = direction * ((diameter - distance) / 2)[:, None]
+        for axis in range(2):
+            positions[:, axis] += (np.bincount(j, push[:, axis], count)
+                                   - np.bincount(i, push[:, axis], count))
+    return overlaps
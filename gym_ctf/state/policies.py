@@ -0,0 +1,98 @@
+""" Scripted policies for the agents a learner does not control.
+
+    A policy maps a World and the indices of the agents it moves to one move
+    vector per agent, computed for all of them at once from the state arrays.
+    Vectors point at the chosen flag and are at most 1 long, so agents stop
+    on their target. Agents stand still once every flag is taken.
+"""
+import numpy as np
+
+from . import flag
+from . import spatial
+
+def steer(positions, targets):
+    """ Move vectors from positions towards targets, at most 1 long. """
+    delta = targets - positions
+    length = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+    return delta / np.maximum(length, 1)[:, None]
+
+def nearest_flag(world, agents):
+    """ Every agent goes to the nearest flag not yet taken.
+
+    Args:
+        world (World)
+        agents (np array of ints): Agents moved by the policy.
+
+    Returns:
+        np array, len(agents) x 2. Move vectors.
+    """
+    active = world.active_flags
+    positions = world.agent_positions[agents]
+    if len(active) == 0:
+        return np.zeros((len(agents), 2))
+    targets = world.flag_positions[active]
+    index, _ = spatial.nearest_neighbors(targets, positions, 1)
+    return steer(positions, targets[index[:, 0]])
+
+def most_threatened_flag(world, agents):
+    """ Every agent goes to the flag not yet taken that another team is
+            closest to taking, i.e. with the highest scoring count of another
+            team, the nearest one on ties. Without such a flag the agent goes
+            to the nearest flag.
+
+    Args:
+        world (World)
+        agents (np array of ints): Agents moved by the policy.
+
+    Returns:
+        np array, len(agents) x 2. Move vectors.
+    """
+    active = world.active_flags
+    positions = world.agent_positions[agents]
+    vectors = np.zeros((len(agents), 2))
+    if len(active) == 0:
+        return vectors
+    scoring_teams = world.flag_teams[active]
+    scoring_counts = world.flag_scoring_counts[active]
+    agent_teams = world.agent_teams[agents]
+    for t in np.unique(agent_teams):
+        members = np.flatnonzero(agent_teams == t)
+        threat = np.where((scoring_teams != t) & (scoring_teams != flag.NO_TEAM),
+                          scoring_counts, 0)
+        targets = world.flag_positions[active[threat == threat.max()]]
+        index, _ = spatial.nearest_neighbors(targets, positions[members], 1)
+        vectors[members] = steer(positions[members], targets[index[:, 0]])
+    return vectors
+
+def split_coverage(world, agents):
+    """ Spreads the agents of every team over the flags not yet taken. Agents
+            and flags are ranked by x (then y) and each agent goes to the flag
+            of the same relative rank, so a team covers as many flags as it
+            has agents, in groups when there are more agents than flags.
+
+    Args:
+        world (World)
+        agents (np array of ints): Agents moved by the policy.
+
+    Returns:
+        np array, len(agents) x 2. Move vectors.
+    """
+    active = world.active_flags
+    positions = world.agent_positions[agents]
+    vectors = np.zeros((len(agents), 2))
+    if len(active) == 0:
+        return vectors
+    targets = world.flag_positions[active]
+    targets = targets[np.lexsort((targets[:, 1], targets[:, 0]))]
+    agent_teams = world.agent_teams[agents]
+    for t in np.unique(agent_teams):
+        members = np.flatnonzero(agent_teams == t)
+        members = members[np.lexsort((positions[members, 1],
+                                      positions[members, 0]))]
+        rank = np.arange(len(members)) * len(targets) // len(members)
+        vectors[members] = steer(positions[members], targets[rank])
+    return vectors
+
+POLICIES = {'nearest_flag': nearest_flag,
+            'most_threatened_flag': most_threatened_flag,
+            'split_coverage': split_coverage}
@@ -0,0 +1,138 @@
+""" Per-phase step timers and counters.
+
+    A World or CtfEnv given a StepProfiler times every phase of a step and
+    counts the work done. Without one (the default) the step only pays for a
+    None check per phase.
+
+    The latest durations of every phase are kept in a ring buffer of window
+    samples, from which rolling percentiles and latency histograms are built.
+"""
+import collections
+import json
+import time
+import numpy as np
+
+# Default histogram edges in seconds, 0.1us to 1s.
+HISTOGRAM_EDGES = np.logspace(-7, 0, 29)
+
+class StepProfiler():
+    """ Timers and counters of step phases.
+
+    Args:
+        window (int): Latest samples kept per phase.
+        clock (function): Returns the time in seconds.
+    """
+    def __init__(self, window=1024, clock=time.perf_counter):
+        assert window > 0
+        self.window = window
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self.samples = {}
+        self.calls = {}
+        self.totals = {}
+        self.counters = collections.Counter()
+        self.last_seconds = {}
+        self.last_counts = {}
+        self.in_step = False
+
+    def begin_step(self):
+        """ Forgets the phases of the previous step and returns the clock. """
+        self.last_seconds.clear()
+        self.last_counts.clear()
+        self.in_step = True
+        return self.clock()
+
+    def end_step(self):
+        """ Closes the step opened by begin_step and returns its step_info.
+                A World stepped outside an open step opens and closes its own.
+        """
+        self.in_step = False
+        return self.step_info()
+
+    def start(self):
+        return self.clock()
+
+    def lap(self, phase, start):
+        """ Records the time since start under phase and returns the clock, the
+                start of the next phase.
+        """
+        now = self.clock()
+        self.record(phase, now - start)
+        return now
+
+    def record(self, phase, seconds):
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = np.zeros(self.window)
+            self.calls[phase] = 0
+            self.totals[phase] = 0.0
+        calls = self.calls[phase]
+        samples[calls % self.window] = seconds
+        self.calls[phase] = calls + 1
+        self.totals[phase] += seconds
+        self.last_seconds[phase] = seconds
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+        self.last_counts[name] = self.last_counts.get(name, 0) + value
+
+    def window_samples(self, phase):
+        """ The samples of phase still in the window, oldest first. """
+        samples = self.samples[phase]
+        calls = self.calls[phase]
+        if calls <= self.window:
+            return samples[:calls]
+        return np.roll(samples, -(calls % self.window))
+
+    def step_info(self):
+        """ Phase durations (seconds) and counts of the latest step. """
+        return {'phase_seconds': dict(self.last_seconds),
+                'counts': dict(self.last_counts)}
+
+    def stats(self):
+        """ Totals since the last reset and rolling percentiles per phase.
+
+        Returns:
+            dict. 'phases' maps every phase to calls, total and mean seconds,
+                and p50, p90, p99 and max seconds over the window.
+                'counters' holds the counter totals.
+        """
+        phases = {}
+        for phase, calls in self.calls.items():
+            window = self.window_samples(phase)
+            p50, p90, p99 = np.percentile(window, [50, 90, 99])
+            phases[phase] = {'calls': calls,
+                             'total': self.totals[phase],
+                             'mean': self.totals[phase] / calls,
+                             'p50': float(p50), 'p90': float(p90),
+                             'p99': float(p99), 'max': float(window.max())}
+        return {'phases': phases, 'counters': dict(self.counters)}
+
+    def histograms(self, edges=HISTOGRAM_EDGES):
+        """ Latency histograms of the window of every phase.
+
+        Args:
+            edges (np array): Bin edges in seconds. Samples outside them are
+                              counted in the first or last bin.
+
+        Returns:
+            dict. Phase to (counts (np array of ints), edges (np array)).
+        """
+        edges = np.asarray(edges)
+        histograms = {}
+        for phase in self.samples:
+            window = np.clip(self.window_samples(phase), edges[0], edges[-1])
+            counts, _ = np.histogram(window, edges)
+            histograms[phase] = (counts, edges)
+        return histograms
+
+    def export(self, path, edges=HISTOGRAM_EDGES):
+        """ Writes stats and histograms to path as JSON. """
+        report = self.stats()
+        report['histograms'] = {
+            phase: {'counts': counts.tolist(), 'edges': edges.tolist()}
+            for phase, (counts, edges) in self.histograms(edges).items()}
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=1)
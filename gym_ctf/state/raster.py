@@ -0,0 +1,190 @@
+""" Headless software rasterizer. Draws worlds straight into uint8 RGB frames
+        with NumPy, without a display or pyglet.
+
+    Frames use the conventions of the gym viewer: world coordinates are scaled
+    to the frame, y points up (row 0 is the top of the world) and the
+    background is white. Shapes are drawn in layers: scoring radii as
+    outlines, then flags, then agents. Every layer is drawn for all worlds of a
+    batch at once by testing the pixels in a fixed size patch around each
+    shape.
+"""
+import numpy as np
+from . import agent
+
+BACKGROUND = 255
+FLAG_COLOR = (128, 0, 128)
+RADIUS_COLOR = (64, 64, 64)
+TEAM_COLORS = ((255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 165, 0),
+               (0, 160, 160), (160, 160, 0))
+
+AGENT_SIZE = 20
+FLAG_SIZE = 10
+
+def palette(num_teams, colors=None, flag_color=FLAG_COLOR):
+    """ Colors indexed by team id. Index 0 (no team) is the flag color.
+
+    Args:
+        num_teams (int): Number of teams.
+        colors (dict): Team id to RGB color. TEAM_COLORS are used for the
+                       teams missing from it.
+        flag_color (sequence): Color of flags no team has taken.
+
+    Returns:
+        np array of uint8, (num_teams + 1) x 3.
+    """
+    colors = colors or {}
+    table = np.empty((num_teams + 1, 3), dtype=np.uint8)
+    table[0] = flag_color
+    for team_id in range(1, num_teams + 1):
+        default = TEAM_COLORS[(team_id - 1) % len(TEAM_COLORS)]
+        table[team_id] = colors.get(team_id, default)
+    return table
+
+def _patch(size):
+    """ Pixel offsets (K x 2) of the square patch covering a shape of the
+            given radius in pixels.
+    """
+    r = int(np.ceil(size))
+    dx, dy = np.meshgrid(np.arange(-r, r + 1), np.arange(-r, r + 1))
+    return np.stack([dx.ravel(), dy.ravel()], axis=-1)
+
+def _pixels(centers, size):
+    """ Pixels around every center (... x 2, in pixels).
+
+    Returns:
+        (np array of ints, ... x K x 2, np array of doubles, ... x K x 2).
+            Pixel coordinates and the position of their centers.
+    """
+    pixels = np.floor(centers)[..., None, :].astype(int) + _patch(size)
+    return pixels, pixels + 0.5
+
+def _plot(frames, batch, pixels, inside, colors):
+    """ Writes colors (... x 3) into the frames at the pixels where inside is
+            set. Pixels outside the frames are dropped.
+
+    Args:
+        frames (np array, N x H x W x 3): Frames drawn into.
+        batch (np array of ints, ...): Frame of every shape.
+        pixels (np array of ints, ... x K x 2): x, y of the pixels.
+        inside (np array of booleans, ... x K): Pixels covered by the shape.
+        colors (np array, ... x 3): Color of every shape.
+
+    Mutates:
+        frames
+    """
+    height, width = frames.shape[1:3]
+    x = pixels[..., 0]
+    y = pixels[..., 1]
+    inside = inside & (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    shape, _ = np.nonzero(inside.reshape(-1, inside.shape[-1]))
+    x = x[inside]
+    y = y[inside]
+    frames[batch.ravel()[shape], height - 1 - y, x] = \
+        colors.reshape(-1, 3)[shape]
+
+def draw_rings(frames, centers, radii, colors, thickness=1.0):
+    """ Outlines of ellipses (circles in world space, scaled per axis).
+
+    Args:
+        frames (np array, N x H x W x 3): Frames drawn into.
+        centers (np array, N x M x 2): Centers in pixels.
+        radii (np array, N x M x 2): x and y radii in pixels.
+        colors (np array, N x M x 3): Color of every ring.
+        thickness (double): Width of the outline in pixels.
+    """
+    batch = np.broadcast_to(np.arange(len(frames))[:, None], centers.shape[:2])
+    pixels, points = _pixels(centers, np.max(radii, initial=0) + thickness)
+    scale = radii[..., None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        offsets = (points - centers[..., None, :]) / scale
+        distance = np.hypot(offsets[..., 0], offsets[..., 1])
+        gradient = np.hypot(*np.moveaxis(offsets / scale, -1, 0)) / distance
+        inside = np.abs(distance - 1) <= gradient * thickness * 0.5
+    _plot(frames, batch, pixels, inside, colors)
+
+def draw_disks(frames, centers, radius, colors):
+    """ Filled circles of a fixed radius (pixels) at centers (N x M x 2). """
+    batch = np.broadcast_to(np.arange(len(frames))[:, None], centers.shape[:2])
+    pixels, points = _pixels(centers, radius)
+    offsets = points - centers[..., None, :]
+    inside = (offsets ** 2).sum(axis=-1) <= radius ** 2
+    _plot(frames, batch, pixels, inside, colors)
+
+def draw_triangles(frames, vertices, colors):
+    """ Filled triangles.
+
+    Args:
+        frames (np array, N x H x W x 3): Frames drawn into.
+        vertices (np array, N x M x 3 x 2): Corners in pixels.
+        colors (np array, N x M x 3): Color of every triangle.
+    """
+    batch = np.broadcast_to(np.arange(len(frames))[:, None], vertices.shape[:2])
+    centers = vertices.mean(axis=-2)
+    size = np.max(np.abs(vertices - centers[..., None, :]), initial=0)
+    pixels, points = _pixels(centers, size + 1)
+    points = points[..., None, :]
+    a = vertices[..., None, :, :]
+    b = np.roll(vertices, -1, axis=-2)[..., None, :, :]
+    edge = ((b[..., 0] - a[..., 0]) * (points[..., 1] - a[..., 1]) -
+            (b[..., 1] - a[..., 1]) * (points[..., 0] - a[..., 0]))
+    inside = (edge <= 0).all(axis=-1) | (edge >= 0).all(axis=-1)
+    _plot(frames, batch, pixels, inside, colors)
+
+def render_frames(width, height, agent_positions, agent_orientations,
+                  agent_teams, flag_positions, flag_radii, flag_taken,
+                  flag_teams, colors=None, frame_width=600, frame_height=400,
+                  out=None):
+    """ Draws a batch of worlds.
+
+    Args:
+        width, height (int): Size of the worlds.
+        agent_positions (np array, N x agents x 2)
+        agent_orientations (np array, N x agents)
+        agent_teams (np array of ints, N x agents): Team id of every agent.
+        flag_positions (np array, N x flags x 2)
+        flag_radii (np array, N x flags): Scoring radius of every flag.
+        flag_taken (np array of booleans, N x flags)
+        flag_teams (np array of ints, N x flags): Team that took every flag.
+        colors (np array of uint8): Colors indexed by team id (see palette).
+        frame_width, frame_height (int): Size of the frames in pixels.
+        out (np array of uint8, N x frame_height x frame_width x 3): Frames
+            to draw into. Allocated if None.
+
+    Returns:
+        np array of uint8, N x frame_height x frame_width x 3.
+    """
+    agent_teams = np.asarray(agent_teams)
+    n = len(agent_positions)
+    if colors is None:
+        colors = palette(int(max(np.max(agent_teams, initial=0),
+                                 np.max(flag_teams, initial=0))))
+    if out is None:
+        out = np.empty((n, frame_height, frame_width, 3), dtype=np.uint8)
+    out.fill(BACKGROUND)
+
+    scale = np.array([frame_width / width, frame_height / height])
+    flag_centers = np.asarray(flag_positions) * scale
+    owners = colors[np.where(flag_taken, flag_teams, 0)]
+    radii = np.asarray(flag_radii, dtype=float)[..., None] * scale
+    draw_rings(out, flag_centers, radii,
+               np.broadcast_to(np.array(RADIUS_COLOR, np.uint8), owners.shape))
+    draw_disks(out, flag_centers, FLAG_SIZE, owners)
+
+    vertices = agent.triangles(np.asarray(agent_positions) * scale,
+                               agent_orientations, b=AGENT_SIZE)
+    draw_triangles(out, vertices, colors[agent_teams])
+    return out
+
+def render_world(world, colors=None, frame_width=600, frame_height=400):
+    """ Draws one World.
+
+    Returns:
+        np array of uint8, frame_height x frame_width x 3.
+    """
+    return render_frames(world.width, world.height,
+                         world.agent_positions[None],
+                         world.agent_orientations[None],
+                         world.agent_teams[None], world.flag_positions[None],
+                         world.flag_radii[None], world.flag_taken[None],
+                         world.flag_teams[None], colors, frame_width,
+                         frame_height)[0]
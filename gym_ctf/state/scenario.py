@@ -0,0 +1,117 @@
+""" Cache of generated world layouts for fast resets.
+
+    A scenario is keyed by (world_width, world_height, number_flags,
+    number_agents_per_team, flag_radius, seed) and holds the layout as
+    compact arrays.
+    Loading one into a World is a copy into the World's state arrays.
+"""
+import collections
+import os
+import numpy as np
+
+from . import layout
+from . import world
+
+Scenario = collections.namedtuple('Scenario', ['agent_positions',
+                                               'flag_positions', 'flag_radii'])
+
+def scenario_key(world_width, world_height, number_flags, number_agents_per_team,
+                 seed, flag_radius=None):
+    """ Key of a scenario. A flag_radius of None is the World default
+            scoring radius.
+    """
+    if flag_radius is None:
+        flag_radius = world.default_scoring_radius(number_flags, world_width,
+                                                   world_height)
+    return (int(world_width), int(world_height), int(number_flags),
+            tuple(int(n) for n in number_agents_per_team), float(flag_radius),
+            int(seed))
+
+def generate_scenario(key):
+    """ Draws the layout of a scenario from a generator seeded with its seed.
+            Flags use the scoring radius of the key.
+    """
+    width, height, number_flags, number_agents_per_team, radius, seed = key
+    agents, flags = layout.generate_layouts(np.random.default_rng(seed), 1, width,
+                                            height, sum(number_agents_per_team),
+                                            number_flags)
+    return Scenario(agents[0].astype(np.float32), flags[0].astype(np.float32),
+                    np.full(number_flags, radius, dtype=np.float32))
+
+class ScenarioCache():
+    """ LRU cache of scenarios, optionally persisted to a directory.
+
+    Args:
+        max_size (int): Scenarios kept in memory. The least recently used one
+                        is evicted first.
+        path (str): Directory where generated scenarios are saved, and looked
+                    up before generating. Memory only if None.
+        generate (function): Builds the scenario of a key on a miss.
+    """
+    def __init__(self, max_size=128, path=None, generate=generate_scenario):
+        assert max_size > 0
+        self.max_size = max_size
+        self.path = path
+        self.generate = generate
+        self.scenarios = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self):
+        return len(self.scenarios)
+
+    def __contains__(self, key):
+        return key in self.scenarios
+
+    def get(self, key):
+        """ The scenario of key, generated (or loaded from disk) on a miss. """
+        scenario = self.scenarios.get(key)
+        if scenario is not None:
+            self.scenarios.move_to_end(key)
+            self.hits += 1
+            return scenario
+
+        self.misses += 1
+        scenario = self.load(key)
+        if scenario is None:
+            scenario = self.generate(key)
+            self.save(key, scenario)
+        else:
+            self.disk_hits += 1
+        self.scenarios[key] = scenario
+        if len(self.scenarios) > self.max_size:
+            self.scenarios.popitem(last=False)
+            self.evictions += 1
+        return scenario
+
+    def file(self, key):
+        width, height, flags, agents, radius, seed = key
+        name = '%dx%d_f%d_a%s_r%r_s%d.npz' % (width, height, flags,
+                                              '-'.join(map(str, agents)),
+                                              radius, seed)
+        return os.path.join(self.path, name)
+
+    def load(self, key):
+        if self.path is None or not os.path.exists(self.file(key)):
+            return None
+        with np.load(self.file(key)) as data:
+            return Scenario(*(data[field] for field in Scenario._fields))
+
+    def save(self, key, scenario):
+        if self.path is not None:
+            np.savez(self.file(key), **scenario._asdict())
+
+    def stats(self):
+        return {'size': len(self.scenarios), 'max_size': self.max_size,
+                'hits': self.hits, 'misses': self.misses,
+                'disk_hits': self.disk_hits, 'evictions': self.evictions}
+
+    def clear(self):
+        self.scenarios.clear()
+
+# Cache shared by envs that are not given their own.
+default_cache = ScenarioCache()
@@ -0,0 +1,85 @@
+""" Vectorized flag scoring. Every function accepts arrays with any number of
+        leading batch dimensions, so the same rules score a single World or a
+        stack of independent games.
+"""
+import numpy as np
+
+def team_counts(flag_positions, flag_radii, agent_positions, agent_team_index,
+                team_count):
+    """ Counts the agents of every team within the scoring radius of every
+            flag. Distances are compared exactly as in
+            Flag.within_scoring_distance.
+
+    Args:
+        flag_positions (np array, ... x F x 2): Flag positions.
+        flag_radii (np array, ... x F): Scoring radius per flag.
+        agent_positions (np array, ... x N x 2): Agent positions.
+        agent_team_index (np array of ints, ... x N): Team index per agent.
+        team_count (int): Number of teams.
+
+    Returns:
+        np array of ints, ... x F x T. Agents of team t around flag f.
+    """
+    delta = flag_positions[..., :, None, :] - agent_positions[..., None, :, :]
+    distance = np.sqrt(delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1])
+    within = (distance <= flag_radii[..., None]).astype(int)
+    one_hot = (agent_team_index[..., :, None] == np.arange(team_count)).astype(int)
+    return within @ one_hot
+
+def team_counts_indexed(flag_positions, flag_radii, agent_positions,
+                        agent_team_index, team_count, grid):
+    """ Same as team_counts for a single World, but only distances between
+            flags and the agents in neighbouring grid cells are computed.
+
+    Args:
+        grid (UniformGrid): Index of agent_positions with a cell size of at
+                            least the largest flag radius.
+
+    Returns:
+        np array of ints, F x T. Agents of team t around flag f.
+    """
+    flag_index, agent_index = grid.candidates(flag_positions)
+    delta = flag_positions[flag_index] - agent_positions[agent_index]
+    distance = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+    within = distance <= flag_radii[flag_index]
+    bins = flag_index[within] * team_count + agent_team_index[agent_index[within]]
+    counts = np.bincount(bins, minlength=len(flag_positions) * team_count)
+    return counts.reshape(len(flag_positions), team_count)
+
+def update_flags(counts, team_ids, taken, teams, scoring_counts, time_to_score):
+    """ Applies the scoring rules to all flags at once. For every flag not yet
+            taken, the team with the most agents around it (the first such
+            team on ties, none if no agent is around) scores. A change of
+            scoring team resets the count. A flag is taken once its count
+            reaches time_to_score.
+
+    Args:
+        counts (np array of ints, ... x F x T): Output of team_counts.
+        team_ids (np array of ints, T): Team id per team index.
+        taken (np array of booleans, ... x F): Taken status per flag.
+        teams (np array of ints, ... x F): Scoring team per flag or NO_TEAM.
+        scoring_counts (np array of ints, ... x F): Scoring count per flag.
+        time_to_score (int): Count needed to take a flag.
+
+    Returns:
+        np array of booleans, ... x F. Flags taken during this update.
+
+    Mutates:
+        taken, teams, scoring_counts
+    """
+    if counts.shape[-1] == 0:
+        return np.zeros(taken.shape, dtype=bool)
+
+    leader = counts.argmax(axis=-1)
+    leader_count = np.take_along_axis(counts, leader[..., None], axis=-1)[..., 0]
+    scoring = ~taken & (leader_count > 0)
+    leader_id = team_ids[leader]
+
+    changed = scoring & (leader_id != teams)
+    scoring_counts[changed] = 0
+    teams[scoring] = leader_id[scoring]
+    scoring_counts[scoring] += 1
+
+    captured = scoring & (scoring_counts >= time_to_score)
+    taken |= captured
+    return captured
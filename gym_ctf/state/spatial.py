@@ -0,0 +1,187 @@
+import numpy as np
+
+def cell_size(radii):
+    """ Smallest safe cell size for queries with the given radii. Slightly
+            larger than the largest radius so that rounding in the cell
+            computation cannot drop a point exactly on the radius.
+    """
+    radius = np.max(radii, initial=0)
+    if radius <= 0:
+        return 1.0
+    return radius * (1 + 1e-9)
+
+class UniformGrid():
+    """ Spatial index bucketing points into square cells. With a cell size of
+            at least the query radius, every point within that radius of a
+            query lies in the 3x3 block of cells around the query, so only
+            those cells need to be checked.
+
+        The grid covers the bounding box of the indexed points and is rebuilt
+        (one sort) whenever the points move.
+    """
+    NEIGHBORS = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+
+    def __init__(self, cell_size):
+        assert cell_size > 0
+        self.cell_size = cell_size
+        self.rebuild(np.zeros((0, 2)))
+
+    def cells(self, positions):
+        return np.floor((positions - self.origin) / self.cell_size).astype(int)
+
+    def rebuild(self, positions, cell_size=None):
+        """ Indexes the points.
+
+        Args:
+            param1 (np array, N x 2): Points to index.
+            param2 (double): New cell size. Unchanged if None.
+
+        Mutates:
+            self - Replaces the previous index.
+        """
+        if cell_size is not None:
+            assert cell_size > 0
+            self.cell_size = cell_size
+        self.count = len(positions)
+        if self.count == 0:
+            self.origin = np.zeros(2)
+            self.shape = np.zeros(2, dtype=int)
+            self.order = np.zeros(0, dtype=int)
+            self.keys = np.zeros(0, dtype=int)
+            return
+
+        self.origin = positions.min(axis=0)
+        cells = self.cells(positions)
+        self.shape = cells.max(axis=0) + 1
+        keys = cells[:, 0] * self.shape[1] + cells[:, 1]
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def candidates(self, positions):
+        """ Indexed points in the 3x3 cells around every query point.
+
+        Args:
+            param1 (np array, Q x 2): Query points.
+
+        Returns:
+            (np array of ints, np array of ints). Query index and point index
+                of every candidate pair.
+        """
+        cells = self.cells(positions)[:, None, :] + self.NEIGHBORS
+        valid = ((cells >= 0) & (cells < self.shape)).all(axis=-1)
+        keys = cells[..., 0] * self.shape[1] + cells[..., 1]
+        starts = np.searchsorted(self.keys, keys, 'left')
+        ends = np.searchsorted(self.keys, keys, 'right')
+        lengths = np.where(valid, ends - starts, 0).ravel()
+
+        total = lengths.sum()
+        offsets = np.cumsum(lengths) - lengths
+        slots = np.arange(total) - np.repeat(offsets, lengths)
+        slots += np.repeat(starts.ravel(), lengths)
+        queries = np.repeat(np.arange(len(positions)), len(self.NEIGHBORS))
+        return np.repeat(queries, lengths), self.order[slots]
+
+# Query-point pairs up to which nearest_neighbors compares every pair.
+BRUTE_FORCE_PAIRS = 1 << 18
+
+def _nearest_brute(points, queries, k, exclude_self):
+    """ nearest_neighbors by comparing every query with every point. """
+    delta = queries[:, None, :] - points[None, :, :]
+    distance = np.sqrt(delta[..., 0] * delta[..., 0] + delta[..., 1] * delta[..., 1])
+    if exclude_self is not None:
+        distance[np.arange(len(queries)), exclude_self] = np.inf
+    return _smallest(distance, np.arange(len(points)), k)
+
+def _smallest(distance, index, k):
+    """ The k smallest distances of every row, in order, and their index.
+
+    Args:
+        distance (np array, Q x M): Candidate distances, inf if no candidate.
+        index (np array of ints, Q x M or M): Point of every candidate.
+    """
+    k = min(k, distance.shape[1])
+    if k < distance.shape[1]:
+        order = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(
+            order, np.argsort(np.take_along_axis(distance, order, axis=1),
+                              axis=1, kind='stable'), axis=1)
+    else:
+        order = np.argsort(distance, axis=1, kind='stable')
+    nearest = np.take_along_axis(distance, order, axis=1)
+    if index.ndim == 1:
+        found = index[order]
+    else:
+        found = np.take_along_axis(index, order, axis=1)
+    found[np.isinf(nearest)] = -1
+    return found, nearest
+
+def nearest_neighbors(points, queries, k, exclude_self=False):
+    """ The k points nearest to every query, nearest first. Ties between
+            equally distant points are broken arbitrarily.
+
+        Small sets are compared exhaustively. Larger sets are bucketed in a
+        UniformGrid with about 2k points per cell and only the 3x3 cells
+        around each query are searched. A point outside those cells is at
+        least one cell size away, so the result of a query is exact when its
+        kth distance is below the cell size; the other queries are answered
+        exhaustively.
+
+    Args:
+        points (np array, P x 2): Points searched.
+        queries (np array, Q x 2): Query positions.
+        k (int): Neighbours per query.
+        exclude_self (boolean): Queries are the points themselves (Q == P) and
+                                a point is not its own neighbour.
+
+    Returns:
+        (np array of ints, Q x k, np array of doubles, Q x k). Index of and
+            distance to the neighbours. Missing neighbours (fewer than k
+            points) have index -1 and distance inf.
+    """
+    points = np.asarray(points, dtype=float)
+    queries = np.asarray(queries, dtype=float)
+    q = len(queries)
+    index = np.full((q, k), -1, dtype=int)
+    distance = np.full((q, k), np.inf)
+    if k == 0 or q == 0 or len(points) == 0:
+        return index, distance
+
+    if q * len(points) <= BRUTE_FORCE_PAIRS:
+        misses = np.arange(q)
+    else:
+        extent = np.ptp(points, axis=0).clip(min=1)
+        size = np.sqrt(extent[0] * extent[1] * 2 * k / len(points))
+        grid = UniformGrid(size)
+        grid.rebuild(points)
+        query_index, point_index = grid.candidates(queries)
+        delta = queries[query_index] - points[point_index]
+        pair_distance = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        if exclude_self:
+            pair_distance[query_index == point_index] = np.inf
+
+        # Candidates come grouped by query. Lay them out in a Q x width table,
+        # leaving queries with more candidates than fit to the exhaustive pass.
+        counts = np.bincount(query_index, minlength=q)
+        width = max(k, int(4 * counts.mean()) + 1)
+        starts = np.cumsum(counts) - counts
+        column = np.arange(len(query_index)) - starts[query_index]
+        fits = column < width
+        table = np.full((q, width), np.inf)
+        table_index = np.full((q, width), -1, dtype=int)
+        table[query_index[fits], column[fits]] = pair_distance[fits]
+        table_index[query_index[fits], column[fits]] = point_index[fits]
+        found, nearest = _smallest(table, table_index, k)
+        index[:, :found.shape[1]] = found
+        distance[:, :found.shape[1]] = nearest
+        misses = np.flatnonzero(~(distance[:, -1] < size) | (counts > width))
+
+    chunk = max(1, BRUTE_FORCE_PAIRS // len(points))
+    for start in range(0, len(misses), chunk):
+        rows = misses[start:start + chunk]
+        found, nearest = _nearest_brute(points, queries[rows], k,
+                                        rows if exclude_self else None)
+        index[rows] = -1
+        distance[rows] = np.inf
+        index[rows, :found.shape[1]] = found
+        distance[rows, :found.shape[1]] = nearest
+    return index, distance
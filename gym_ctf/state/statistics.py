@@ -0,0 +1,179 @@
+""" Streaming episode statistics.
+
+    An EpisodeStatistics attached to a World is told about every scoring
+    update and every reset, and keeps running aggregates instead of the
+    trajectory: per flag the step it was taken and the steps it was contested
+    (agents of more than one team within its radius), lead changes, and
+    captures per team over time.
+
+    Durations are whole steps no longer than max_time, so they are counted in
+    histograms with one bin per step. Quantiles read from those histograms are
+    exact, and memory does not grow with the number of steps or episodes.
+"""
+import numpy as np
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+def histogram_summary(counts):
+    """ Count, mean, quantiles (QUANTILES) and max of values counted in a
+            histogram with one bin per integer value.
+
+    Args:
+        counts (np array of ints): counts[v] is how often v occurred.
+
+    Returns:
+        dict. 'count', 'mean', 'max' and 'p50', 'p90', 'p99'. None for the
+            statistics of an empty histogram.
+    """
+    total = int(counts.sum())
+    summary = {'count': total}
+    if total == 0:
+        summary.update(mean=None, max=None)
+        summary.update(('p%d' % round(q * 100), None) for q in QUANTILES)
+        return summary
+    values = np.arange(len(counts))
+    cumulative = np.cumsum(counts)
+    summary['mean'] = float(values @ counts) / total
+    summary['max'] = int(np.flatnonzero(counts)[-1])
+    for q in QUANTILES:
+        rank = int(np.ceil(q * total))
+        summary['p%d' % round(q * 100)] = int(np.searchsorted(cumulative, rank))
+    return summary
+
+class EpisodeStatistics():
+    """ Aggregates of the current episode and of all episodes so far.
+
+    Args:
+        max_time (int): Longest episode. Longer durations are counted as
+                        max_time.
+        time_bins (int): Intervals of max_time over which captures per team
+                         are counted.
+    """
+    def __init__(self, max_time, time_bins=10):
+        assert max_time > 0 and time_bins > 0
+        self.max_time = max_time
+        self.time_bins = time_bins
+        self.flag_count = None
+        self.team_count = None
+
+    def bind(self, world):
+        """ Allocates the aggregates for the flags and teams of world. """
+        self.flag_count = world.flag_count
+        self.team_count = world.team_count
+        self.capture_time = np.full(self.flag_count, -1, dtype=int)
+        self.contested_steps = np.zeros(self.flag_count, dtype=int)
+        self.team_capture_bins = np.zeros((self.team_count, self.time_bins),
+                                          dtype=int)
+
+        bins = self.max_time + 1
+        self.episodes = 0
+        self.total_lead_changes = 0
+        self.total_captures = np.zeros(self.team_count, dtype=int)
+        self.capture_time_counts = np.zeros(bins, dtype=int)
+        self.contested_counts = np.zeros(bins, dtype=int)
+        self.episode_length_counts = np.zeros(bins, dtype=int)
+        self.on_reset(world)
+
+    def on_reset(self, world):
+        """ Starts a new episode. """
+        self.capture_time[:] = -1
+        self.contested_steps[:] = 0
+        self.team_capture_bins[:] = 0
+        self.lead_changes = 0
+        self.leader = -1
+
+    def on_score(self, world, active, counts, captured):
+        """ Records a scoring update of the active flags.
+
+        Args:
+            world (World): Scored world, before its clock advances and the
+                captures are counted.
+            active (np array of ints): Flags scored.
+            counts (np array of ints, len(active) x T): Agents of every team
+                around every scored flag.
+            captured (np array of booleans, len(active)): Flags taken.
+        """
+        contested = np.count_nonzero(counts, axis=-1) > 1
+        self.contested_steps[active[contested]] += 1
+        if not captured.any():
+            return
+
+        time = world.time + 1
+        self.capture_time[active[captured]] = time
+        owners = world.flag_teams[active[captured]]
+        time_bin = min(self.time_bins - 1,
+                       (time - 1) * self.time_bins // self.max_time)
+        new_captures = (owners[:, None] == world.team_ids).sum(axis=0)
+        self.team_capture_bins[:, time_bin] += new_captures
+
+        captures = world.team_captures + new_captures
+        leader = int(captures.argmax())
+        if (captures == captures[leader]).sum() > 1:
+            leader = -1
+        if leader != -1 and leader != self.leader:
+            if self.leader != -1:
+                self.lead_changes += 1
+            self.leader = leader
+
+    def end_episode(self, world):
+        """ Adds the current episode to the totals.
+
+        Returns:
+            dict. The episode summary (see episode_summary).
+        """
+        summary = self.episode_summary(world)
+        length = min(world.time, self.max_time)
+        self.episodes += 1
+        self.total_lead_changes += self.lead_changes
+        self.total_captures += world.team_captures
+        self.episode_length_counts[length] += 1
+        self.capture_time_counts += self.capture_time_histogram()
+        self.contested_counts += self.contested_histogram()
+        return summary
+
+    def capture_time_histogram(self):
+        taken = self.capture_time[self.capture_time >= 0]
+        return np.bincount(np.minimum(taken, self.max_time),
+                           minlength=self.max_time + 1)
+
+    def contested_histogram(self):
+        return np.bincount(np.minimum(self.contested_steps, self.max_time),
+                           minlength=self.max_time + 1)
+
+    def episode_summary(self, world):
+        """ Statistics of the current episode.
+
+        Returns:
+            dict.
+                'length': steps played.
+                'captures': flags taken per team.
+                'lead_changes': times the sole leader in captures changed.
+                'capture_time': histogram_summary of the steps at which
+                    flags were taken.
+                'contested_steps': histogram_summary of the steps every flag
+                    was contested.
+                'team_captures_over_time': captures per team (rows) in each of
+                    time_bins intervals of max_time (columns).
+        """
+        return {'length': world.time,
+                'captures': world.team_captures.tolist(),
+                'lead_changes': self.lead_changes,
+                'capture_time': histogram_summary(self.capture_time_histogram()),
+                'contested_steps': histogram_summary(self.contested_histogram()),
+                'team_captures_over_time': self.team_capture_bins.tolist()}
+
+    def summary(self):
+        """ Statistics of all episodes ended so far.
+
+        Returns:
+            dict. 'episodes', mean 'lead_changes' and 'captures' (per team),
+                and histogram_summary of 'length', 'capture_time' and
+                'contested_steps'.
+        """
+        episodes = max(self.episodes, 1)
+        return {'episodes': self.episodes,
+                'lead_changes': self.total_lead_changes / episodes,
+                'captures': (self.total_captures / episodes).tolist(),
+                'length': histogram_summary(self.episode_length_counts),
+                'capture_time': histogram_summary(self.capture_time_counts),
+                'contested_steps': histogram_summary(self.contested_counts)}
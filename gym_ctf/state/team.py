@@ -38,4 +38,16 @@ class Team():
         return map((lambda a : a.obs()), self.agents)
 
     def set_team(self, new_agents):
+        """ Replaces the agents of the team. If the current agents are bound to
+                a World, the new agents take over their rows of the World's
+                arrays.
+
+        Args:
+            param1 (list of Agents): One agent per current agent.
+        """
+        for old, new in zip(self.agents, new_agents):
+            if old.bound:
+                world, index = old._world, old._index
+                old.unbind()
+                new.bind(world, index)
         self.agents = new_agents
@@ -0,0 +1,250 @@
+""" Append-only trajectory storage for World states.
+
+    A trajectory directory holds one set of chunk files per column
+    (<column>.<chunk>.bin, chunk_rows rows each, raw arrays) that are written
+    and read through np.memmap, an episode index (episodes.bin, int64
+    (start, end) row pairs) and meta.json (column dtypes and shapes, chunk
+    size, number of rows). The recorder publishes rows to readers (meta.json)
+    at chunk boundaries and on close.
+"""
+import json
+import os
+import struct
+import numpy as np
+from . import layout
+
+META = 'meta.json'
+EPISODES = 'episodes.bin'
+
+def world_columns(world):
+    """ Columns recorded for a World: (name, dtype, row shape). """
+    agents = len(world.agent_positions)
+    flags = len(world.flag_positions)
+    return [('agent_positions', 'float32', (agents, 2)),
+            ('agent_orientations', 'float32', (agents,)),
+            ('flag_taken', 'bool', (flags,)),
+            ('flag_teams', 'int16', (flags,)),
+            ('flag_scoring_counts', 'int32', (flags,)),
+            ('actions', 'float32', (agents, 2)),
+            ('rewards', 'float32', (world.team_count,)),
+            ('time', 'int32', ())]
+
+def _chunk_path(path, name, chunk):
+    return os.path.join(path, '%s.%05d.bin' % (name, chunk))
+
+class TrajectoryRecorder():
+    """ Streams World states, actions and rewards into memory-mapped column
+            files. Recording into an existing directory appends to it.
+
+    Args:
+        path (str): Trajectory directory.
+        world (World): World whose steps are recorded.
+        chunk_rows (int): Rows per chunk file.
+    """
+    def __init__(self, path, world, chunk_rows=65536):
+        self.path = path
+        self.world = world
+        columns = world_columns(world)
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            assert meta['columns'] == [[n, d, list(s)] for n, d, s in columns], \
+                "recorded columns do not match the world"
+            chunk_rows = meta['chunk_rows']
+            self.rows = meta['rows']
+        else:
+            self.rows = 0
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self.episode_start = self.rows
+        self.chunk = None
+        self.maps = {}
+        self.arrays = {}
+        self.episodes = open(os.path.join(path, EPISODES), 'ab')
+        self.open_chunk(self.rows // chunk_rows)
+        self.write_meta()
+
+    def open_chunk(self, chunk):
+        if self.maps:
+            self.close_chunk()
+            self.flush()
+        self.chunk = chunk
+        for name, dtype, shape in self.columns:
+            shape = (self.chunk_rows,) + shape
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            chunk_path = _chunk_path(self.path, name, chunk)
+            with open(chunk_path, 'ab') as f:
+                f.truncate(size)
+            self.maps[name] = np.memmap(chunk_path, dtype, 'r+', shape=shape)
+            self.arrays[name] = np.asarray(self.maps[name])
+
+    def close_chunk(self, truncate=False):
+        """ Closes the memory maps of the current chunk. If truncate, the
+                chunk files are cut to the rows written.
+        """
+        rows = self.rows - self.chunk * self.chunk_rows if self.maps else 0
+        self.arrays = {}
+        for name, dtype, shape in self.columns:
+            array = self.maps.pop(name, None)
+            if array is None:
+                continue
+            array.flush()
+            del array
+            if truncate:
+                size = rows * int(np.prod(shape)) * np.dtype(dtype).itemsize
+                with open(_chunk_path(self.path, name, self.chunk), 'r+b') as f:
+                    f.truncate(size)
+
+    def record(self, reward, actions, done=False):
+        """ Appends the current state of the world.
+
+        Args:
+            reward (np array): Reward per team of the last step.
+            actions (np array, agents x 2): Move vectors of the last step.
+            done (boolean): Ends the episode after this row.
+        """
+        row = self.rows - self.chunk * self.chunk_rows
+        if row == self.chunk_rows:
+            self.open_chunk(self.chunk + 1)
+            row = 0
+        w = self.world
+        arrays = self.arrays
+        arrays['agent_positions'][row] = w.agent_positions
+        arrays['agent_orientations'][row] = w.agent_orientations
+        arrays['flag_taken'][row] = w.flag_taken
+        arrays['flag_teams'][row] = w.flag_teams
+        arrays['flag_scoring_counts'][row] = w.flag_scoring_counts
+        arrays['actions'][row] = actions
+        arrays['rewards'][row] = reward
+        arrays['time'][row] = w.time
+        self.rows += 1
+        if done:
+            self.end_episode()
+
+    def end_episode(self):
+        """ Marks the rows since the last episode end as one episode. """
+        if self.rows == self.episode_start:
+            return
+        self.episodes.write(struct.pack('<qq', self.episode_start, self.rows))
+        self.episode_start = self.rows
+
+    def flush(self):
+        """ Makes the rows recorded so far visible to readers. Called at every
+                chunk boundary and on close.
+        """
+        for array in self.maps.values():
+            array.flush()
+        self.episodes.flush()
+        self.write_meta()
+
+    def write_meta(self):
+        meta = {'columns': [[n, d, list(s)] for n, d, s in self.columns],
+                'chunk_rows': self.chunk_rows,
+                'rows': self.rows}
+        tmp = os.path.join(self.path, META + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, META))
+
+    def close(self):
+        """ Ends the current episode and flushes everything to disk. """
+        if self.chunk is None:
+            return
+        self.end_episode()
+        self.close_chunk(truncate=True)
+        self.episodes.close()
+        self.write_meta()
+        self.chunk = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrajectoryReader():
+    """ Random access to a trajectory directory. Chunks are memory-mapped on
+            first use, so only the rows read are loaded from disk.
+
+    Args:
+        path (str): Trajectory directory.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META)) as f:
+            meta = json.load(f)
+        self.columns = [(n, d, tuple(s)) for n, d, s in meta['columns']]
+        self.chunk_rows = meta['chunk_rows']
+        self.rows = meta['rows']
+        episodes_path = os.path.join(path, EPISODES)
+        if os.path.exists(episodes_path):
+            self.episodes = np.fromfile(episodes_path, np.int64).reshape(-1, 2)
+            self.episodes = self.episodes[self.episodes[:, 1] <= self.rows]
+        else:
+            self.episodes = np.zeros((0, 2), np.int64)
+        self.maps = {}
+
+    def __len__(self):
+        return self.rows
+
+    def chunk(self, name, chunk):
+        key = (name, chunk)
+        if key not in self.maps:
+            _, dtype, shape = next(c for c in self.columns if c[0] == name)
+            rows = min(self.chunk_rows, self.rows - chunk * self.chunk_rows)
+            self.maps[key] = np.memmap(_chunk_path(self.path, name, chunk), dtype,
+                                       'r', shape=(rows,) + shape)
+        return self.maps[key]
+
+    def read(self, start, stop, names=None):
+        """ Rows [start, stop) of the columns. A range within one chunk is
+                returned as a memmap view without copying.
+
+        Returns:
+            dict. Column name to array.
+        """
+        names = names or [c[0] for c in self.columns]
+        first = start // self.chunk_rows
+        last = (stop - 1) // self.chunk_rows
+        out = {}
+        for name in names:
+            parts = []
+            for chunk in range(first, last + 1):
+                base = chunk * self.chunk_rows
+                lo = max(start, base) - base
+                hi = min(stop, base + self.chunk_rows) - base
+                parts.append(self.chunk(name, chunk)[lo:hi])
+            out[name] = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return out
+
+    def episode(self, index, names=None):
+        start, stop = self.episodes[index]
+        return self.read(int(start), int(stop), names)
+
+    def rows_at(self, rows, names=None):
+        """ Gathers arbitrary rows, e.g. a random minibatch.
+
+        Returns:
+            dict. Column name to array with one entry per row.
+        """
+        rows = np.asarray(rows)
+        names = names or [c[0] for c in self.columns]
+        chunks = rows // self.chunk_rows
+        offsets = rows - chunks * self.chunk_rows
+        out = {}
+        for name in names:
+            _, dtype, shape = next(c for c in self.columns if c[0] == name)
+            values = np.empty((len(rows),) + shape, dtype)
+            for chunk in np.unique(chunks):
+                selected = chunks == chunk
+                values[selected] = self.chunk(name, int(chunk))[offsets[selected]]
+            out[name] = values
+        return out
+
+    def sample(self, batch_size, np_random=np.random, names=None):
+        """ Uniformly sampled minibatch of rows. """
+        return self.rows_at(layout.integers(np_random, 0, self.rows, batch_size),
+                            names)
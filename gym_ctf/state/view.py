@@ -0,0 +1,93 @@
+class ArrayField():
+    """ Attribute of an entity (Agent, Flag) that is stored locally until the
+            entity is bound to a World, and in a row of one of the World's
+            state arrays afterwards.
+
+    Args:
+        param1 (str): Name of the World array backing the attribute.
+        param2 (function): Converts the stored array value to the value
+                           returned to callers. Identity if None.
+        param3 (function): Converts an assigned value to the value stored in
+                           the array. Identity if None.
+        param4 (str): Name of a World method called after every write to
+                      the array. None if the World need not be told.
+    """
+    def __init__(self, array, to_value=None, to_array=None, on_change=None):
+        self.array = array
+        self.to_value = to_value
+        self.to_array = to_array
+        self.on_change = on_change
+
+    def __set_name__(self, owner, name):
+        self.local = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if instance._world is None:
+            return getattr(instance, self.local)
+        value = getattr(instance._world, self.array)[instance._index]
+        if self.to_value is not None:
+            value = self.to_value(value)
+        return value
+
+    def __set__(self, instance, value):
+        if instance._world is None:
+            setattr(instance, self.local, value)
+            return
+        if self.to_array is not None:
+            value = self.to_array(value)
+        getattr(instance._world, self.array)[instance._index] = value
+        if self.on_change is not None:
+            getattr(instance._world, self.on_change)()
+
+
+class ArrayView():
+    """ Base class for entities whose state can live in World arrays. An
+            unbound entity behaves as a plain object. Once bound, every
+            ArrayField reads and writes the World's arrays, so the World can
+            update all entities with a handful of NumPy operations.
+    """
+    _world = None
+    _index = None
+
+    def fields(self):
+        return [name for name, attr in vars(type(self)).items()
+                if isinstance(attr, ArrayField)]
+
+    def bind(self, world, index):
+        """ Moves the entity's state into row index of the World's arrays.
+
+        Args:
+            param1 (World): World owning the state arrays.
+            param2 (int): Row of the entity in the arrays.
+
+        Mutates:
+            world - Row index of every backing array is overwritten.
+        """
+        values = [(name, getattr(self, name)) for name in self.fields()]
+        self._world = world
+        self._index = index
+        for name, value in values:
+            setattr(self, name, value)
+
+    def unbind(self):
+        """ Copies the entity's state out of the World. The World's arrays are
+                no longer affected by the entity.
+        """
+        if self._world is None:
+            return
+        values = [(name, _detach(getattr(self, name))) for name in self.fields()]
+        self._world = None
+        self._index = None
+        for name, value in values:
+            setattr(self, name, value)
+
+    @property
+    def bound(self):
+        return self._world is not None
+
+
+def _detach(value):
+    copy = getattr(value, 'copy', None)
+    return copy() if copy is not None else value
@@ -1,21 +1,108 @@
+import collections
 import numpy as np
 import math
+import warnings
 from . import agent
 from . import team
 from . import flag
 from . import command
+from . import scoring
+from . import spatial
+from . import observation
+from . import layout
+from . import kernels
+from . import physics
+
+# Flag-agent pairs above which the auto spatial index switches from brute force
+# to the uniform grid. See benchmarks/spatial_index.py.
+SPATIAL_INDEX_PAIRS = 5000
+
+BACKENDS = ('numpy', 'numba')
+
+# State arrays that change during a game, saved by World.snapshot. They share
+# one buffer, in this order, so that a snapshot is a single copy.
+SNAPSHOT_FIELDS = ('agent_positions', 'agent_orientations', 'flag_teams',
+                   'flag_scoring_counts', 'team_captures', 'flag_taken')
+
+WorldSnapshot = collections.namedtuple('WorldSnapshot',
+                                       ['state', 'time', 'active_flags'])
+
+def default_scoring_radius(flag_count, width, height):
+    """ Scoring radius such that non-overlapping flags make 1/10 of the world
+            scoring. 30 ~ 10Pi.
+    """
+    return math.sqrt(flag_count * 30 / (width * height))
 
 class World():
     """ World is a the simulation environment for the capture the flag gym 
         environment. It is a container for the teams and flags.
+
+        The state of all agents and flags is stored in arrays owned by the
+        world (structure of arrays). Agent and Flag objects are views into
+        these arrays, so a step updates the arrays in place instead of
+        creating new objects.
+
+        Agent arrays (N agents, ordered by team):
+            agent_positions (N, 2), agent_orientations (N,), agent_teams (N,)
+            agent_team_index (N,) - index of the agent's team in self.teams
+        Flag arrays (F flags):
+            flag_positions (F, 2), flag_radii (F,), flag_taken (F,),
+            flag_teams (F,) - flag.NO_TEAM if no team is scoring,
+            flag_scoring_counts (F,)
+        The arrays that change during a game share one buffer (see
+        SNAPSHOT_FIELDS), which snapshot and restore copy as a whole.
+
+        Scoring compares every flag with every agent ('brute') or only with
+        agents in neighbouring cells of a uniform grid rebuilt every step
+        ('grid'). 'auto' picks the grid for worlds with more than
+        SPATIAL_INDEX_PAIRS flag-agent pairs. Only flags not yet taken (the
+        active set, active_flags) are scored, and the flags taken by every team
+        (team_captures) are counted as captures happen. Both are rebuilt from
+        the flag arrays by sync_flags, which runs before they are next read
+        when a Flag view changes flag state (e.g. Flag.take).
+
+        The 'numba' backend uses the compiled step kernel
+        (kernels.load_step_kernel) for worlds scored by brute force. It falls
+        back to 'numpy' (with a warning) if Numba is not installed.
+
+        Movement physics are off by default: agents may leave the world and
+        overlap. boundary ('clamp' or 'wrap', see physics.apply_boundary)
+        keeps them inside, and a body_radius above 0 pushes overlapping agents
+        apart (physics.resolve_collisions).
+
+        With a profiler (gym_ctf.state.profiling.StepProfiler), steps record
+        the time of every phase and count agents moved, flags evaluated and
+        captures. A step begins a profiler step of its own unless its caller
+        (e.g. CtfEnv._step) has begun one.
+
+        With statistics (gym_ctf.state.statistics.EpisodeStatistics), every
+        scoring update and reset is reported to the collector. Worlds with
+        statistics or physics step with the 'numpy' backend.
     """
     def __init__(self, height, width, teams, flags=None, 
-                 scoring_radius=None, flag_count=10, time_to_score=5):
+                 scoring_radius=None, flag_count=10, time_to_score=5,
+                 spatial_index='auto', np_random=None, profiler=None,
+                 backend='numpy', boundary='none', body_radius=0,
+                 statistics=None):
+        assert spatial_index in ('auto', 'grid', 'brute')
+        assert backend in BACKENDS
+        assert boundary in physics.BOUNDARIES
+        assert body_radius >= 0
         self.height = height
         self.width = width
         self.teams = teams
         self.team_count = self.teams.size
         self.time_to_score = time_to_score
+        self.spatial_index = spatial_index
+        self.profiler = profiler
+        self.statistics = statistics
+        if backend == 'numba' and not kernels.AVAILABLE:
+            warnings.warn("Numba is not installed, using the numpy backend")
+            backend = 'numpy'
+        self.backend = backend
+        self.boundary = boundary
+        self.body_radius = body_radius
+        self.body_grid = spatial.UniformGrid(spatial.cell_size([2 * body_radius]))
 
         if flags is not None:
             flag_count = flags.size
@@ -23,17 +110,109 @@ class World():
         self.flag_count = flag_count
             
         if scoring_radius is None:
-            scoring_radius = math.sqrt(self.flag_count * 30 / (self.width * self.height))
+            scoring_radius = default_scoring_radius(self.flag_count, self.width,
+                                                    self.height)
 
         self.flag_radius = scoring_radius
         
         if flags is None:
-            flags = self.create_flags()
+            flags = self.create_flags(np_random)
 
         self.flags = flags
+        self.bind_state()
+
+        if statistics is not None:
+            statistics.bind(self)
 
         self.time = 0
 
+    def bind_state(self):
+        """ Allocates the state arrays and binds every agent and flag to them.
+
+        Mutates:
+            self.teams - Agents become views into the agent arrays
+            self.flags - Flags become views into the flag arrays
+        """
+        agents = [a for t in self.teams for a in t.agents]
+        agent_count = len(agents)
+        self.team_ids = np.array([t.team for t in self.teams], dtype=int)
+        self.agent_team_index = np.repeat(np.arange(self.team_count),
+                                          [len(t.agents) for t in self.teams])
+        self.allocate_state(agent_count)
+        self.agent_teams = np.zeros(agent_count, dtype=int)
+        for i, a in enumerate(agents):
+            a.bind(self, i)
+
+        self.flag_positions = np.zeros((self.flag_count, 2))
+        self.flag_radii = np.zeros(self.flag_count)
+        for i, f in enumerate(self.flags):
+            f.bind(self, i)
+
+        self.all_flags = np.arange(self.flag_count)
+        self.sync_flags()
+
+        self.grid = spatial.UniformGrid(spatial.cell_size(self.flag_radii))
+
+        self.flat_observation = np.zeros(
+            observation.observation_size(agent_count, self.flag_count),
+            dtype=np.float32)
+        self.flat_observation_view = self.flat_observation.view()
+        self.flat_observation_view.flags.writeable = False
+        self.nearest_observation = None
+
+        self.action_types = np.zeros(agent_count, dtype=int)
+        self.action_vectors = np.zeros((agent_count, 2))
+        self.move_all = np.ones(agent_count, dtype=bool)
+        self.kernel_counts = np.zeros(self.team_count, dtype=int)
+
+    def allocate_state(self, agent_count):
+        """ Allocates the arrays of SNAPSHOT_FIELDS as views into one buffer,
+                self.state_buffer.
+        """
+        f = self.flag_count
+        specs = {'agent_positions': (float, (agent_count, 2)),
+                 'agent_orientations': (float, (agent_count,)),
+                 'flag_teams': (int, (f,)),
+                 'flag_scoring_counts': (int, (f,)),
+                 'team_captures': (int, (self.team_count,)),
+                 'flag_taken': (bool, (f,))}
+        sizes = [np.dtype(specs[name][0]).itemsize * int(np.prod(specs[name][1]))
+                 for name in SNAPSHOT_FIELDS]
+        self.state_buffer = np.zeros(sum(sizes), dtype=np.uint8)
+        offset = 0
+        for name, size in zip(SNAPSHOT_FIELDS, sizes):
+            dtype, shape = specs[name]
+            array = self.state_buffer[offset:offset + size].view(dtype)
+            setattr(self, name, array.reshape(shape))
+            offset += size
+        self.flag_teams[:] = flag.NO_TEAM
+
+    def snapshot(self):
+        """ Captures the state that changes during a game: agent positions and
+                orientations, flag scoring state, capture counters and time.
+                Layout (positions, radii) and teams are not included.
+
+        Returns:
+            WorldSnapshot. Immutable; can be restored any number of times.
+                The active flag array is shared, not copied: score_flags
+                replaces it instead of changing it.
+        """
+        active = self.active_flags
+        return WorldSnapshot(self.state_buffer.tobytes(), self.time, active)
+
+    def restore(self, snap):
+        """ Returns the world to a snapshot of itself (or of a world with the
+                same layout) with one copy into the state buffer. No objects
+                are created; Agent and Flag views see the restored state.
+
+        Mutates:
+            The arrays of SNAPSHOT_FIELDS, self.active_flags, self.time
+        """
+        assert len(snap.state) == self.state_buffer.nbytes, "snapshot of another world"
+        self.state_buffer.data[:] = snap.state
+        self.active_flags = snap.active_flags
+        self.time = snap.time
+
     def get_observation(self):
         """ Returns the observation (in the format expected by the Gym Env)
 
@@ -48,30 +227,137 @@ class World():
         flags_obs = map((lambda f : f.obs()), self.flags)
         return teams_obs, flags_obs, self.time
 
+    def get_flat_observation(self, read_only=True):
+        """ Writes the observation into one preallocated float32 buffer. The
+                layout is fixed (see gym_ctf.state.observation): x, y, theta
+                and team of every agent, x, y and owner of every flag, time.
+                Nothing is allocated; every call returns the same array.
+
+        Args:
+            read_only (boolean): Return a read-only view of the buffer instead
+                                 of the buffer itself.
+
+        Returns:
+            np array of float32. Overwritten by the next call.
+        """
+        observation.write_observation(self.flat_observation,
+                                      self.agent_positions,
+                                      self.agent_orientations, self.agent_teams,
+                                      self.flag_positions, self.flag_taken,
+                                      self.flag_teams, self.time)
+        if read_only:
+            return self.flat_observation_view
+        return self.flat_observation
+
+    def nearest_indices(self, k_flags, k_teammates, k_opponents):
+        """ The nearest flags, teammates and opponents of every agent (see
+                spatial.nearest_neighbors).
+
+        Returns:
+            (np array of ints, N x k_flags, N x k_teammates, N x k_opponents).
+                Flag and agent indices, nearest first, -1 if missing.
+        """
+        positions = self.agent_positions
+        agent_count = len(positions)
+        flag_index, _ = spatial.nearest_neighbors(self.flag_positions,
+                                                  positions, k_flags)
+        teammate_index = np.full((agent_count, k_teammates), -1, dtype=int)
+        opponent_index = np.full((agent_count, k_opponents), -1, dtype=int)
+        for t in range(self.team_count):
+            members = np.flatnonzero(self.agent_team_index == t)
+            others = np.flatnonzero(self.agent_team_index != t)
+            found, _ = spatial.nearest_neighbors(positions[members],
+                                                 positions[members],
+                                                 k_teammates, exclude_self=True)
+            teammate_index[members] = np.where(found >= 0, members[found], -1)
+            found, _ = spatial.nearest_neighbors(positions[others],
+                                                 positions[members], k_opponents)
+            opponent_index[members] = np.where(found >= 0, others[found], -1)
+        return flag_index, teammate_index, opponent_index
+
+    def get_nearest_observation(self, k_flags, k_teammates, k_opponents):
+        """ Writes the egocentric observation of every agent, its own state
+                and its k nearest flags, teammates and opponents in relative
+                coordinates (see gym_ctf.state.observation), into one float32
+                buffer kept between calls.
+
+        Returns:
+            np array of float32, N x nearest_observation_size. Overwritten by
+                the next call.
+        """
+        shape = (len(self.agent_positions),
+                 observation.nearest_observation_size(k_flags, k_teammates,
+                                                      k_opponents))
+        if self.nearest_observation is None or self.nearest_observation.shape != shape:
+            self.nearest_observation = np.zeros(shape, dtype=np.float32)
+        flag_index, teammate_index, opponent_index = self.nearest_indices(
+            k_flags, k_teammates, k_opponents)
+        return observation.write_nearest_observation(
+            self.nearest_observation, self.agent_positions,
+            self.agent_orientations, self.agent_teams, self.flag_positions,
+            self.flag_taken, self.flag_teams, self.time, flag_index,
+            teammate_index, opponent_index)
+
     def get_reward(self):
         """ Calculate reward value per team. The reward is the number
                 of flags taken. Partially taken flags give no reward.
 
         Returns:
-            np array of floats. One float per team.
+            np array of ints. One per team, in team order.
         """
-        rewards = {}
-        for i in range(self.team_count):
-            rewards[i+1] = 0
+        if self.flags_stale:
+            self.sync_flags()
+        return self.team_captures.copy()
+
+    @property
+    def active_flags(self):
+        """ Indices of the flags not taken. """
+        if self.flags_stale:
+            self.sync_flags()
+        return self._active_flags
+
+    @active_flags.setter
+    def active_flags(self, flags):
+        self._active_flags = flags
+        self.flags_stale = False
+
+    def flags_changed(self):
+        """ Called by Flag views after writing flag state. The active flag
+                set and the capture counters are rebuilt before next use.
+        """
+        self.flags_stale = True
 
-        for f in self.flags:
-            if f.taken:
-                rewards[f.scoring_team] += 1
+    def sync_flags(self):
+        """ Rebuilds the active flag set and the capture counters from the
+                flag arrays.
 
-        return np.array(list(rewards.values()))
+        Mutates:
+            self.active_flags - Flags not taken
+            self.team_captures - Flags taken per team
+        """
+        if self.flag_taken.any():
+            self.active_flags = np.flatnonzero(~self.flag_taken)
+            owners = self.flag_teams[self.flag_taken]
+            self.team_captures[:] = (owners[:, None] == self.team_ids).sum(axis=0)
+        else:
+            self.active_flags = self.all_flags
+            self.team_captures[:] = 0
+
+    def all_captured(self):
+        """ Whether every flag has been taken. """
+        return len(self.active_flags) == 0
     
     def timestep(self):
         self.time += 1
 
-    def reset(self):
+    def reset(self, np_random=None):
         """ Resets the world. All flags are returned to original state. World 
                 clock is reset.
 
+        Args:
+            np_random (np.random.Generator or RandomState): If given, agents
+                and flags are also moved to a new random layout drawn from it.
+
         Returns:
             Nothing.
 
@@ -79,14 +365,61 @@ class World():
             self.flags - Calls reset method
             self.time  - Zeros
         """
-        for f in self.flags:
-            f.reset()
-            
+        if np_random is not None:
+            self.randomize(np_random)
+
+        self.flag_taken[:] = False
+        self.flag_teams[:] = flag.NO_TEAM
+        self.flag_scoring_counts[:] = 0
+        self.active_flags = self.all_flags
+        self.team_captures[:] = 0
+
         self.time = 0
+        if self.statistics is not None:
+            self.statistics.on_reset(self)
+
+    def randomize(self, np_random):
+        """ Moves all agents and flags to a new random layout, drawn in one
+                call. Agents face orientation 0, as when created.
+
+        Mutates:
+            self.agent_positions, self.agent_orientations
+            self.flag_positions
+        """
+        agents, flags = layout.generate_layouts(np_random, 1, self.width,
+                                                self.height,
+                                                len(self.agent_positions),
+                                                self.flag_count)
+        self.agent_positions[:] = agents[0]
+        self.agent_orientations[:] = 0
+        self.flag_positions[:] = flags[0]
+
+    def load_scenario(self, scenario):
+        """ Copies a cached layout (see gym_ctf.state.scenario) into the state
+                arrays and resets the world. Nothing is allocated.
 
-    def create_flags(self):
+        Mutates:
+            self.agent_positions, self.agent_orientations
+            self.flag_positions, self.flag_radii
+            self.flag_radius - the scenario's radius, used by flags created
+                               later
+            self.flags, self.time - reset
+        """
+        self.agent_positions[:] = scenario.agent_positions
+        self.agent_orientations[:] = 0
+        self.flag_positions[:] = scenario.flag_positions
+        self.flag_radii[:] = scenario.flag_radii
+        if len(scenario.flag_radii):
+            self.flag_radius = float(scenario.flag_radii[0])
+        self.reset()
+
+    def create_flags(self, np_random=None):
         """ Generates random flags within the world area. 
 
+        Args:
+            np_random (np.random.Generator or RandomState): Draw all positions
+                from it in one call. The global random module is used if None.
+
         Returns:
             Flags. A list of Flag objects with random locations. None location
                        values determined by world size.
@@ -94,6 +427,11 @@ class World():
                 make 1/10 of the world scoring. 30 ~ 10Pi.
         """
 
+        if np_random is not None:
+            positions = layout.random_positions(np_random, (int(self.flag_count),),
+                                                0, 0, self.width, self.height)
+            return np.array([flag.Flag(p, self.flag_radius) for p in positions])
+
         flags = []
         for i in range(int(self.flag_count)):
             flags.append(flag.Flag.random_flag(0, 0, self.width, self.height, self.flag_radius))
@@ -107,39 +445,124 @@ class World():
         """
         return  map ((lambda t : map((lambda a : command.from_action(a)), t)), actions)
 
+    def to_arrays(self, actions):
+        """ Given the actions (as defined by the Gym Env) for each agent,
+               writes them into the preallocated action arrays. Equivalent to
+               to_commands without creating a Command per agent.
+
+        Args:
+            actions ([[action]]) - (action type, vector) for every agent.
+
+        Returns:
+            (action types (np array of ints), vectors (np array, N x 2))
+        """
+        i = 0
+        for team_actions in actions:
+            for a in team_actions:
+                self.action_types[i] = a[0]
+                self.action_vectors[i] = a[1]
+                i += 1
+        return self.action_types, self.action_vectors
+
+    def move_agents(self, vectors, mask=None):
+        """ Moves every agent by its vector and turns it in the direction of
+                movement (see Agent.move), then applies the physics.
+
+        Args:
+            vectors (np array, N x 2) - dx and dy of every agent.
+            mask (np array of booleans) - Agents to move. All if None.
+
+        Mutates:
+            self.agent_positions
+            self.agent_orientations
+        """
+        agent.move(self.agent_positions, self.agent_orientations, vectors, mask)
+        self.apply_physics()
+
+    def has_physics(self):
+        return self.boundary != 'none' or self.body_radius > 0
+
+    def apply_physics(self):
+        """ Resolves agent collisions, then keeps the agents inside the world.
+
+        Mutates:
+            self.agent_positions
+        """
+        if self.body_radius > 0:
+            overlaps = physics.resolve_collisions(self.agent_positions,
+                                                  self.body_radius,
+                                                  self.body_grid)
+            if self.profiler is not None:
+                self.profiler.count('collisions', overlaps)
+        physics.apply_boundary(self.agent_positions, self.width, self.height,
+                               self.boundary)
+
+    def use_kernel(self):
+        """ Whether steps use the compiled step kernel (see backend). """
+        return (self.backend == 'numba' and not self.use_grid()
+                and not self.has_physics() and self.statistics is None)
+
+    def use_grid(self):
+        """ Whether scoring uses the spatial index (see spatial_index). """
+        if self.spatial_index == 'auto':
+            pairs = self.flag_count * len(self.agent_positions)
+            return pairs > SPATIAL_INDEX_PAIRS
+        return self.spatial_index == 'grid'
 
     def score_flags(self):
-        """ Score and update the flags based on current agent position.
+        """ Score and update the flags not yet taken based on current agent
+                position, and count the captures.
 
         Returns:
-            None
+            np array of ints. Indices of the flags taken by this update.
 
         Mutates:
             self.flags - Each flag will have the most up-to-date scoring status
+            self.active_flags, self.team_captures
         """
-        for flag in self.flags:
-            if flag.taken:
-                continue
-            max_team_score = 0
-            team_id = None
-            for team in self.teams:
-                team_score = 0
-                for agent in team.agents:
-                    if flag.within_scoring_distance(agent.loc):
-                        team_score += 1
-                if team_score > max_team_score:
-                    max_team_score = team_score
-                    team_id = team.team
-            if team_id is not None:
-                if team_id != flag.scoring_team:
-                    flag.reset()
-                    flag.scoring_team = team_id
-                flag.scoring_count += 1
-                if flag.scoring_count >= self.time_to_score:
-                    flag.take(team_id)
-        
+        active = self.active_flags
+        if len(active) == 0:
+            return active
+        if len(active) == self.flag_count:
+            positions, radii = self.flag_positions, self.flag_radii
+            taken = self.flag_taken
+            teams = self.flag_teams
+            scoring_counts = self.flag_scoring_counts
+        else:
+            positions = self.flag_positions[active]
+            radii = self.flag_radii[active]
+            taken = self.flag_taken[active]
+            teams = self.flag_teams[active]
+            scoring_counts = self.flag_scoring_counts[active]
+
+        if self.use_grid():
+            self.grid.rebuild(self.agent_positions, spatial.cell_size(radii))
+            counts = scoring.team_counts_indexed(positions, radii,
+                                                 self.agent_positions,
+                                                 self.agent_team_index,
+                                                 self.team_count, self.grid)
+        else:
+            counts = scoring.team_counts(positions, radii,
+                                         self.agent_positions,
+                                         self.agent_team_index, self.team_count)
+        captured = scoring.update_flags(counts, self.team_ids, taken, teams,
+                                        scoring_counts, self.time_to_score)
+        if self.statistics is not None:
+            self.statistics.on_score(self, active, counts, captured)
+
+        if len(active) != self.flag_count:
+            self.flag_taken[active] = taken
+            self.flag_teams[active] = teams
+            self.flag_scoring_counts[active] = scoring_counts
+        if not captured.any():
+            return active[:0]
+        owners = teams[captured]
+        self.team_captures += (owners[:, None] == self.team_ids).sum(axis=0)
+        self.active_flags = active[~captured]
+        return active[captured]
+
     def world_step(self, actions):
-        """ Convert actions into command format, execute commands, score flags
+        """ Convert actions into arrays, move agents in place, score flags
             appropriately, and move time forward.
 
         Args:
@@ -153,11 +576,93 @@ class World():
             self.flags - updates scoring status
             self.time  - increments
         """
-        commands = self.to_commands(actions)
-        self.apply_commands(commands)
-        self.score_flags()
-        self.timestep()
+        profiler = self.profiler
+        opened = False
+        if profiler is not None:
+            opened = not profiler.in_step
+            start = profiler.begin_step() if opened else profiler.start()
+        try:
+            action_types, vectors = self.to_arrays(actions)
+            if profiler is not None:
+                profiler.lap('actions', start)
+            self.world_step_arrays(vectors, action_types)
+        finally:
+            if opened:
+                profiler.end_step()
+
+    def world_step_arrays(self, vectors, action_types=None):
+        """ world_step for actions given as arrays. No Command objects are
+                created; the vectors feed straight into the movement update.
+
+        Args:
+            vectors (np array, N x 2) - move vector of every agent, in team
+                                        order.
+            action_types (np array of ints) - action type of every agent.
+                                              All MOVE if None.
+
+        Mutates:
+            self.teams - moves agents
+            self.flags - updates scoring status
+            self.time  - increments
+        """
+        profiler = self.profiler
+        opened = False
+        if profiler is not None:
+            opened = not profiler.in_step
+            start = profiler.begin_step() if opened else profiler.start()
+        try:
+            mask = None
+            if action_types is not None:
+                mask = command.move_mask(action_types)
+            if self.use_kernel():
+                evaluated = len(self.active_flags)
+                captured = self.kernel_step(vectors, mask)
+                if profiler is not None:
+                    profiler.lap('kernel', start)
+                    moved = len(vectors) if mask is None else np.count_nonzero(mask)
+                    profiler.count('agents_moved', int(moved))
+                    profiler.count('flags_evaluated', int(evaluated))
+                    profiler.count('captures', captured)
+            else:
+                self.move_agents(vectors, mask)
+                if profiler is not None:
+                    start = profiler.lap('move', start)
+                    moved = len(vectors) if mask is None else np.count_nonzero(mask)
+                    profiler.count('agents_moved', int(moved))
+                    evaluated = len(self.active_flags)
+                captured = self.score_flags()
+                if profiler is not None:
+                    profiler.lap('score', start)
+                    profiler.count('flags_evaluated', int(evaluated))
+                    profiler.count('captures', len(captured))
+            self.timestep()
+        finally:
+            if opened:
+                profiler.end_step()
     
+    def kernel_step(self, vectors, mask=None):
+        """ Moves the agents and scores the flags in one call of the
+                compiled kernels._step_kernel.
+
+        Returns:
+            int. Number of flags taken.
+
+        Mutates:
+            Same as move_agents and score_flags.
+        """
+        if mask is None:
+            mask = self.move_all
+        captured = kernels.load_step_kernel()(
+            self.agent_positions, self.agent_orientations, np.asarray(vectors),
+            mask, self.flag_positions, self.flag_radii, self.flag_taken,
+            self.flag_teams, self.flag_scoring_counts, self.agent_team_index,
+            self.team_ids, self.time_to_score, self.team_captures,
+            self.kernel_counts)
+        if captured:
+            active = self.active_flags
+            self.active_flags = active[~self.flag_taken[active]]
+        return captured
+
     def apply_commands(self, commands):
         """ Every agent applies the appropriate inputted command.
 
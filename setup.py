@@ -3,6 +3,7 @@ from setuptools import setup, find_packages
 setup(name='gym_ctf',
       version='0.0.1',
       install_requires=['gym'],
-      py_modules=['gym_ctf.state.flag', 'gym_ctf.state.world',
-                  'gym_ctf.state.agent', 'gym_ctf.state.team']
+      extras_require={'numba': ['numba']},
+      entry_points={'gym.envs': ['__root__ = gym_ctf.registration:register_envs']},
+      packages=find_packages(exclude=['tests', 'benchmarks']),
 )
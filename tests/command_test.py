@@ -1,3 +1,15 @@
 import numpy as np
 
 import gym_ctf.state.command as command
+
+def test_move_mask():
+    mask = command.move_mask(np.array([0, 0, 0]))
+
+    assert mask.all()
+
+def test_move_mask_unknown_command():
+    try:
+        command.move_mask(np.array([0, 7]))
+        assert False
+    except KeyError:
+        pass
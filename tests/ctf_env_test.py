@@ -0,0 +1,226 @@
+import numpy as np
+
+from gym_ctf.envs import CtfEnv, CtfSingleTeamEnv
+from gym_ctf.state import observation
+from gym_ctf.state import policies
+
+def test_flat_observation():
+    env = CtfEnv(observation_mode='flat')
+    obs = env._reset()
+
+    assert obs.shape == env.observation_space.shape
+    assert obs.dtype == np.float32
+    assert not obs.flags.writeable
+
+    agents, flags, time = observation.split_observation(obs, 8, 10)
+    assert np.allclose(agents[:, :2], env.world.agent_positions)
+    assert (agents[:, 3] == env.world.agent_teams).all()
+    assert np.allclose(flags[:, :2], env.world.flag_positions)
+    assert time == 0
+
+def test_flat_observation_is_not_reallocated():
+    env = CtfEnv(observation_mode='flat', read_only_observation=False)
+    obs = env._reset()
+
+    next_obs, _, _, _ = env._step(env.action_space.sample())
+
+    assert next_obs is obs
+    assert obs.flags.writeable
+    assert obs[-1] == 1
+
+def test_flat_observation_flag_owner():
+    env = CtfEnv(observation_mode='flat')
+    env._reset()
+    env.world.flags[2].take(2)
+    env.world.flags[3].scoring_team = 1
+
+    _, flags, _ = observation.split_observation(env.get_observation(), 8, 10)
+
+    assert flags[2, 2] == 2
+    assert flags[3, 2] == 0
+
+def test_array_actions_match_tuple_actions():
+    tuple_env = CtfEnv()
+    array_env = CtfEnv(action_mode='array')
+    array_env.world.agent_positions[:] = tuple_env.world.agent_positions
+
+    action = tuple_env.action_space.sample()
+    tuple_env._step(action)
+    array_env._step(np.array([a[1] for a in action]))
+
+    assert np.allclose(tuple_env.world.agent_positions,
+                       array_env.world.agent_positions)
+    assert np.allclose(tuple_env.world.agent_orientations,
+                       array_env.world.agent_orientations)
+
+def test_array_actions_with_types():
+    env = CtfEnv(action_mode='array')
+    start = env.world.agent_positions.copy()
+
+    env._step((np.zeros(8, dtype=int), np.ones((8, 2))))
+
+    assert np.allclose(env.world.agent_positions, start + 1)
+
+def test_array_action_validation():
+    env = CtfEnv(action_mode='array', validate_actions=True)
+    try:
+        env._step(np.full((8, 2), 2.0))
+        assert False
+    except AssertionError as e:
+        assert 'within' in str(e)
+
+    unchecked = CtfEnv(action_mode='array')
+    unchecked._step(np.full((8, 2), 2.0))
+
+class FakeGeom():
+    def __init__(self, *args):
+        self.colors = []
+        self.attrs = []
+
+    def add_attr(self, attr):
+        self.attrs.append(attr)
+
+    def set_color(self, r, g, b):
+        self.colors.append((r, g, b))
+
+class FakeTransform():
+    def __init__(self):
+        self.translation = None
+        self.rotation = None
+
+    def set_translation(self, x, y):
+        self.translation = (x, y)
+
+    def set_rotation(self, theta):
+        self.rotation = theta
+
+class FakeViewer():
+    created = 0
+
+    def __init__(self, width, height):
+        FakeViewer.created += 1
+        self.geoms = []
+
+    def add_geom(self, geom):
+        self.geoms.append(geom)
+
+    def render(self, return_rgb_array=False):
+        return return_rgb_array
+
+    def close(self):
+        pass
+
+def fake_rendering(monkeypatch):
+    import sys
+    import types
+    rendering = types.ModuleType('rendering')
+    rendering.Viewer = FakeViewer
+    rendering.FilledPolygon = FakeGeom
+    rendering.make_circle = FakeGeom
+    rendering.Transform = FakeTransform
+    monkeypatch.setitem(sys.modules, 'gym.envs.classic_control.rendering',
+                        rendering)
+    import gym.envs.classic_control
+    monkeypatch.setattr(gym.envs.classic_control, 'rendering', rendering,
+                        raising=False)
+
+def test_render_keeps_viewer_and_updates_transforms(monkeypatch):
+    fake_rendering(monkeypatch)
+    FakeViewer.created = 0
+    env = CtfEnv(action_mode='array')
+
+    env._render()
+    env._step(np.ones((8, 2)))
+    env._render()
+
+    assert FakeViewer.created == 1
+    x, y = env.world.agent_positions[0] * env.render_scale
+    assert env.robot_trans[0].translation == (x, y)
+    assert env.robot_trans[0].rotation == env.world.agent_orientations[0]
+
+def test_render_recolours_only_changed_flags(monkeypatch):
+    fake_rendering(monkeypatch)
+    env = CtfEnv()
+    env._render()
+
+    env.world.flags[4].take(2)
+    env._render()
+    env._render()
+
+    assert env.flag_geoms[4].colors == [tuple(env.FLAG_COLOR),
+                                        tuple(env.COLOR[2])]
+    assert len(env.flag_geoms[3].colors) == 1
+
+def test_end_on_all_captured():
+    env = CtfEnv(action_mode='array', number_flags=2, time_limit=100,
+                 end_on_all_captured=True)
+    env.world.flag_positions[:] = env.world.agent_positions[0]
+    env.world.agent_team_index[:] = 0
+
+    dones = [env._step(np.zeros((8, 2)))[2] for _ in range(env.time_to_score)]
+
+    assert dones == [False] * (env.time_to_score - 1) + [True]
+    assert list(env.world.get_reward()) == [2, 0]
+
+def test_nearest_observation():
+    env = CtfEnv(observation_mode='nearest', nearest=(3, 3, 5),
+                 number_agents_per_team=(3, 4))
+    obs = env._reset()
+    w = env.world
+    w.flags[0].take(2)
+
+    assert obs.shape == env.observation_space.shape == (7, 3 + 12 + 9 + 15 + 1)
+    assert obs.dtype == np.float32
+    obs = env.get_observation()
+    assert env.observation_space.contains(obs)
+    assert np.allclose(obs[:, :2], w.agent_positions)
+
+    flags_nearest = np.argsort(np.linalg.norm(
+        w.flag_positions[None] - w.agent_positions[:, None], axis=-1), axis=1)
+    for i in range(7):
+        row = obs[i, 3:15].reshape(3, 4)
+        offsets = w.flag_positions[flags_nearest[i, :3]] - w.agent_positions[i]
+        assert np.allclose(np.abs(row[:, :2]), np.abs(offsets), atol=1e-4)
+        assert (row[:, 2] == 1).all()
+        for f, status in zip(flags_nearest[i, :3], row[:, 3]):
+            expected = 0 if f != 0 else (1 if w.agent_teams[i] == 2 else -1)
+            assert status == expected
+
+    # One teammate of each agent of team 1 is missing; opponents pad to 5.
+    teammates = obs[:, 15:24].reshape(7, 3, 3)
+    opponents = obs[:, 24:39].reshape(7, 5, 3)
+    assert teammates[:3, :, 2].tolist() == [[1, 1, 0]] * 3
+    assert (teammates[3:, :, 2] == 1).all()
+    assert opponents[:3, :, 2].tolist() == [[1, 1, 1, 1, 0]] * 3
+    assert opponents[3:, :, 2].tolist() == [[1, 1, 1, 0, 0]] * 4
+    assert (opponents[:, :, :2][opponents[:, :, 2] == 0] == 0).all()
+    assert (obs[:, -1] == 0).all()
+
+def test_single_team_env():
+    env = CtfSingleTeamEnv(action_mode='array', number_agents_per_team=(2, 3),
+                           opponent_policy='split_coverage')
+    env._reset()
+    start = env.world.agent_positions[2:].copy()
+    expected = policies.split_coverage(env.world, np.arange(2, 5))
+
+    obs, reward, done, info = env._step(np.zeros((2, 2)))
+
+    assert env.action_space.shape == (2, 2)
+    assert np.allclose(env.world.agent_positions[2:], start + expected)
+    assert reward == 0.0
+    assert info['team_captures'].tolist() == [0, 0]
+
+def test_single_team_reward_counts_new_captures():
+    env = CtfSingleTeamEnv(number_agents_per_team=(4, 1),
+                           opponent_policy=lambda w, agents: np.zeros((len(agents), 2)))
+    env._reset()
+    env.world.agent_positions[:4] = env.world.flag_positions[0]
+    env.world.agent_positions[4] = -100
+    noop = tuple((0, np.zeros(2, dtype=np.float32)) for _ in range(4))
+
+    rewards = [env._step(noop)[1] for _ in range(env.time_to_score + 1)]
+
+    assert rewards[-2:] == [1.0, 0.0]
+    assert sum(rewards) == 1.0
+    env._reset()
+    assert env.learner_captures == 0
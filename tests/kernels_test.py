@@ -0,0 +1,112 @@
+import random
+import warnings
+import numpy as np
+import pytest
+
+import gym_ctf.state.world as world
+import gym_ctf.state.agent as agent
+import gym_ctf.state.team as team
+import gym_ctf.state.flag as flag
+from gym_ctf.state import kernels
+from gym_ctf.envs import CtfEnv
+
+numba_only = pytest.mark.skipif(not kernels.AVAILABLE,
+                                reason="Numba is not installed")
+
+def build_world(seed, team_ids, agents_per_team, flag_count, size, backend):
+    rng = random.Random(seed)
+    teams = []
+    for t in team_ids:
+        agents = [agent.Agent((rng.randrange(size), rng.randrange(size)), 0, t)
+                  for _ in range(agents_per_team)]
+        teams.append(team.Team(np.array(agents), t))
+    flags = np.array([flag.Flag((rng.randrange(size), rng.randrange(size)),
+                                rng.choice([0, 1, 1.5, 2]))
+                      for _ in range(flag_count)])
+    return world.World(size, size, np.array(teams), flags, time_to_score=2,
+                       spatial_index='brute', backend=backend)
+
+STATE = ('agent_positions', 'flag_taken', 'flag_teams', 'flag_scoring_counts',
+         'team_captures', 'active_flags')
+
+# NumPy's vectorized arctan2 and the libm one used by Numba may differ in the
+# last bits, so orientations are compared with a tolerance.
+ORIENTATION_TOLERANCE = 1e-6
+
+def assert_same_state(a, b):
+    for name in STATE:
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+    assert np.allclose(a.agent_orientations, b.agent_orientations, rtol=0,
+                       atol=ORIENTATION_TOLERANCE)
+    assert a.time == b.time
+
+@numba_only
+@pytest.mark.parametrize('team_ids', [[1, 2], [0, 1, 2], [4, 2, 7, 1]])
+def test_kernel_matches_numpy_world(team_ids):
+    for seed in range(5):
+        reference = build_world(seed, team_ids, 4, 12, 6, 'numpy')
+        compiled = build_world(seed, team_ids, 4, 12, 6, 'numba')
+        rng = np.random.RandomState(seed)
+
+        for _ in range(20):
+            vectors = rng.randint(-1, 2, (len(team_ids) * 4, 2)).astype(float)
+            reference.world_step_arrays(vectors)
+            compiled.world_step_arrays(vectors)
+            assert_same_state(reference, compiled)
+            assert np.array_equal(reference.get_reward(),
+                                  compiled.get_reward())
+
+@numba_only
+def test_kernel_matches_with_float_vectors_and_action_types():
+    reference = build_world(9, [1, 2], 8, 20, 10, 'numpy')
+    compiled = build_world(9, [1, 2], 8, 20, 10, 'numba')
+    rng = np.random.RandomState(0)
+    types = np.zeros(16, dtype=int)
+
+    for _ in range(30):
+        vectors = rng.uniform(-1, 1, (16, 2)).astype(np.float32)
+        reference.world_step_arrays(vectors, types)
+        compiled.world_step_arrays(vectors, types)
+        assert_same_state(reference, compiled)
+
+@numba_only
+def test_kernel_counts_captures_in_profile():
+    env = CtfEnv(action_mode='array', backend='numba', profile=True)
+    env.world.agent_positions[:] = env.world.flag_positions[0]
+    env.world.agent_team_index[:] = 0
+    for _ in range(env.time_to_score):
+        _, reward, _, info = env._step(np.zeros((8, 2)))
+
+    assert 'kernel' in info['profile']['phase_seconds']
+    assert env.profile_stats()['counters']['captures'] >= 1
+    assert reward[0] >= 1
+    assert 0 not in env.world.active_flags
+
+@numba_only
+def test_env_backends_agree():
+    a = CtfEnv(observation_mode='flat', action_mode='array', seed=3)
+    b = CtfEnv(observation_mode='flat', action_mode='array', seed=3,
+               backend='numba')
+    rng = np.random.RandomState(1)
+
+    for _ in range(25):
+        actions = rng.uniform(-1, 1, (8, 2)).astype(np.float32)
+        obs_a, reward_a, done_a, _ = a._step(actions)
+        obs_b, reward_b, done_b, _ = b._step(actions)
+        assert_same_state(a.world, b.world)
+        assert np.allclose(obs_a, obs_b, rtol=0, atol=ORIENTATION_TOLERANCE)
+        assert np.array_equal(reward_a, reward_b)
+        assert done_a == done_b
+        if done_a:
+            a._reset()
+            b._reset()
+
+def test_numba_falls_back_without_numba(monkeypatch):
+    monkeypatch.setattr(kernels, 'AVAILABLE', False)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        env = CtfEnv(backend='numba')
+
+    assert env.world.backend == 'numpy'
+    assert any('Numba' in str(w.message) for w in caught)
+    env._step(env.action_space.sample())
@@ -0,0 +1,48 @@
+import numpy as np
+
+from gym_ctf.envs import CtfEnv, VecCtfEnv
+from gym_ctf.state import layout
+
+def test_random_positions_within_bounds():
+    points = layout.random_positions(np.random.RandomState(0), (100, 3), 2, 5, 4, 6)
+
+    assert points.shape == (100, 3, 2)
+    assert set(np.unique(points[..., 0])) == {2, 3}
+    assert (points[..., 1] == 5).all()
+
+def test_generate_layouts_with_generator():
+    agents, flags = layout.generate_layouts(np.random.default_rng(0), 7, 10, 20,
+                                            4, 3)
+
+    assert agents.shape == (7, 4, 2)
+    assert flags.shape == (7, 3, 2)
+    assert (agents[..., 1] < 20).all()
+
+def test_env_layout_is_seeded():
+    a = CtfEnv(seed=5)
+    b = CtfEnv(seed=5)
+
+    assert np.array_equal(a.world.agent_positions, b.world.agent_positions)
+    assert np.array_equal(a.world.flag_positions, b.world.flag_positions)
+
+def test_reset_randomizes_layout():
+    env = CtfEnv(seed=1)
+    agents = env.world.agent_positions.copy()
+    flags = env.world.flag_positions.copy()
+
+    env._reset()
+    assert np.array_equal(env.world.agent_positions, agents)
+
+    env._reset(randomize=True)
+    assert not np.array_equal(env.world.agent_positions, agents)
+    assert not np.array_equal(env.world.flag_positions, flags)
+    assert (env.world.agent_orientations == 0).all()
+
+def test_vec_env_randomizes_reset_games_only():
+    env = VecCtfEnv(3, seed=0, randomize_on_reset=True)
+    agents = env.agent_positions.copy()
+
+    env.reset_worlds(np.array([False, True, False]))
+
+    assert np.array_equal(env.agent_positions[[0, 2]], agents[[0, 2]])
+    assert not np.array_equal(env.agent_positions[1], agents[1])
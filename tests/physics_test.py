@@ -0,0 +1,66 @@
+import numpy as np
+
+from gym_ctf.envs import CtfEnv
+from gym_ctf.state import physics
+from gym_ctf.state import spatial
+
+def min_distance(positions):
+    distance = np.linalg.norm(positions[:, None] - positions[None], axis=-1)
+    np.fill_diagonal(distance, np.inf)
+    return distance.min()
+
+def test_clamp_and_wrap():
+    positions = np.array([[-1.0, 5.0], [12.0, 21.0], [3.0, 4.0]])
+
+    clamped = positions.copy()
+    physics.apply_boundary(clamped, 10, 20, 'clamp')
+    wrapped = positions.copy()
+    physics.apply_boundary(wrapped, 10, 20, 'wrap')
+    unchanged = positions.copy()
+    physics.apply_boundary(unchanged, 10, 20, 'none')
+
+    assert clamped.tolist() == [[0, 5], [10, 20], [3, 4]]
+    assert wrapped.tolist() == [[9, 5], [2, 1], [3, 4]]
+    assert (unchanged == positions).all()
+
+def test_pair_is_pushed_apart_symmetrically():
+    positions = np.array([[0.0, 0.0], [1.0, 0.0], [10.0, 10.0]])
+
+    overlaps = physics.resolve_collisions(positions, 1, spatial.UniformGrid(1))
+
+    assert overlaps == 1
+    assert np.allclose(positions, [[-0.5, 0], [1.5, 0], [10, 10]])
+
+def test_coincident_agents_are_separated():
+    positions = np.zeros((2, 2))
+
+    physics.resolve_collisions(positions, 0.5, spatial.UniformGrid(1))
+
+    assert np.isclose(np.linalg.norm(positions[0] - positions[1]), 1)
+
+def test_crowd_relaxes():
+    rng = np.random.RandomState(0)
+    positions = rng.uniform(0, 20, (200, 2))
+
+    physics.resolve_collisions(positions, 0.5, spatial.UniformGrid(1),
+                               iterations=50)
+
+    assert min_distance(positions) > 0.99
+
+def test_env_physics_keeps_agents_in_world():
+    env = CtfEnv(action_mode='array', boundary='clamp', body_radius=0.5,
+                 number_agents_per_team=(20, 20), world_width=20,
+                 world_height=20, time_limit=100, profile=True)
+    env._reset()
+    env.world.agent_positions[:] = 10
+
+    for _ in range(30):
+        env._step(np.zeros((40, 2)))
+
+    assert min_distance(env.world.agent_positions) > 0.9
+    for _ in range(30):
+        env._step(np.ones((40, 2)))
+
+    positions = env.world.agent_positions
+    assert (positions >= 0).all() and (positions <= 20).all()
+    assert env.profile_stats()['counters']['collisions'] > 0
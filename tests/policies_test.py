@@ -0,0 +1,73 @@
+import numpy as np
+
+import gym_ctf.state.world as world
+import gym_ctf.state.agent as agent
+import gym_ctf.state.team as team
+import gym_ctf.state.flag as flag
+from gym_ctf.state import policies
+
+def make_world(agent_positions, flag_positions, teams=(1, 2)):
+    team_list = []
+    for t, positions in zip(teams, agent_positions):
+        agents = [agent.Agent(p, 0, t) for p in positions]
+        team_list.append(team.Team(np.array(agents), t))
+    flags = np.array([flag.Flag(p, 1) for p in flag_positions])
+    return world.World(50, 50, np.array(team_list), flags, time_to_score=2)
+
+def test_nearest_flag():
+    w = make_world([[(0, 0)], [(10, 10), (40, 40)]],
+                   [(12, 10), (35, 40), (0, 30)])
+
+    vectors = policies.nearest_flag(w, np.array([1, 2]))
+
+    assert np.allclose(vectors, [[1, 0], [-1, 0]])
+
+def test_nearest_flag_skips_taken_flags():
+    w = make_world([[(0, 0)], [(10, 10)]], [(10, 11), (10, 14)])
+    w.flags[0].take(1)
+    w.sync_flags()
+
+    vectors = policies.nearest_flag(w, np.array([1]))
+
+    assert np.allclose(vectors, [[0, 1]])
+
+def test_steer_stops_on_target():
+    vectors = policies.steer(np.array([[0.0, 0.0], [0.0, 0.0]]),
+                             np.array([[0.5, 0.0], [3.0, 4.0]]))
+
+    assert np.allclose(vectors, [[0.5, 0], [0.6, 0.8]])
+
+def test_most_threatened_flag():
+    w = make_world([[(0, 0)], [(0, 30), (20, 20)]],
+                   [(11, 10), (30, 20), (0, 40)])
+    w.flag_teams[1:] = 1
+    w.flag_scoring_counts[1:] = [1, 1]
+    w.flag_teams[0] = 2
+    w.flag_scoring_counts[0] = 1
+
+    vectors = policies.most_threatened_flag(w, np.array([1, 2]))
+
+    # Both threatened flags tie; each agent picks the nearer one.
+    assert np.allclose(vectors, [[0, 1], [1, 0]])
+
+def test_most_threatened_flag_without_threat_goes_to_nearest():
+    w = make_world([[(0, 0)], [(10, 10)]], [(11, 10), (30, 20)])
+
+    assert np.allclose(policies.most_threatened_flag(w, np.array([1])),
+                       policies.nearest_flag(w, np.array([1])))
+
+def test_split_coverage_spreads_agents():
+    w = make_world([[(0, 0)], [(5, 0), (25, 0), (45, 0), (15, 0)]],
+                   [(10, 0), (40, 0)])
+
+    vectors = policies.split_coverage(w, np.arange(1, 5))
+
+    assert np.allclose(vectors, [[1, 0], [1, 0], [-1, 0], [-1, 0]])
+
+def test_policies_stand_still_when_all_taken():
+    w = make_world([[(0, 0)], [(10, 10)]], [(11, 10)])
+    w.flags[0].take(1)
+    w.sync_flags()
+
+    for policy in policies.POLICIES.values():
+        assert (policy(w, np.array([1])) == 0).all()
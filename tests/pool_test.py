@@ -0,0 +1,80 @@
+import os
+import signal
+import numpy as np
+import pytest
+
+from gym_ctf.envs import CtfEnvPool
+
+def test_step_shapes():
+    with CtfEnvPool(5, 2, seed=3) as pool:
+        obs = pool.reset()
+        obs, rewards, dones, info = pool.step(np.zeros((5, 8, 2)))
+
+        assert obs.shape == (5,) + pool.observation_space.shape
+        assert rewards.shape == (5, 2)
+        assert dones.shape == (5,)
+        assert (obs[:, -1] == 1).all()
+        assert info['restarted'] == []
+
+def test_async_step_and_auto_reset():
+    with CtfEnvPool(3, 3, seed=0) as pool:
+        pool.reset()
+        for _ in range(10):
+            pool.step_async(np.zeros((3, 8, 2)))
+            obs, _, dones, _ = pool.step_wait()
+
+        assert dones.all()
+        assert (obs[:, -1] == 0).all()
+
+def test_seeding_is_per_worker():
+    with CtfEnvPool(2, 2, seed=7) as a, CtfEnvPool(2, 2, seed=7) as b:
+        assert np.array_equal(a.reset(), b.reset())
+
+def test_restarts_crashed_worker():
+    with CtfEnvPool(4, 2, seed=1) as pool:
+        pool.reset()
+        pool.step(np.zeros((4, 8, 2)))
+        os.kill(pool.processes[0].pid, signal.SIGKILL)
+        pool.processes[0].join()
+
+        obs, _, dones, info = pool.step(np.zeros((4, 8, 2)))
+
+        assert info['restarted'] == [0]
+        assert dones.tolist() == [True, True, False, False]
+        assert obs[:, -1].tolist() == [0, 0, 2, 2]
+
+def test_worker_error_leaves_no_stale_replies():
+    with CtfEnvPool(2, 2, seed=0, env_kwargs=dict(validate_actions=True,
+                                                  time_limit=100)) as pool:
+        pool.reset()
+        actions = np.zeros((2, 8, 2))
+        actions[0] = 5
+        with pytest.raises(AssertionError):
+            pool.step(actions)
+
+        for t in (1, 2, 3):
+            obs, _, _, _ = pool.step(np.zeros((2, 8, 2)))
+            # Env 0 did not step on the failed action; env 1 did.
+            assert obs[:, -1].tolist() == [t, t + 1]
+
+def test_worker_error_resets_its_shard():
+    with CtfEnvPool(2, 1, seed=0, env_kwargs=dict(validate_actions=True,
+                                                  time_limit=100)) as pool:
+        pool.reset()
+        actions = np.zeros((2, 8, 2))
+        actions[1] = 5
+        with pytest.raises(AssertionError):
+            pool.step(actions)
+
+        assert pool.arrays['dones'].all()
+        assert not pool.arrays['rewards'].any()
+        obs, _, _, _ = pool.step(np.zeros((2, 8, 2)))
+        assert obs[:, -1].tolist() == [1, 1]
+
+def test_close_frees_shared_memory():
+    pool = CtfEnvPool(2, 2)
+    names = [m.name for m in pool.memory.values()]
+    pool.close()
+
+    assert all(not p.is_alive() for p in pool.processes)
+    assert all(not os.path.exists('/dev/shm/' + name.lstrip('/')) for name in names)
@@ -0,0 +1,53 @@
+import time
+import tracemalloc
+import gym
+import numpy as np
+import pytest
+
+import gym_ctf
+from gym_ctf.envs import CtfEnv
+
+# Build time (seconds) and peak traced memory (MB) allowed per preset.
+LIMITS = {'small': (1, 1),
+          'medium': (2, 4),
+          'large': (5, 16),
+          'huge': (30, 128)}
+
+def test_every_preset_is_registered():
+    assert set(LIMITS) == set(gym_ctf.PRESETS)
+    for name in gym_ctf.PRESETS:
+        spec = gym.spec('ctf-%s-v0' % name)
+        assert spec.kwargs['observation_mode'] == 'flat'
+
+@pytest.mark.parametrize('name', sorted(LIMITS))
+def test_preset_builds_in_bounded_time_and_memory(name):
+    seconds, megabytes = LIMITS[name]
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        env = CtfEnv(observation_mode='flat', action_mode='array',
+                     **gym_ctf.PRESETS[name])
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert elapsed < seconds
+    assert peak / 2 ** 20 < megabytes
+    obs, _, _, _ = env._step(np.zeros(env.action_space.shape))
+    assert obs.shape == env.observation_space.shape
+
+def test_constructor_sets_world_parameters():
+    env = CtfEnv(world_width=30, world_height=20, number_agents_per_team=(2, 3, 1),
+                 number_flags=4, flag_radius=3, time_to_score=2, time_limit=7)
+
+    assert env.world.width == 30
+    assert env.world.height == 20
+    assert list(env.world.team_ids) == [1, 2, 3]
+    assert list(env.world.agent_teams) == [1, 1, 2, 2, 2, 3]
+    assert (env.world.flag_radii == 3).all()
+    assert env.world.time_to_score == 2
+    assert (env.world.agent_positions < [30, 20]).all()
+    for _ in range(6):
+        assert not env._step(env.action_space.sample())[2]
+    assert env._step(env.action_space.sample())[2]
@@ -0,0 +1,103 @@
+import json
+import numpy as np
+import pytest
+
+from gym_ctf.envs import CtfEnv
+from gym_ctf.state import profiling
+
+class FakeClock():
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.001
+        return self.now
+
+def test_lap_records_phase_durations():
+    p = profiling.StepProfiler(window=4, clock=FakeClock())
+    start = p.begin_step()
+    start = p.lap('move', start)
+    p.lap('score', start)
+
+    assert p.calls == {'move': 1, 'score': 1}
+    assert np.isclose(p.step_info()['phase_seconds']['move'], 0.001)
+
+def test_window_keeps_latest_samples():
+    p = profiling.StepProfiler(window=3)
+    for seconds in [1, 2, 3, 4, 5]:
+        p.record('step', seconds)
+
+    assert list(p.window_samples('step')) == [3, 4, 5]
+    stats = p.stats()['phases']['step']
+    assert stats['calls'] == 5
+    assert stats['total'] == 15
+    assert stats['max'] == 5
+
+def test_histograms_count_window():
+    p = profiling.StepProfiler()
+    for seconds in [1e-6, 1e-6, 1e-3, 10]:
+        p.record('step', seconds)
+    counts, edges = p.histograms()['step']
+
+    assert counts.sum() == 4
+    assert counts[-1] == 1
+    assert len(edges) == len(counts) + 1
+
+def test_export_writes_json(tmp_path):
+    p = profiling.StepProfiler()
+    p.record('step', 1e-4)
+    p.count('captures', 2)
+    p.export(str(tmp_path / 'profile.json'))
+
+    with open(str(tmp_path / 'profile.json')) as f:
+        report = json.load(f)
+    assert report['counters'] == {'captures': 2}
+    assert sum(report['histograms']['step']['counts']) == 1
+
+def test_env_profile_reports_phases_and_counters():
+    env = CtfEnv(action_mode='array', validate_actions=True, profile=True)
+    env.world.agent_positions[:] = env.world.flag_positions[0]
+    env.world.agent_team_index[:] = 0
+    for _ in range(env.world.time_to_score):
+        _, _, _, info = env._step(np.zeros((8, 2)))
+
+    phases = info['profile']['phase_seconds']
+    assert set(phases) == {'validate', 'move', 'score', 'reward',
+                           'observation', 'step'}
+    assert info['profile']['counts']['agents_moved'] == 8
+    stats = env.profile_stats()
+    assert stats['phases']['step']['calls'] == env.world.time_to_score
+    assert stats['counters']['captures'] >= 1
+    assert stats['counters']['flags_evaluated'] == 10 * env.world.time_to_score
+
+def test_world_step_counts_only_latest_step():
+    env = CtfEnv(action_mode='array', profile=True)
+    for _ in range(3):
+        env.world.world_step_arrays(np.zeros((8, 2)))
+
+    assert env.profiler.step_info()['counts']['agents_moved'] == 8
+    assert env.profiler.counters['agents_moved'] == 24
+
+def test_world_step_error_closes_profiler_step():
+    env = CtfEnv(action_mode='array', profile=True)
+    with pytest.raises(KeyError):
+        env.world.world_step_arrays(np.zeros((8, 2)), np.full(8, 99))
+    assert not env.profiler.in_step
+
+    env.world.world_step_arrays(np.zeros((8, 2)))
+    assert env.profiler.step_info()['counts']['agents_moved'] == 8
+
+def test_env_tuple_actions_profile_conversion():
+    env = CtfEnv(profile=True)
+    _, _, _, info = env._step(env.action_space.sample())
+
+    assert 'actions' in info['profile']['phase_seconds']
+    assert 'validate' in info['profile']['phase_seconds']
+
+def test_profiling_off_by_default():
+    env = CtfEnv(action_mode='array')
+    _, _, _, info = env._step(np.zeros((8, 2)))
+
+    assert info == {}
+    assert env.world.profiler is None
+    assert env.profile_stats() is None
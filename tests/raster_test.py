@@ -0,0 +1,79 @@
+import numpy as np
+
+from gym_ctf.envs import CtfEnv, VecCtfEnv
+from gym_ctf.state import agent
+from gym_ctf.state import raster
+from gym_ctf.state import team
+from gym_ctf.state import world
+
+def pixel(frame, x, y):
+    return tuple(frame[frame.shape[0] - 1 - y, x])
+
+def test_triangles_match_agent_triangle():
+    a = agent.Agent((3, 4), 0.7)
+    points = agent.triangles(np.array([[3, 4]]), np.array([0.7]), b=20, h=10)
+
+    assert np.allclose(points[0], a.triangle(b=20, h=10))
+
+def test_palette_uses_given_colors():
+    colors = raster.palette(3, {2: (1, 2, 3)})
+
+    assert tuple(colors[0]) == raster.FLAG_COLOR
+    assert tuple(colors[1]) == raster.TEAM_COLORS[0]
+    assert tuple(colors[2]) == (1, 2, 3)
+
+def test_render_frames_draws_agents_and_flags():
+    frames = raster.render_frames(
+        100, 100, np.array([[[20, 20]]]), np.zeros((1, 1)), np.array([[2]]),
+        np.array([[[70, 70], [70, 20]]]), np.full((1, 2), 14.7),
+        np.array([[True, False]]), np.array([[1, -1]]),
+        frame_width=100, frame_height=100)
+
+    assert frames.shape == (1, 100, 100, 3)
+    assert frames.dtype == np.uint8
+    assert pixel(frames[0], 20, 20) == raster.TEAM_COLORS[1]
+    assert pixel(frames[0], 70, 70) == raster.TEAM_COLORS[0]
+    assert pixel(frames[0], 70, 20) == raster.FLAG_COLOR
+    assert pixel(frames[0], 84, 70) == raster.RADIUS_COLOR
+    assert pixel(frames[0], 50, 50) == (255, 255, 255)
+
+def test_render_frames_clips_to_frame():
+    frames = raster.render_frames(
+        10, 10, np.array([[[0, 0]]]), np.zeros((1, 1)), np.array([[1]]),
+        np.array([[[10, 10]]]), np.array([[3.0]]), np.array([[False]]),
+        np.array([[-1]]), frame_width=40, frame_height=40)
+
+    assert pixel(frames[0], 0, 0) == raster.TEAM_COLORS[0]
+    assert pixel(frames[0], 39, 39) == raster.FLAG_COLOR
+
+def test_render_world_colors_sparse_team_ids():
+    teams = np.array([team.Team(np.array([agent.Agent((40 * i, 50), 0, t)]), t)
+                      for i, t in enumerate([4, 2, 7, 1], 1)])
+    w = world.World(100, 200, teams, flag_count=1)
+    w.flag_positions[:] = (0, 0)
+
+    frame = raster.render_world(w, frame_width=200, frame_height=100)
+
+    assert pixel(frame, 40, 50) == raster.TEAM_COLORS[3]
+    assert pixel(frame, 120, 50) == raster.TEAM_COLORS[0]
+
+def test_env_rgb_array_is_headless():
+    env = CtfEnv(seed=0)
+    env.world.flags[0].take(1)
+    frame = env._render(mode='rgb_array')
+
+    assert frame.shape == (env.SCREEN_HEIGHT, env.SCREEN_WIDTH, 3)
+    assert env.viewer is None
+    x, y = env.world.flag_positions[0] * [env.SCREEN_WIDTH / env.world_width,
+                                          env.SCREEN_HEIGHT / env.world_height]
+    assert pixel(frame, int(x), int(y)) == tuple(env.COLOR[1])
+
+def test_vec_render_matches_single_worlds():
+    env = VecCtfEnv(3, seed=0)
+    env.step(np.ones((3, env.number_agents, 2)))
+    frames = env.render()
+    one = env.render(indices=[1])
+
+    assert frames.shape == (3, 400, 600, 3)
+    assert np.array_equal(frames[1], one[0])
+    assert not np.array_equal(frames[0], frames[1])
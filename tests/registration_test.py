@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+def run(code):
+    return subprocess.run([sys.executable, '-c', code], check=True,
+                          capture_output=True, text=True).stdout.split()
+
+def test_core_imports_without_gym_or_numba():
+    loaded = run("import sys; import gym_ctf; import gym_ctf.state.world; "
+                 "print('gym' in sys.modules, 'numba' in sys.modules)")
+
+    assert loaded == ['False', 'False']
+
+def test_envs_register_when_adapter_loads():
+    specs = run("import gym_ctf, gym_ctf.envs, gym; "
+                "print(gym.spec('ctf-v0').entry_point, "
+                "gym.spec('ctf-small-v0').kwargs['action_mode'])")
+
+    assert specs == ['gym_ctf.envs:CtfEnv', 'array']
+
+def test_envs_register_when_gym_comes_first():
+    made = run("import gym, gym_ctf; "
+               "print(type(gym.make('ctf-v0').unwrapped).__name__)")
+
+    assert made == ['CtfEnv']
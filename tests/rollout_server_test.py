@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+
+from gym_ctf.envs import RolloutServer, RolloutClient
+
+class ServerThread():
+    def __init__(self, num_worlds, **kwargs):
+        self.path = os.path.join(tempfile.mkdtemp(), 'ctf.sock')
+        self.server = RolloutServer(self.path, num_worlds, seed=0, **kwargs)
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.server.start())
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        asyncio.run_coroutine_threadsafe(self.server.shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+def test_reset_and_step():
+    with ServerThread(2) as s, RolloutClient(s.path) as client:
+        obs = client.reset()
+        env = s.server.env
+
+        assert obs.shape == (env.obs.shape[1],)
+        assert np.allclose(obs[:2], env.agent_positions[client.world, 0])
+
+        obs, reward, done = client.step(np.ones((8, 2)))
+
+        assert obs[-1] == 1
+        assert reward.shape == (2,)
+        assert not done
+        assert np.allclose(obs[:2], env.agent_positions[client.world, 0])
+
+def test_released_world_is_reset():
+    with ServerThread(1) as s:
+        with RolloutClient(s.path) as client:
+            client.step(np.ones((8, 2)))
+        deadline = time.monotonic() + 5
+        while not s.server.free and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        with RolloutClient(s.path) as client:
+            obs, _, _ = client.step(np.zeros((8, 2)))
+
+        assert obs[-1] == 1
+
+def test_rejects_clients_when_full():
+    with ServerThread(1) as s, RolloutClient(s.path):
+        try:
+            RolloutClient(s.path)
+            assert False
+        except RuntimeError as e:
+            assert 'no free world' in str(e)
+
+def test_rejects_wrong_action_size():
+    with ServerThread(1) as s, RolloutClient(s.path) as client:
+        try:
+            client.step(np.ones((3, 2)))
+            assert False
+        except RuntimeError as e:
+            assert 'action size' in str(e)
+
+def test_coalesces_concurrent_steps():
+    with ServerThread(4, tick=0.05) as s:
+        clients = [RolloutClient(s.path) for _ in range(4)]
+        barrier = threading.Barrier(4)
+
+        def run(client):
+            barrier.wait()
+            for _ in range(5):
+                client.step(np.zeros((8, 2)))
+
+        threads = [threading.Thread(target=run, args=(c,)) for c in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for c in clients:
+            c.close()
+
+        assert s.server.steps == 20
+        assert s.server.batches < 20
+        assert (s.server.env.time == 5).all()
@@ -0,0 +1,74 @@
+import tempfile
+import numpy as np
+
+from gym_ctf.envs import CtfEnv
+from gym_ctf.state import scenario
+
+KEY = scenario.scenario_key(100, 100, 10, (4, 4), 3)
+
+def test_lru_eviction_and_counters():
+    cache = scenario.ScenarioCache(max_size=2)
+    keys = [KEY[:5] + (seed,) for seed in range(3)]
+
+    cache.get(keys[0])
+    cache.get(keys[1])
+    cache.get(keys[0])
+    cache.get(keys[2])
+
+    assert keys[0] in cache
+    assert keys[1] not in cache
+    assert cache.stats() == {'size': 2, 'max_size': 2, 'hits': 1, 'misses': 3,
+                             'disk_hits': 0, 'evictions': 1}
+
+def test_scenarios_are_deterministic():
+    a = scenario.generate_scenario(KEY)
+    b = scenario.ScenarioCache().get(KEY)
+
+    assert np.array_equal(a.agent_positions, b.agent_positions)
+    assert a.agent_positions.shape == (8, 2)
+    assert a.flag_positions.shape == (10, 2)
+
+def test_persists_to_disk():
+    path = tempfile.mkdtemp()
+    scenario.ScenarioCache(path=path).get(KEY)
+    cache = scenario.ScenarioCache(path=path)
+
+    loaded = cache.get(KEY)
+
+    assert cache.disk_hits == 1
+    assert np.array_equal(loaded.flag_positions,
+                          scenario.generate_scenario(KEY).flag_positions)
+
+def test_env_reset_loads_scenario():
+    cache = scenario.ScenarioCache()
+    env = CtfEnv(scenario_cache=cache)
+    env.world.flags[0].take(1)
+
+    env._reset(scenario=3)
+
+    expected = cache.get(KEY)
+    assert np.array_equal(env.world.agent_positions, expected.agent_positions)
+    assert np.array_equal(env.world.flag_positions, expected.flag_positions)
+    assert not env.world.flag_taken.any()
+
+    env._reset(scenario=KEY)
+    assert cache.hits == 2
+
+def test_env_scenario_keeps_flag_radius():
+    cache = scenario.ScenarioCache()
+    env = CtfEnv(scenario_cache=cache, flag_radius=5.0)
+
+    env._reset(scenario=3)
+
+    assert (env.world.flag_radii == 5.0).all()
+    assert env.scenario_key(3) != KEY
+    assert len(cache) == 1
+
+def test_world_takes_scenario_flag_radius():
+    env = CtfEnv()
+    key = scenario.scenario_key(100, 100, 10, (4, 4), 3, flag_radius=5.0)
+
+    env.world.load_scenario(scenario.generate_scenario(key))
+
+    assert env.world.flag_radius == 5.0
+    assert env.world.create_flags()[0].scoring_radius == 5.0
@@ -0,0 +1,111 @@
+import random
+import numpy as np
+
+import gym_ctf.state.world as world
+import gym_ctf.state.agent as agent
+import gym_ctf.state.team as team
+import gym_ctf.state.flag as flag
+import gym_ctf.state.scoring as scoring
+
+def reference_score_flags(flags, teams, time_to_score):
+    """ The original per-flag, per-team, per-agent scoring loop. """
+    for f in flags:
+        if f.taken:
+            continue
+        max_team_score = 0
+        team_id = None
+        for t in teams:
+            team_score = 0
+            for a in t.agents:
+                if f.within_scoring_distance(a.loc):
+                    team_score += 1
+            if team_score > max_team_score:
+                max_team_score = team_score
+                team_id = t.team
+        if team_id is not None:
+            if team_id != f.scoring_team:
+                f.reset()
+                f.scoring_team = team_id
+            f.scoring_count += 1
+            if f.scoring_count >= time_to_score:
+                f.take(team_id)
+
+def random_teams(rng, team_ids, agents_per_team, size):
+    teams = []
+    for t in team_ids:
+        agents = [agent.Agent((rng.randrange(size), rng.randrange(size)), 0, t)
+                  for _ in range(agents_per_team)]
+        teams.append(team.Team(np.array(agents), t))
+    return np.array(teams)
+
+def flag_state(flags):
+    return [(f.taken, f.scoring_team, f.scoring_count) for f in flags]
+
+def test_matches_reference():
+    rng = random.Random(3)
+    for team_ids in ([1, 2], [0, 1, 2], [4, 2, 7, 1]):
+        teams = random_teams(rng, team_ids, 6, 8)
+        flags = np.array([flag.Flag((rng.randrange(8), rng.randrange(8)),
+                                    rng.choice([0, 1, 1.5, 2]))
+                          for _ in range(15)])
+        expected = [flag.Flag(tuple(f.position), f.scoring_radius) for f in flags]
+        w = world.World(8, 8, teams, flags, time_to_score=3)
+
+        for _ in range(10):
+            for t in teams:
+                for a in t.agents:
+                    a.loc = (rng.randrange(8), rng.randrange(8))
+            reference_score_flags(expected, teams, 3)
+            w.score_flags()
+            assert flag_state(w.flags) == flag_state(expected)
+
+def test_tie_goes_to_first_team():
+    a = agent.Agent((0,0),0,1)
+    b = agent.Agent((0,0),0,2)
+    teams = np.array([team.Team(np.array([a]), 1), team.Team(np.array([b]), 2)])
+    f = flag.Flag((0,0), 1)
+    w = world.World(10, 10, teams, np.array([f]))
+
+    w.score_flags()
+
+    assert f.scoring_team == 1
+    assert f.scoring_count == 1
+
+def test_team_counts_batched():
+    flag_positions = np.array([[[0, 0]], [[5, 5]]], dtype=float)
+    flag_radii = np.ones((2, 1))
+    agent_positions = np.array([[[0, 0], [0, 1], [3, 3]],
+                                [[5, 5], [9, 9], [5, 4]]], dtype=float)
+    agent_team_index = np.array([0, 1, 1])
+
+    counts = scoring.team_counts(flag_positions, flag_radii, agent_positions,
+                                 agent_team_index, 2)
+
+    assert counts.shape == (2, 1, 2)
+    assert counts[0, 0].tolist() == [1, 1]
+    assert counts[1, 0].tolist() == [1, 1]
+
+def test_active_flags_and_captures_match_reference():
+    rng = random.Random(5)
+    for team_ids in ([1, 2], [4, 2, 7, 1]):
+        teams = random_teams(rng, team_ids, 6, 6)
+        flags = np.array([flag.Flag((rng.randrange(6), rng.randrange(6)), 1.5)
+                          for _ in range(12)])
+        expected = [flag.Flag(tuple(f.position), f.scoring_radius) for f in flags]
+        w = world.World(6, 6, teams, flags, time_to_score=2,
+                        spatial_index='brute')
+
+        for _ in range(8):
+            for t in teams:
+                for a in t.agents:
+                    a.loc = (rng.randrange(6), rng.randrange(6))
+            before = set(w.active_flags)
+            reference_score_flags(expected, teams, 2)
+            captured = w.score_flags()
+
+            assert flag_state(w.flags) == flag_state(expected)
+            untaken = [i for i, f in enumerate(expected) if not f.taken]
+            assert list(w.active_flags) == untaken
+            assert set(captured) == before - set(untaken)
+            owners = [f.scoring_team for f in expected if f.taken]
+            assert list(w.get_reward()) == [owners.count(t) for t in team_ids]
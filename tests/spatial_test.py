@@ -0,0 +1,98 @@
+import numpy as np
+
+import gym_ctf.state.world as world
+import gym_ctf.state.agent as agent
+import gym_ctf.state.team as team
+import gym_ctf.state.flag as flag
+import gym_ctf.state.spatial as spatial
+
+def test_candidates_contain_all_points_within_radius():
+    rng = np.random.RandomState(0)
+    points = rng.uniform(0, 50, (300, 2))
+    queries = rng.uniform(-5, 55, (40, 2))
+    grid = spatial.UniformGrid(spatial.cell_size([3]))
+    grid.rebuild(points)
+
+    query_index, point_index = grid.candidates(queries)
+    found = set(zip(query_index.tolist(), point_index.tolist()))
+
+    distance = np.linalg.norm(queries[:, None] - points[None], axis=-1)
+    expected = set(zip(*np.nonzero(distance <= 3)))
+    assert expected <= found
+    assert len(found) == len(query_index)
+
+def test_empty_grid():
+    grid = spatial.UniformGrid(1)
+
+    query_index, point_index = grid.candidates(np.array([[0.0, 0.0]]))
+
+    assert query_index.size == 0
+    assert point_index.size == 0
+
+def random_world(seed, spatial_index):
+    rng = np.random.RandomState(seed)
+    teams = []
+    for t in (1, 2, 3):
+        agents = [agent.Agent(tuple(p), 0, t) for p in rng.randint(0, 30, (20, 2))]
+        teams.append(team.Team(np.array(agents), t))
+    flags = [flag.Flag(tuple(p), r) for p, r in
+             zip(rng.randint(0, 30, (25, 2)), rng.choice([0, 1, 2.5], 25))]
+    return world.World(30, 30, np.array(teams), np.array(flags), time_to_score=3,
+                       spatial_index=spatial_index)
+
+def test_grid_scoring_matches_brute_force():
+    grid_world = random_world(4, 'grid')
+    brute_world = random_world(4, 'brute')
+    rng = np.random.RandomState(1)
+
+    for _ in range(15):
+        vectors = rng.uniform(-1, 1, (60, 2))
+        for w in (grid_world, brute_world):
+            w.move_agents(vectors)
+            w.score_flags()
+        assert (grid_world.flag_teams == brute_world.flag_teams).all()
+        assert (grid_world.flag_scoring_counts == brute_world.flag_scoring_counts).all()
+        assert (grid_world.flag_taken == brute_world.flag_taken).all()
+
+def test_auto_uses_grid_for_large_worlds():
+    small = random_world(0, 'auto')
+
+    assert not small.use_grid()
+
+    world.SPATIAL_INDEX_PAIRS, pairs = 0, world.SPATIAL_INDEX_PAIRS
+    try:
+        assert small.use_grid()
+    finally:
+        world.SPATIAL_INDEX_PAIRS = pairs
+
+def brute_nearest(points, queries, k, exclude_self=False):
+    distance = np.linalg.norm(queries[:, None] - points[None], axis=-1)
+    if exclude_self:
+        np.fill_diagonal(distance, np.inf)
+    distance = np.sort(distance, axis=1)[:, :k]
+    return np.pad(distance, ((0, 0), (0, k - distance.shape[1])),
+                  constant_values=np.inf)
+
+def test_nearest_neighbors_grid_matches_brute_force(monkeypatch):
+    rng = np.random.RandomState(2)
+    points = rng.randint(0, 200, (500, 2)).astype(float)
+    queries = rng.uniform(-20, 220, (300, 2))
+    monkeypatch.setattr(spatial, 'BRUTE_FORCE_PAIRS', 100)
+
+    for k, q, exclude_self in [(4, queries, False), (7, points, True)]:
+        index, distance = spatial.nearest_neighbors(points, q, k, exclude_self)
+
+        assert np.array_equal(distance, brute_nearest(points, q, k, exclude_self))
+        assert np.allclose(np.linalg.norm(q[:, None] - points[index], axis=-1),
+                           distance)
+        if exclude_self:
+            assert (index != np.arange(len(q))[:, None]).all()
+
+def test_nearest_neighbors_pads_missing():
+    points = np.array([[0.0, 0.0], [3.0, 4.0]])
+
+    index, distance = spatial.nearest_neighbors(points, points, 3, exclude_self=True)
+
+    assert index.tolist() == [[1, -1, -1], [0, -1, -1]]
+    assert distance[:, 0].tolist() == [5, 5]
+    assert np.isinf(distance[:, 1:]).all()
@@ -0,0 +1,79 @@
+import numpy as np
+
+import gym_ctf.state.world as world
+import gym_ctf.state.agent as agent
+import gym_ctf.state.team as team
+import gym_ctf.state.flag as flag
+from gym_ctf.envs import CtfEnv
+from gym_ctf.state import statistics
+
+def test_histogram_summary():
+    counts = np.bincount([1, 2, 2, 3, 10], minlength=12)
+
+    summary = statistics.histogram_summary(counts)
+
+    assert summary['count'] == 5
+    assert summary['mean'] == 18 / 5
+    assert summary['max'] == 10
+    assert (summary['p50'], summary['p90'], summary['p99']) == (2, 10, 10)
+
+def test_empty_histogram_summary():
+    summary = statistics.histogram_summary(np.zeros(4, dtype=int))
+
+    assert summary['count'] == 0
+    assert summary['mean'] is None and summary['p50'] is None
+
+def make_world(stats):
+    teams = [team.Team(np.array([agent.Agent((0, 0), 0, t)]), t) for t in (1, 2)]
+    flags = np.array([flag.Flag((0, 0), 1), flag.Flag((10, 0), 1),
+                      flag.Flag((20, 0), 1)])
+    return world.World(30, 30, np.array(teams), flags, time_to_score=2,
+                       statistics=stats)
+
+def step(w, positions):
+    w.agent_positions[:] = positions
+    w.score_flags()
+    w.timestep()
+
+def test_capture_times_contests_and_lead_changes():
+    stats = statistics.EpisodeStatistics(max_time=10, time_bins=5)
+    w = make_world(stats)
+
+    # Both teams contest flag 0 and team 1 takes it on the tie; team 2 then
+    # takes flags 1 and 2.
+    step(w, [(0, 0), (0, 0)])
+    step(w, [(0, 0), (0, 0)])
+    step(w, [(0, 0), (10, 0)])
+    step(w, [(50, 0), (10, 0)])
+    step(w, [(50, 0), (20, 0)])
+    step(w, [(50, 0), (20, 0)])
+    summary = stats.end_episode(w)
+
+    assert stats.capture_time.tolist() == [2, 4, 6]
+    assert summary['captures'] == [1, 2]
+    assert summary['lead_changes'] == 1
+    assert summary['capture_time']['count'] == 3
+    assert summary['capture_time']['mean'] == 4
+    assert summary['contested_steps']['max'] == 2
+    assert summary['team_captures_over_time'] == [[1, 0, 0, 0, 0],
+                                                  [0, 1, 1, 0, 0]]
+
+    w.reset()
+    assert (stats.capture_time == -1).all()
+    assert stats.summary()['episodes'] == 1
+    assert stats.summary()['capture_time']['count'] == 3
+
+def test_env_reports_stats_at_episode_end():
+    env = CtfEnv(action_mode='array', episode_stats=True, time_limit=5)
+    env._reset()
+    env.world.agent_positions[:] = env.world.flag_positions[0]
+    env.world.agent_team_index[:] = 0
+
+    infos = [env._step(np.zeros((8, 2)))[3] for _ in range(5)]
+
+    assert all('episode_stats' not in info for info in infos[:-1])
+    episode = infos[-1]['episode_stats']
+    assert episode['length'] == 5
+    assert episode['capture_time']['p50'] == env.time_to_score
+    assert env.episode_stats_summary()['episodes'] == 1
+    assert CtfEnv().episode_stats_summary() is None
@@ -0,0 +1,61 @@
+import numpy as np
+
+from gym_ctf.envs import sweep
+
+CONFIGS = sweep.grid(time_to_score=[1, 3],
+                     number_agents_per_team=[(2, 2), (2, 2, 2)],
+                     time_limit=[6])
+
+def test_grid():
+    configs = sweep.grid(a=[1, 2], b=['x'])
+
+    assert configs == [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'x'}]
+
+def run(path, workers=0, **kwargs):
+    runner = sweep.SweepRunner(str(path), CONFIGS, episodes=5,
+                               episodes_per_task=2, seed=4, workers=workers,
+                               **kwargs)
+    runner.run()
+    columns, _ = sweep.read_sweep(str(path))
+    order = np.lexsort((columns['episode'], columns['config']))
+    return {name: c[order] for name, c in columns.items()}
+
+def test_sweep_results(tmp_path):
+    columns, meta = run(tmp_path), sweep.read_sweep(str(tmp_path))[1]
+
+    assert len(columns['episode']) == 4 * 5
+    assert columns['config'].tolist() == np.repeat(np.arange(4), 5).tolist()
+    assert (columns['length'] == 6).all()
+    assert (columns['captures'][:, :2] >= 0).all()
+    assert (columns['captures'][columns['config'] % 2 == 0, 2] == -1).all()
+    assert meta['configs'][1]['number_agents_per_team'] == [2, 2, 2]
+
+def test_seeding_is_per_task(tmp_path):
+    serial = run(tmp_path / 'serial')
+    pooled = run(tmp_path / 'pooled', workers=2, chunksize=2)
+
+    for name in serial:
+        assert np.array_equal(serial[name], pooled[name])
+
+def test_resume_drops_partial_task(tmp_path):
+    full = run(tmp_path / 'full')
+    path = str(tmp_path / 'resumed')
+    runner = sweep.SweepRunner(path, CONFIGS, episodes=5, episodes_per_task=2,
+                               seed=4, workers=0)
+    assert runner.run(max_tasks=3) == 3
+    # An interrupted write: a partial row and a torn task log entry.
+    with open(runner.column_path('length'), 'ab') as f:
+        f.write(b'\x01\x02')
+    with open(str(tmp_path / 'resumed' / sweep.TASKS), 'ab') as f:
+        f.write(b'\x07' * 8)
+
+    resumed = sweep.SweepRunner(path, CONFIGS, episodes=5, episodes_per_task=2,
+                                seed=4, workers=0)
+    assert resumed.rows == 5
+    assert resumed.run() == 4 * 3 - 3
+    assert resumed.finished()
+
+    columns, _ = sweep.read_sweep(path)
+    order = np.lexsort((columns['episode'], columns['config']))
+    for name in full:
+        assert np.array_equal(columns[name][order], full[name])
@@ -0,0 +1,57 @@
+import tempfile
+import numpy as np
+
+from gym_ctf.envs import CtfEnv
+from gym_ctf.state.trajectory import TrajectoryRecorder, TrajectoryReader
+
+def record(path, episodes, steps, chunk_rows=4, seed=0):
+    env = CtfEnv(action_mode='array')
+    rng = np.random.RandomState(seed)
+    states = []
+    with TrajectoryRecorder(path, env.world, chunk_rows) as recorder:
+        for _ in range(episodes):
+            env._reset()
+            for i in range(steps):
+                actions = rng.uniform(-1, 1, (8, 2))
+                _, reward, _, _ = env._step(actions)
+                recorder.record(reward, actions, done=i == steps - 1)
+                states.append((env.world.agent_positions.copy(),
+                               env.world.flag_teams.copy(), actions))
+    return states
+
+def test_episodes_round_trip():
+    path = tempfile.mkdtemp()
+    states = record(path, 3, 5)
+    reader = TrajectoryReader(path)
+
+    assert len(reader) == 15
+    assert reader.episodes.tolist() == [[0, 5], [5, 10], [10, 15]]
+
+    episode = reader.episode(1)
+    for i, (positions, teams, actions) in enumerate(states[5:10]):
+        assert np.allclose(episode['agent_positions'][i], positions, atol=1e-4)
+        assert (episode['flag_teams'][i] == teams).all()
+        assert np.allclose(episode['actions'][i], actions, atol=1e-6)
+    assert episode['time'].tolist() == [1, 2, 3, 4, 5]
+
+def test_rows_at_spans_chunks():
+    path = tempfile.mkdtemp()
+    states = record(path, 2, 6, chunk_rows=5)
+    reader = TrajectoryReader(path)
+
+    batch = reader.rows_at([11, 0, 7, 4])
+
+    for i, row in enumerate([11, 0, 7, 4]):
+        assert np.allclose(batch['agent_positions'][i], states[row][0], atol=1e-4)
+    assert reader.sample(3)['rewards'].shape == (3, 2)
+
+def test_append_to_existing_trajectory():
+    path = tempfile.mkdtemp()
+    record(path, 1, 6, chunk_rows=4)
+    states = record(path, 1, 3, chunk_rows=4, seed=1)
+    reader = TrajectoryReader(path)
+
+    assert len(reader) == 9
+    assert reader.episodes.tolist() == [[0, 6], [6, 9]]
+    assert np.allclose(reader.read(6, 9)['actions'],
+                       [s[2] for s in states], atol=1e-6)
@@ -0,0 +1,99 @@
+import numpy as np
+
+import gym_ctf.state.world as world
+import gym_ctf.state.agent as agent
+import gym_ctf.state.team as team
+import gym_ctf.state.flag as flag
+from gym_ctf.envs import VecCtfEnv
+
+def world_from(env, i):
+    teams = []
+    agents = list(zip(env.agent_positions[i], env.agent_team_index))
+    for t, team_id in enumerate(env.team_ids):
+        members = [agent.Agent(tuple(p), 0, team_id) for p, ti in agents if ti == t]
+        teams.append(team.Team(np.array(members), team_id))
+    flags = [flag.Flag(tuple(p), env.flag_radius) for p in env.flag_positions[i]]
+    return world.World(env.world_height, env.world_width, np.array(teams),
+                       np.array(flags), time_to_score=env.time_to_score)
+
+def test_step_shapes():
+    env = VecCtfEnv(3, number_agents_per_team=(2, 3, 1), seed=0)
+    obs = env.reset()
+    actions = np.zeros((3, 6, 2))
+
+    obs, reward, done, info = env.step(actions)
+
+    assert obs.shape == (3, 6 * 4 + 10 * 3 + 1)
+    assert obs.dtype == np.float32
+    assert reward.shape == (3, 3)
+    assert done.shape == (3,)
+    assert env.observation_space.shape == obs.shape
+
+def test_matches_world():
+    env = VecCtfEnv(4, world_width=10, world_height=10, number_flags=5,
+                    flag_radius=2, time_to_score=2, time_limit=50, seed=1)
+    env.reset()
+    worlds = [world_from(env, i) for i in range(env.num_envs)]
+    rng = np.random.RandomState(0)
+
+    for _ in range(20):
+        actions = rng.uniform(-1, 1, (4, 8, 2))
+        obs, reward, done, _ = env.step(actions)
+        for i, w in enumerate(worlds):
+            w.world_step([[(0, v) for v in actions[i, :4]],
+                          [(0, v) for v in actions[i, 4:]]])
+            assert np.allclose(w.agent_positions, env.agent_positions[i])
+            assert (w.flag_taken == env.flag_taken[i]).all()
+            assert (w.flag_teams == env.flag_teams[i]).all()
+            assert (w.flag_scoring_counts == env.flag_scoring_counts[i]).all()
+            assert (w.get_reward() == reward[i]).all()
+
+def test_auto_reset():
+    env = VecCtfEnv(2, time_limit=2, seed=0)
+    env.reset()
+    actions = np.zeros((2, 8, 2))
+
+    env.step(actions)
+    obs, _, done, info = env.step(actions)
+
+    assert done.all()
+    assert info['terminal_observation'][:, -1].tolist() == [2, 2]
+    assert obs[:, -1].tolist() == [0, 0]
+    assert not env.flag_taken.any()
+
+def test_step_subset():
+    env = VecCtfEnv(4, seed=2, copy=False)
+    env.reset()
+    start = env.agent_positions.copy()
+
+    obs, reward, done, _ = env.step(np.ones((2, 8, 2)), indices=[3, 1])
+
+    assert obs.shape[0] == 2
+    assert env.time.tolist() == [0, 1, 0, 1]
+    assert np.allclose(env.agent_positions[[1, 3]], start[[1, 3]] + 1)
+    assert np.allclose(env.agent_positions[[0, 2]], start[[0, 2]])
+    assert np.allclose(obs[0, :2], env.agent_positions[3, 0])
+
+def test_step_subset_writes_only_stepped_observations():
+    env = VecCtfEnv(3, seed=2, copy=False)
+    env.reset()
+    before = env.obs.copy()
+    env.agent_positions[0] += 5
+
+    obs, _, _, _ = env.step(np.ones((1, 8, 2)), indices=[2])
+
+    assert np.array_equal(env.obs[:2], before[:2])
+    assert np.array_equal(env.obs[2], obs[0])
+    assert np.array_equal(obs, env.get_observation()[[2]])
+
+def test_end_on_all_captured():
+    env = VecCtfEnv(2, number_flags=1, time_limit=100, time_to_score=1,
+                    end_on_all_captured=True, seed=0)
+    env.flag_positions[0] = env.agent_positions[0, :1]
+    env.flag_positions[1] = -100
+
+    _, reward, done, info = env.step(np.zeros((2, env.number_agents, 2)))
+
+    assert done.tolist() == [True, False]
+    assert reward[0].sum() == 1
+    assert len(info['terminal_observation']) == 1
@@ -62,3 +62,127 @@ def get_teams():
     ts = np.array([t0])
     return ts
     
+
+def test_agents_are_views():
+    ts = get_teams()
+    w = world.World(10, 10, ts)
+    a = ts[0].agents[0]
+
+    w.agent_positions[0] = (3, 4)
+    a.orientation = 1.5
+
+    assert tuple(a.loc) == (3, 4)
+    assert w.agent_orientations[0] == 1.5
+
+def test_flags_are_views():
+    w = world.World(10, 10, get_teams())
+    w.flags[0].take(1)
+
+    assert w.flag_taken[0]
+    assert w.flag_teams[0] == 1
+
+    w.flag_teams[1] = flag.NO_TEAM
+    assert w.flags[1].scoring_team is None
+
+def test_world_step_moves_agents_in_place():
+    a1 = agent.Agent((1,1),0,1)
+    a2 = agent.Agent((5,5),0,1)
+    ta = team.Team(np.array([a1, a2]), 1)
+    w = world.World(10, 10, np.array([ta]))
+
+    a1, a2 = ta.agents
+
+    w.world_step([[(0, np.array([1, 0])), (0, np.array([0, -1]))]])
+
+    assert ta.agents[0] is a1
+    assert tuple(a1.loc) == (2, 1)
+    assert a1.orientation == 0
+    assert tuple(a2.loc) == (5, 4)
+    assert a2.orientation == -np.pi / 2
+    assert w.time == 1
+
+def test_apply_commands_keeps_arrays_in_sync():
+    a1 = agent.Agent((1,1),0,1)
+    ta = team.Team(np.array([a1]), 1)
+    w = world.World(10, 10, np.array([ta]))
+
+    w.apply_commands(w.to_commands([[(0, np.array([1, 1]))]]))
+
+    assert tuple(w.agent_positions[0]) == (2, 2)
+    assert tuple(ta.agents[0].loc) == (2, 2)
+
+def test_sync_flags_counts_direct_changes():
+    w = world.World(10, 10, get_teams())
+    w.flags[0].take(1)
+    w.flags[1].take(1)
+    w.sync_flags()
+
+    assert list(w.get_reward()) == [2]
+    assert 0 not in w.active_flags
+    assert len(w.active_flags) == w.flag_count - 2
+
+    w.reset()
+    assert list(w.get_reward()) == [0]
+    assert len(w.active_flags) == w.flag_count
+    assert not w.all_captured()
+
+def test_flag_views_update_reward():
+    w = world.World(10, 10, get_teams())
+    w.flags[0].take(1)
+    w.flags[1].taken = True
+    w.flags[1].scoring_team = 1
+
+    assert list(w.get_reward()) == [2]
+    assert len(w.active_flags) == w.flag_count - 2
+
+    w.flags[0].reset()
+    assert list(w.get_reward()) == [1]
+    assert 0 in w.active_flags
+
+def test_snapshot_restore_branches():
+    w = world.World(10, 10, get_teams(), flag_count=3)
+    w.flag_positions[:] = w.agent_positions[0]
+    a = w.teams[0].agents[0]
+    snap = w.snapshot()
+
+    for _ in range(w.time_to_score):
+        w.world_step_arrays(np.zeros((1, 2)))
+    assert w.all_captured()
+    captured = w.snapshot()
+
+    w.restore(snap)
+    assert w.time == 0
+    assert not w.flag_taken.any()
+    assert list(w.get_reward()) == [0]
+    assert len(w.active_flags) == 3
+    assert tuple(a.loc) == tuple(w.agent_positions[0])
+
+    w.world_step_arrays(np.ones((1, 2)))
+    w.restore(captured)
+    assert w.time == w.time_to_score
+    assert list(w.get_reward()) == [3]
+    assert w.flags[0].taken
+
+def test_snapshot_after_flag_view_change():
+    w = world.World(10, 10, get_teams())
+    w.flags[0].take(1)
+    assert list(w.get_reward()) == [1]
+    w.flags[1].take(1)
+    snap = w.snapshot()
+
+    w.reset()
+    w.restore(snap)
+    assert list(w.get_reward()) == [2]
+    assert w.flag_taken.sum() == 2
+    assert len(w.active_flags) == w.flag_count - 2
+
+def test_snapshot_is_immutable_and_compact():
+    w = world.World(10, 10, get_teams())
+    snap = w.snapshot()
+
+    assert isinstance(snap.state, bytes)
+    assert len(snap.state) == w.state_buffer.nbytes
+    w.agent_positions[0] = (7, 7)
+    assert w.snapshot().state != snap.state
+    w.restore(snap)
+    assert w.snapshot().state == snap.state